@@ -12,10 +12,16 @@ from .terrorist_dal import (
     get_terrorist_by_name,
     search_terrorists_by_name,
     get_all_terrorists,
+    upsert_terrorist,
+    upsert_terrorists,
+    normalize_terrorist_name,
+    backfill_name_keys,
+    ensure_name_key_column,
 )
 
 from .report_dal import (
     create_report,
+    create_reports,
     get_report_by_id,
     get_all_reports,
     get_reports_by_agent,
@@ -25,6 +31,95 @@ from .report_dal import (
     count_reports_by_terrorist,
     get_dangerous_terrorists,
     get_super_dangerous_terrorists,
+    open_report_export,
+    get_max_report_id,
+    open_recent_reports_stream,
+)
+
+from .sql_dal import (
+    open_streaming_query,
+    cancel_running_query,
+    explain_query,
+    get_index_columns,
+)
+
+from .export_dal import (
+    open_table_stream,
+    open_table_stream_between,
+)
+
+from .snapshot_dal import (
+    get_snapshot_tables,
+    open_full_table_stream,
+)
+
+from .change_log_dal import (
+    record_change,
+    get_changes_after,
+    get_change_log_bounds,
+    delete_changes_before,
+)
+
+from .dedup_dal import (
+    find_candidates,
+    create_representative,
+    create_duplicate,
+    remove_report,
+    get_cluster,
+)
+
+from .entity_link_dal import (
+    get_terrorist_names_after,
+    replace_report_mentions,
+    delete_report_mentions,
+    get_links,
+    get_terrorists_by_ids,
+)
+
+from .watchlist_dal import (
+    create_watchlist,
+    get_watchlist_by_id,
+    get_all_watchlists,
+    delete_watchlist,
+    create_watchlist_matches,
+    get_watchlist_matches,
+)
+
+from .scoring_dal import (
+    widen_score_columns,
+    get_scoring_state,
+    apply_score_deltas,
+    replace_scores,
+    get_top_scores,
+)
+
+from .data_version_dal import (
+    get_data_version_tokens,
+    change_data_version_token,
+)
+
+from .facet_dal import (
+    apply_facet_deltas,
+    replace_facets,
+    get_facet_buckets,
+    get_facet_values,
+    get_facet_totals,
+)
+
+from .rescan_dal import (
+    get_rescan_checkpoint,
+    start_rescan_checkpoint,
+    write_classifications,
+    complete_rescan,
+)
+
+from .archive_dal import (
+    archive_reports_batch,
+    get_archived_report_by_id,
+    get_archived_reports_by_terrorist,
+    search_archived_reports_by_content,
+    delete_archived_report,
+    get_archive_stats,
 )
 
 __all__ = [
@@ -40,8 +135,14 @@ __all__ = [
     "get_terrorist_by_name",
     "search_terrorists_by_name",
     "get_all_terrorists",
+    "upsert_terrorist",
+    "upsert_terrorists",
+    "normalize_terrorist_name",
+    "backfill_name_keys",
+    "ensure_name_key_column",
     # Report DAL
     "create_report",
+    "create_reports",
     "get_report_by_id",
     "get_all_reports",
     "get_reports_by_agent",
@@ -51,4 +152,69 @@ __all__ = [
     "count_reports_by_terrorist",
     "get_dangerous_terrorists",
     "get_super_dangerous_terrorists",
+    "open_report_export",
+    "get_max_report_id",
+    "open_recent_reports_stream",
+    # SQL DAL
+    "open_streaming_query",
+    "cancel_running_query",
+    "explain_query",
+    "get_index_columns",
+    # Export DAL
+    "open_table_stream",
+    "open_table_stream_between",
+    # Archive DAL
+    "archive_reports_batch",
+    "get_archived_report_by_id",
+    "get_archived_reports_by_terrorist",
+    "search_archived_reports_by_content",
+    "delete_archived_report",
+    "get_archive_stats",
+    # Change log DAL
+    "record_change",
+    "get_changes_after",
+    "get_change_log_bounds",
+    "delete_changes_before",
+    # Dedup DAL
+    "find_candidates",
+    "create_representative",
+    "create_duplicate",
+    "remove_report",
+    "get_cluster",
+    # Entity Link DAL
+    "get_terrorist_names_after",
+    "replace_report_mentions",
+    "delete_report_mentions",
+    "get_links",
+    "get_terrorists_by_ids",
+    # Watchlist DAL
+    "create_watchlist",
+    "get_watchlist_by_id",
+    "get_all_watchlists",
+    "delete_watchlist",
+    "create_watchlist_matches",
+    "get_watchlist_matches",
+    # Scoring DAL
+    "widen_score_columns",
+    "get_scoring_state",
+    "apply_score_deltas",
+    "replace_scores",
+    "get_top_scores",
+    # Data Version DAL
+    "get_data_version_tokens",
+    "change_data_version_token",
+    # Facet DAL
+    "apply_facet_deltas",
+    "replace_facets",
+    "get_facet_buckets",
+    "get_facet_values",
+    "get_facet_totals",
+    # Rescan DAL
+    "get_rescan_checkpoint",
+    "start_rescan_checkpoint",
+    "write_classifications",
+    "complete_rescan",
+    # Snapshot DAL
+    "get_snapshot_tables",
+    "open_full_table_stream",
 ]
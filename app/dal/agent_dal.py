@@ -1,6 +1,7 @@
 from typing import Optional
 from sqlmodel import Session, select, col
 from app.models import Agent
+from app.dal.change_log_dal import CHANGE_CREATE, record_change
 from db.database import get_engine
 
 
@@ -10,6 +11,8 @@ def create_agent(name: str, username: str, password: str) -> Agent:
     with Session(engine) as session:
         agent = Agent(name=name, username=username, password=password)
         session.add(agent)
+        session.flush()
+        record_change(session, "agent", CHANGE_CREATE, agent.id, agent)
         session.commit()
         session.refresh(agent)
         print(f"✓ Created new agent: {agent.name} (username: {agent.username})")
@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, update
+from sqlmodel import Session, select, col
+from app.models import Report, ReportArchive, ArchivedReportCounter, ReportClassification, WatchlistMatch
+from app.dal.report_dal import is_dangerous_content
+from app.dal.change_log_dal import CHANGE_DELETE, record_change
+from db.database import get_engine
+
+
+def _add_to_counters(session: Session, deltas: Dict[int, Tuple[int, int]]) -> None:
+    """Apply (report_count, dangerous_report_count) deltas per terrorist"""
+    for terrorist_id, (report_delta, dangerous_delta) in deltas.items():
+        counter = session.get(ArchivedReportCounter, terrorist_id)
+        if counter is None:
+            session.add(ArchivedReportCounter(
+                terrorist_id=terrorist_id,
+                report_count=report_delta,
+                dangerous_report_count=dangerous_delta,
+            ))
+        else:
+            # Relative UPDATE so concurrent deltas can't overwrite each other
+            session.execute(
+                update(ArchivedReportCounter)
+                .where(col(ArchivedReportCounter.terrorist_id) == terrorist_id)
+                .values(
+                    report_count=ArchivedReportCounter.report_count + report_delta,
+                    dangerous_report_count=ArchivedReportCounter.dangerous_report_count + dangerous_delta,
+                )
+            )
+
+
+def archive_reports_batch(cutoff: datetime, batch_size: int) -> int:
+    """
+    UPDATE - Move up to batch_size reports created before cutoff into the archive
+    
+    Copying the rows, bumping the per-terrorist counters and deleting the hot
+    rows happen in one transaction. Returns the number of reports moved.
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = (
+            select(Report)
+            .where(col(Report.created_at) < cutoff)
+            .order_by(col(Report.id))
+            .limit(batch_size)
+        )
+        reports = session.exec(statement).all()
+        if not reports:
+            return 0
+        
+        deltas: Dict[int, Tuple[int, int]] = {}
+        for report in reports:
+            session.add(ReportArchive(
+                id=report.id,
+                content=report.content,
+                created_at=report.created_at,
+                agent_id=report.agent_id,
+                terrorist_id=report.terrorist_id,
+            ))
+            report_delta, dangerous_delta = deltas.get(report.terrorist_id, (0, 0))
+            deltas[report.terrorist_id] = (
+                report_delta + 1,
+                dangerous_delta + int(is_dangerous_content(report.content)),
+            )
+        session.flush()
+        _add_to_counters(session, deltas)
+        for report in reports:
+            session.delete(report)
+        session.commit()
+        return len(reports)
+
+
+def get_archived_report_by_id(report_id: int) -> Optional[ReportArchive]:
+    """READ - Get an archived report by ID"""
+    engine = get_engine()
+    with Session(engine) as session:
+        return session.get(ReportArchive, report_id)
+
+
+def get_archived_reports_by_terrorist(terrorist_id: int, limit: Optional[int] = None) -> List[ReportArchive]:
+    """READ - Get archived reports about a specific terrorist"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = select(ReportArchive).where(col(ReportArchive.terrorist_id) == terrorist_id)
+        if limit:
+            statement = statement.limit(limit)
+        return session.exec(statement).all()
+
+
+def search_archived_reports_by_content(keyword: str) -> List[ReportArchive]:
+    """READ - Search archived reports by keyword in content"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = select(ReportArchive).where(col(ReportArchive.content).contains(keyword))
+        return session.exec(statement).all()
+
+
+def delete_archived_report(report_id: int) -> bool:
+    """DELETE - Remove an archived report and take it off its terrorist's counters"""
+    engine = get_engine()
+    with Session(engine) as session:
+        report = session.get(ReportArchive, report_id)
+        if not report:
+            return False
+        _add_to_counters(session, {
+            report.terrorist_id: (-1, -int(is_dangerous_content(report.content)))
+        })
+        session.delete(report)
+        session.execute(delete(ReportClassification).where(col(ReportClassification.report_id) == report_id))
+        session.execute(delete(WatchlistMatch).where(col(WatchlistMatch.report_id) == report_id))
+        record_change(session, "report", CHANGE_DELETE, report_id)
+        session.commit()
+        print(f"✓ Archived report {report_id} deleted successfully")
+        return True
+
+
+def get_archive_stats() -> Dict[str, int]:
+    """READ - Totals of archived reports"""
+    engine = get_engine()
+    with Session(engine) as session:
+        counters = session.exec(select(ArchivedReportCounter)).all()
+        return {
+            "archived_reports": sum(counter.report_count for counter in counters),
+            "archived_dangerous_reports": sum(counter.dangerous_report_count for counter in counters),
+            "terrorists_with_archived_reports": sum(1 for counter in counters if counter.report_count),
+        }
@@ -0,0 +1,93 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Union
+from sqlalchemy import delete, func
+from sqlmodel import Session, SQLModel, select, col
+from app.models import ChangeLog, ChangeLogRetention
+from db.database import get_engine
+
+CHANGE_CREATE = "create"
+CHANGE_DELETE = "delete"
+
+# Columns captured for each entity on create (agent passwords are never logged)
+CHANGE_FIELDS = {
+    "agent": ("id", "name", "username", "created_at"),
+    "terrorist": ("id", "name", "affiliation", "location", "created_at"),
+    "report": ("id", "content", "agent_id", "terrorist_id", "created_at"),
+}
+
+
+def _row_data(entity: str, row: Union[SQLModel, Mapping[str, Any]]) -> str:
+    values = {}
+    for name in CHANGE_FIELDS[entity]:
+        value = row[name] if isinstance(row, Mapping) else getattr(row, name)
+        values[name] = value.isoformat() if isinstance(value, datetime) else value
+    return json.dumps(values, ensure_ascii=False)
+
+
+def record_change(
+    session: Session,
+    entity: str,
+    op: str,
+    entity_id: int,
+    row: Optional[Union[SQLModel, Mapping[str, Any]]] = None,
+) -> None:
+    """CREATE - Append a change record to the caller's transaction (committed with it)"""
+    session.add(ChangeLog(
+        entity=entity,
+        entity_id=entity_id,
+        op=op,
+        data=_row_data(entity, row) if row is not None else None,
+    ))
+
+
+def get_changes_after(after: int, limit: int) -> List[ChangeLog]:
+    """READ - Change records with seq > after, in seq order"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = (
+            select(ChangeLog)
+            .where(col(ChangeLog.seq) > after)
+            .order_by(col(ChangeLog.seq))
+            .limit(limit)
+        )
+        return list(session.exec(statement).all())
+
+
+def get_change_log_bounds() -> Dict[str, Optional[int]]:
+    """READ - Oldest and latest seq in the change log (None when empty) and the purge watermark"""
+    engine = get_engine()
+    with Session(engine) as session:
+        oldest, latest = session.exec(
+            select(func.min(col(ChangeLog.seq)), func.max(col(ChangeLog.seq)))
+        ).one()
+        retention = session.get(ChangeLogRetention, 1)
+        purged_through_seq = retention.purged_through_seq if retention else 0
+        return {
+            "oldest_seq": oldest,
+            # A fully purged log still has a position
+            "latest_seq": max(latest or 0, purged_through_seq) or None,
+            "purged_through_seq": purged_through_seq,
+        }
+
+
+def delete_changes_before(cutoff: datetime, batch_size: int) -> int:
+    """DELETE - Remove up to batch_size change records created before cutoff; returns rows deleted"""
+    engine = get_engine()
+    with Session(engine) as session:
+        seqs = session.exec(
+            select(col(ChangeLog.seq))
+            .where(col(ChangeLog.created_at) < cutoff)
+            .order_by(col(ChangeLog.seq))
+            .limit(batch_size)
+        ).all()
+        if not seqs:
+            return 0
+        session.execute(delete(ChangeLog).where(col(ChangeLog.seq).in_(seqs)))
+        # Advance the watermark in the same transaction so readers never miss a purge
+        retention = session.get(ChangeLogRetention, 1) or ChangeLogRetention(id=1)
+        retention.purged_through_seq = max(retention.purged_through_seq, seqs[-1])
+        retention.purged_at = datetime.now(timezone.utc)
+        session.add(retention)
+        session.commit()
+        return len(seqs)
@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Dict
+from sqlmodel import Session, select
+from app.models import DataVersionToken
+from db.database import get_engine
+
+# Row changed by offline commands (manage.py); servers also drop their entity cache
+OFFLINE_CHANGE = 1
+# Row changed by every data version bump of a server, so its other workers see it
+ONLINE_CHANGE = 2
+
+
+def get_data_version_tokens() -> Dict[int, str]:
+    """READ - Tokens of the last offline and online data changes, by row id (missing if there never was one)"""
+    engine = get_engine()
+    with Session(engine) as session:
+        return {row.id: row.token for row in session.exec(select(DataVersionToken)).all()}
+
+
+def change_data_version_token(row_id: int = OFFLINE_CHANGE) -> str:
+    """UPDATE - Record a data change under a new random token"""
+    engine = get_engine()
+    if row_id == OFFLINE_CHANGE:
+        # The CLI may run before the server ever created the table
+        DataVersionToken.__table__.create(engine, checkfirst=True)
+    with Session(engine) as session:
+        row = session.get(DataVersionToken, row_id) or DataVersionToken(id=row_id)
+        row.token = uuid.uuid4().hex
+        row.changed_at = datetime.now(timezone.utc)
+        session.add(row)
+        session.commit()
+        return row.token
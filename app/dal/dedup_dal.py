@@ -0,0 +1,113 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, update
+from sqlmodel import Session, select, col
+from app.models import ReportFingerprint, ReportLshBand, ReportDuplicate
+from db.database import get_engine
+
+
+def find_candidates(band_keys: List[int], limit: int) -> List[ReportFingerprint]:
+    """READ - Cluster representatives sharing at least one LSH band with a signature"""
+    engine = get_engine()
+    with Session(engine) as session:
+        matching = select(ReportLshBand.report_id).where(col(ReportLshBand.band_key).in_(band_keys))
+        statement = (
+            select(ReportFingerprint)
+            .where(col(ReportFingerprint.report_id).in_(matching))
+            .order_by(col(ReportFingerprint.report_id))
+            .limit(limit)
+        )
+        return list(session.exec(statement).all())
+
+
+def create_representative(report_id: int, terrorist_id: int, signature: bytes, band_keys: List[int]) -> None:
+    """CREATE - Start a new cluster: store the report's signature and index its bands"""
+    engine = get_engine()
+    with Session(engine) as session:
+        session.add(ReportFingerprint(report_id=report_id, terrorist_id=terrorist_id, signature=signature))
+        session.add_all([ReportLshBand(band_key=band_key, report_id=report_id) for band_key in band_keys])
+        session.commit()
+
+
+def create_duplicate(report_id: int, cluster_id: int, terrorist_id: int, similarity: float) -> bool:
+    """CREATE - Link a report to an existing cluster; False if the cluster is gone"""
+    engine = get_engine()
+    with Session(engine) as session:
+        if session.get(ReportFingerprint, cluster_id, with_for_update=True) is None:
+            return False
+        session.add(ReportDuplicate(
+            report_id=report_id,
+            cluster_id=cluster_id,
+            terrorist_id=terrorist_id,
+            similarity=similarity,
+        ))
+        session.commit()
+        return True
+
+
+def remove_report(report_id: int) -> None:
+    """
+    DELETE - Take a deleted report out of its cluster
+
+    When a representative goes, its oldest remaining duplicate takes over
+    the cluster (signature and LSH bands included).
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        duplicate = session.get(ReportDuplicate, report_id)
+        if duplicate is not None:
+            session.delete(duplicate)
+            session.commit()
+            return
+
+        fingerprint = session.get(ReportFingerprint, report_id, with_for_update=True)
+        if fingerprint is None:
+            return
+        successor = session.exec(
+            select(ReportDuplicate)
+            .where(col(ReportDuplicate.cluster_id) == report_id)
+            .order_by(col(ReportDuplicate.report_id))
+            .limit(1)
+        ).first()
+        if successor is None:
+            session.execute(delete(ReportLshBand).where(col(ReportLshBand.report_id) == report_id))
+            session.delete(fingerprint)
+        else:
+            session.add(ReportFingerprint(
+                report_id=successor.report_id,
+                terrorist_id=fingerprint.terrorist_id,
+                signature=fingerprint.signature,
+                created_at=fingerprint.created_at,
+            ))
+            session.delete(fingerprint)
+            session.delete(successor)
+            session.flush()
+            session.execute(
+                update(ReportLshBand)
+                .where(col(ReportLshBand.report_id) == report_id)
+                .values(report_id=successor.report_id)
+            )
+            session.execute(
+                update(ReportDuplicate)
+                .where(col(ReportDuplicate.cluster_id) == report_id)
+                .values(cluster_id=successor.report_id)
+            )
+        session.commit()
+
+
+def get_cluster(report_id: int) -> Optional[Tuple[int, List[ReportDuplicate]]]:
+    """READ - (cluster id, duplicates) of the cluster a report belongs to, None if unclustered"""
+    engine = get_engine()
+    with Session(engine) as session:
+        duplicate = session.get(ReportDuplicate, report_id)
+        if duplicate is not None:
+            cluster_id = duplicate.cluster_id
+        elif session.get(ReportFingerprint, report_id) is not None:
+            cluster_id = report_id
+        else:
+            return None
+        duplicates = session.exec(
+            select(ReportDuplicate)
+            .where(col(ReportDuplicate.cluster_id) == cluster_id)
+            .order_by(col(ReportDuplicate.report_id))
+        ).all()
+        return cluster_id, list(duplicates)
@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import delete
+from sqlmodel import Session, select, col
+from app.models import Terrorist, ReportMention, TerroristLink
+from app.dal.sql_dal import upsert_increment
+from db.database import get_engine
+
+# (report id, report's terrorist id, IDs of the terrorists its content names)
+MentionRecord = Tuple[int, int, List[int]]
+
+
+def get_terrorist_names_after(after_id: int) -> List[Tuple[int, str, datetime]]:
+    """READ - (id, name, created_at) of terrorists with id > after_id, in id order"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = (
+            select(Terrorist.id, Terrorist.name, Terrorist.created_at)
+            .where(col(Terrorist.id) > after_id)
+            .order_by(col(Terrorist.id))
+        )
+        return [tuple(row) for row in session.exec(statement).all()]
+
+
+def _add_pairs(deltas: Dict[Tuple[int, int], int], terrorist_id: int, mentioned: Iterable[int], sign: int) -> None:
+    """Count every pair of terrorists named together in one report, in both directions"""
+    members = sorted({terrorist_id, *mentioned})
+    for i, first in enumerate(members):
+        for second in members[i + 1:]:
+            deltas[(first, second)] = deltas.get((first, second), 0) + sign
+            deltas[(second, first)] = deltas.get((second, first), 0) + sign
+
+
+def _apply_link_deltas(session: Session, deltas: Dict[Tuple[int, int], int]) -> None:
+    # Upsert link rows in key order, so concurrent ingests neither lose counts nor deadlock
+    emptied = []
+    for (terrorist_id, linked_terrorist_id), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        keys = {"terrorist_id": terrorist_id, "linked_terrorist_id": linked_terrorist_id}
+        upsert_increment(session, TerroristLink, keys, {"report_count": delta})
+        if delta < 0:
+            emptied.append((terrorist_id, linked_terrorist_id))
+    for terrorist_id, linked_terrorist_id in emptied:
+        session.execute(delete(TerroristLink).where(
+            col(TerroristLink.terrorist_id) == terrorist_id,
+            col(TerroristLink.linked_terrorist_id) == linked_terrorist_id,
+            col(TerroristLink.report_count) <= 0,
+        ))
+
+
+def replace_report_mentions(records: List[MentionRecord]) -> None:
+    """CREATE - Store (or re-store) the mentions of reports and update the co-occurrence links"""
+    engine = get_engine()
+    with Session(engine) as session:
+        deltas: Dict[Tuple[int, int], int] = {}
+        report_ids = [report_id for report_id, _, _ in records]
+        existing: Dict[int, Tuple[int, List[int]]] = {}
+        for mention in session.exec(select(ReportMention).where(col(ReportMention.report_id).in_(report_ids))).all():
+            existing.setdefault(mention.report_id, (mention.terrorist_id, []))[1].append(mention.mentioned_terrorist_id)
+        for terrorist_id, mentioned in existing.values():
+            _add_pairs(deltas, terrorist_id, mentioned, -1)
+        if existing:
+            session.execute(delete(ReportMention).where(col(ReportMention.report_id).in_(list(existing))))
+
+        for report_id, terrorist_id, mentioned in records:
+            session.add_all([
+                ReportMention(report_id=report_id, mentioned_terrorist_id=mentioned_id, terrorist_id=terrorist_id)
+                for mentioned_id in mentioned
+            ])
+            _add_pairs(deltas, terrorist_id, mentioned, 1)
+        session.flush()
+        _apply_link_deltas(session, deltas)
+        session.commit()
+
+
+def delete_report_mentions(report_id: int) -> bool:
+    """DELETE - Remove a deleted report's mentions and its co-occurrence counts"""
+    engine = get_engine()
+    with Session(engine) as session:
+        mentions = session.exec(select(ReportMention).where(col(ReportMention.report_id) == report_id)).all()
+        if not mentions:
+            return False
+        deltas: Dict[Tuple[int, int], int] = {}
+        _add_pairs(deltas, mentions[0].terrorist_id, [mention.mentioned_terrorist_id for mention in mentions], -1)
+        for mention in mentions:
+            session.delete(mention)
+        session.flush()
+        _apply_link_deltas(session, deltas)
+        session.commit()
+        return True
+
+
+def get_links(terrorist_ids: List[int], min_reports: int = 1) -> List[TerroristLink]:
+    """READ - Co-occurrence links of the given terrorists (adjacency index range scans)"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = (
+            select(TerroristLink)
+            .where(
+                col(TerroristLink.terrorist_id).in_(terrorist_ids),
+                col(TerroristLink.report_count) >= min_reports,
+            )
+            .order_by(col(TerroristLink.terrorist_id), col(TerroristLink.report_count).desc())
+        )
+        return list(session.exec(statement).all())
+
+
+def get_terrorists_by_ids(terrorist_ids: List[int]) -> List[Terrorist]:
+    """READ - Terrorists with the given IDs"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = select(Terrorist).where(col(Terrorist.id).in_(terrorist_ids))
+        return list(session.exec(statement).all())
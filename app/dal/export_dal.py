@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import List, Optional, Type
+from sqlmodel import SQLModel, select, col
+from app.dal.sql_dal import StreamingQuery
+
+
+def open_table_stream(
+    model: Type[SQLModel],
+    columns: List[str],
+    after_id: int = 0,
+    statement_timeout_ms: Optional[int] = None,
+) -> StreamingQuery:
+    """READ - Stream the given columns of rows with id > after_id, ordered by id"""
+    table = model.__table__
+    statement = (
+        select(*[table.c[name] for name in columns])
+        .where(col(model.id) > after_id)
+        .order_by(col(model.id))
+    )
+    return StreamingQuery(statement, statement_timeout_ms)
+
+
+def open_table_stream_between(
+    model: Type[SQLModel],
+    columns: List[str],
+    time_column: str,
+    after: Optional[datetime],
+    until: datetime,
+    statement_timeout_ms: Optional[int] = None,
+) -> StreamingQuery:
+    """READ - Stream the given columns of rows with after < time_column <= until, ordered by id"""
+    table = model.__table__
+    statement = select(*[table.c[name] for name in columns]).where(table.c[time_column] <= until)
+    if after is not None:
+        statement = statement.where(table.c[time_column] > after)
+    return StreamingQuery(statement.order_by(col(model.id)), statement_timeout_ms)
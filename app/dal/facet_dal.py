@@ -0,0 +1,216 @@
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete
+from sqlmodel import Session, select, col, func
+from app.models import Terrorist, ReportFacet, TerroristFacet
+from app.dal.sql_dal import upsert_increment
+from db.database import get_engine
+
+# (terrorist id, granularity, bucket start)
+FacetKey = Tuple[int, str, date]
+# (value or bucket start, report count, terrorist count)
+FacetRow = Tuple[object, int, int]
+
+FACET_INSERT_BATCH_SIZE = 5000
+
+
+def _terrorist_groups(session: Session, terrorist_ids: List[int]) -> Dict[int, Tuple[str, str]]:
+    """(affiliation, location) of terrorists, "" for missing values"""
+    statement = select(Terrorist.id, Terrorist.affiliation, Terrorist.location).where(
+        col(Terrorist.id).in_(terrorist_ids)
+    )
+    return {
+        terrorist_id: (affiliation or "", location or "")
+        for terrorist_id, affiliation, location in session.exec(statement).all()
+    }
+
+
+def apply_facet_deltas(deltas: Dict[FacetKey, int]) -> None:
+    """
+    UPDATE - Add report count deltas per (terrorist, granularity, bucket) to the rollups
+
+    Counts are added with upserts in key order (terrorist rows, then facet
+    rows), so concurrent ingests neither lose counts nor deadlock. Each
+    terrorist row is read back after its upsert to tell whether the
+    terrorist entered or left the bucket.
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        groups = _terrorist_groups(session, sorted({key[0] for key in deltas}))
+        facet_deltas: Dict[Tuple[str, date, str, str], List[int]] = {}
+        for terrorist_id, granularity, bucket_start in sorted(deltas, key=lambda key: (key[1], key[2], key[0])):
+            delta = deltas[(terrorist_id, granularity, bucket_start)]
+            if not delta:
+                continue
+            affiliation, location = groups.get(terrorist_id, ("", ""))
+            upsert_increment(
+                session,
+                TerroristFacet,
+                {"granularity": granularity, "bucket_start": bucket_start, "terrorist_id": terrorist_id},
+                {"report_count": delta},
+                {"affiliation": affiliation, "location": location},
+            )
+            row = session.get(TerroristFacet, (granularity, bucket_start, terrorist_id), populate_existing=True)
+            facet_delta = facet_deltas.setdefault((granularity, bucket_start, row.affiliation, row.location), [0, 0])
+            facet_delta[0] += delta
+            facet_delta[1] += int(row.report_count > 0) - int(row.report_count - delta > 0)
+            if row.report_count <= 0:
+                session.delete(row)
+        session.flush()
+
+        emptied = []
+        for key in sorted(facet_deltas):
+            report_delta, terrorist_delta = facet_deltas[key]
+            granularity, bucket_start, affiliation, location = key
+            upsert_increment(
+                session,
+                ReportFacet,
+                {"granularity": granularity, "bucket_start": bucket_start, "affiliation": affiliation, "location": location},
+                {"report_count": report_delta, "terrorist_count": terrorist_delta},
+            )
+            if report_delta < 0:
+                emptied.append(key)
+        for granularity, bucket_start, affiliation, location in emptied:
+            session.execute(delete(ReportFacet).where(
+                col(ReportFacet.granularity) == granularity,
+                col(ReportFacet.bucket_start) == bucket_start,
+                col(ReportFacet.affiliation) == affiliation,
+                col(ReportFacet.location) == location,
+                col(ReportFacet.report_count) <= 0,
+            ))
+        session.commit()
+
+
+def replace_facets(counts: Dict[FacetKey, int]) -> None:
+    """CREATE - Swap in rollups rebuilt from report counts per (terrorist, granularity, bucket)"""
+    engine = get_engine()
+    with Session(engine) as session:
+        groups = _terrorist_groups(session, sorted({key[0] for key in counts}))
+        terrorist_rows = []
+        facets: Dict[Tuple[str, date, str, str], List[int]] = {}
+        for (terrorist_id, granularity, bucket_start), report_count in counts.items():
+            affiliation, location = groups.get(terrorist_id, ("", ""))
+            terrorist_rows.append({
+                "granularity": granularity,
+                "bucket_start": bucket_start,
+                "terrorist_id": terrorist_id,
+                "affiliation": affiliation,
+                "location": location,
+                "report_count": report_count,
+            })
+            facet = facets.setdefault((granularity, bucket_start, affiliation, location), [0, 0])
+            facet[0] += report_count
+            facet[1] += 1
+        facet_rows = [
+            {
+                "granularity": granularity,
+                "bucket_start": bucket_start,
+                "affiliation": affiliation,
+                "location": location,
+                "report_count": report_count,
+                "terrorist_count": terrorist_count,
+            }
+            for (granularity, bucket_start, affiliation, location), (report_count, terrorist_count) in facets.items()
+        ]
+        session.execute(delete(TerroristFacet))
+        session.execute(delete(ReportFacet))
+        for table, rows in ((TerroristFacet.__table__, terrorist_rows), (ReportFacet.__table__, facet_rows)):
+            for start in range(0, len(rows), FACET_INSERT_BATCH_SIZE):
+                session.execute(table.insert(), rows[start:start + FACET_INSERT_BATCH_SIZE])
+        session.commit()
+
+
+def _filtered(statement, model, granularity: str, first_bucket: Optional[date], last_bucket: Optional[date],
+              affiliation: Optional[str], location: Optional[str]):
+    statement = statement.where(col(model.granularity) == granularity)
+    if first_bucket is not None:
+        statement = statement.where(col(model.bucket_start) >= first_bucket)
+    if last_bucket is not None:
+        statement = statement.where(col(model.bucket_start) <= last_bucket)
+    if affiliation is not None:
+        statement = statement.where(col(model.affiliation) == affiliation)
+    if location is not None:
+        statement = statement.where(col(model.location) == location)
+    return statement
+
+
+def get_facet_buckets(
+    granularity: str,
+    first_bucket: Optional[date],
+    last_bucket: Optional[date],
+    affiliation: Optional[str],
+    location: Optional[str],
+    limit: int,
+) -> List[FacetRow]:
+    """READ - (bucket start, reports, terrorists) of the latest matching buckets, oldest first"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = select(
+            col(ReportFacet.bucket_start),
+            func.sum(ReportFacet.report_count),
+            func.sum(ReportFacet.terrorist_count),
+        )
+        statement = (
+            _filtered(statement, ReportFacet, granularity, first_bucket, last_bucket, affiliation, location)
+            .group_by(col(ReportFacet.bucket_start))
+            .order_by(col(ReportFacet.bucket_start).desc())
+            .limit(limit)
+        )
+        rows = session.exec(statement).all()
+        return [(bucket_start, int(reports), int(terrorists)) for bucket_start, reports, terrorists in reversed(rows)]
+
+
+def _facet_aggregates(granularity: str):
+    """Rollup table and (reports, terrorists) aggregates for a granularity"""
+    if granularity == "all":
+        return ReportFacet, func.sum(ReportFacet.report_count), func.sum(ReportFacet.terrorist_count)
+    # A terrorist can have reports in several buckets, so count them distinctly
+    return (
+        TerroristFacet,
+        func.sum(TerroristFacet.report_count),
+        func.count(func.distinct(col(TerroristFacet.terrorist_id))),
+    )
+
+
+def get_facet_values(
+    dimension: str,
+    granularity: str,
+    first_bucket: Optional[date],
+    last_bucket: Optional[date],
+    affiliation: Optional[str],
+    location: Optional[str],
+    limit: int,
+) -> List[FacetRow]:
+    """
+    READ - (value, reports, terrorists) per affiliation or location, most reports first
+
+    granularity "all" reads the all-time report_facet rows; any other reads
+    report_facet_terrorist, one row per terrorist and bucket in the range.
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        model, reports, terrorists = _facet_aggregates(granularity)
+        value = col(getattr(model, dimension))
+        statement = (
+            _filtered(select(value, reports, terrorists), model, granularity, first_bucket, last_bucket, affiliation, location)
+            .group_by(value)
+            .order_by(reports.desc(), value)
+            .limit(limit)
+        )
+        return [(name, int(count), int(distinct)) for name, count, distinct in session.exec(statement).all()]
+
+
+def get_facet_totals(
+    granularity: str,
+    first_bucket: Optional[date],
+    last_bucket: Optional[date],
+    affiliation: Optional[str],
+    location: Optional[str],
+) -> Tuple[int, int]:
+    """READ - (reports, distinct terrorists) matching the filters"""
+    engine = get_engine()
+    with Session(engine) as session:
+        model, reports, terrorists = _facet_aggregates(granularity)
+        statement = _filtered(select(reports, terrorists), model, granularity, first_bucket, last_bucket, affiliation, location)
+        total_reports, total_terrorists = session.exec(statement).one()
+        return int(total_reports or 0), int(total_terrorists or 0)
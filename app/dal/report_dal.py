@@ -1,8 +1,45 @@
-from typing import Optional, List
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional, List, Tuple
+from sqlalchemy import delete, exists, or_
 from sqlmodel import Session, select, col, func
-from app.models import Report, Agent, Terrorist
+from app.models import Report, Agent, Terrorist, ArchivedReportCounter, ReportDuplicate, ReportClassification, WatchlistMatch
+from app.dal.sql_dal import StreamingQuery
+from app.dal.change_log_dal import CHANGE_CREATE, CHANGE_DELETE, record_change
 from db.database import get_engine
 
+# Weapon keywords that mark a report as dangerous content
+DANGEROUS_KEYWORDS = ["פיגוע", "סכין", "רובה", "אקדח", "פצצה"]
+# Changes whenever the keyword list does; stored reports are then re-classified by
+# `python manage.py rescan-reports`
+DANGEROUS_RULES_VERSION = hashlib.sha256(
+    json.dumps(sorted(DANGEROUS_KEYWORDS), ensure_ascii=False).encode("utf-8")
+).hexdigest()[:16]
+
+
+def dangerous_keywords_in(content: str) -> List[str]:
+    """Weapon keywords contained in report content"""
+    content_lower = content.lower()
+    return [keyword for keyword in DANGEROUS_KEYWORDS if keyword in content_lower]
+
+
+def is_dangerous_content(content: str) -> bool:
+    """Whether report content contains any weapon keyword"""
+    return bool(dangerous_keywords_in(content))
+
+
+def classify_report(report: Report) -> ReportClassification:
+    """Classification row of a report under the current keyword list"""
+    matched = dangerous_keywords_in(report.content)
+    return ReportClassification(
+        report_id=report.id,
+        terrorist_id=report.terrorist_id,
+        dangerous=bool(matched),
+        matched_keywords=json.dumps(matched, ensure_ascii=False),
+        rules_version=DANGEROUS_RULES_VERSION,
+    )
+
 
 def create_report(content: str, agent_id: int, terrorist_id: int) -> Report:
     """CREATE - Add a new report to the database"""
@@ -10,12 +47,34 @@ def create_report(content: str, agent_id: int, terrorist_id: int) -> Report:
     with Session(engine) as session:
         report = Report(content=content, agent_id=agent_id, terrorist_id=terrorist_id)
         session.add(report)
+        session.flush()
+        session.add(classify_report(report))
+        record_change(session, "report", CHANGE_CREATE, report.id, report)
         session.commit()
         session.refresh(report)
         print(f"✓ Created new intelligence report (ID: {report.id})")
         return report
 
 
+def create_reports(rows: List[Tuple[str, int, int]]) -> List[Report]:
+    """CREATE - Add several (content, agent_id, terrorist_id) reports in one transaction"""
+    engine = get_engine()
+    # Objects stay usable after commit without a refresh round trip per row
+    with Session(engine, expire_on_commit=False) as session:
+        reports = [
+            Report(content=content, agent_id=agent_id, terrorist_id=terrorist_id)
+            for content, agent_id, terrorist_id in rows
+        ]
+        session.add_all(reports)
+        session.flush()
+        session.add_all([classify_report(report) for report in reports])
+        for report in reports:
+            record_change(session, "report", CHANGE_CREATE, report.id, report)
+        session.commit()
+        print(f"✓ Created {len(reports)} intelligence reports in one transaction")
+        return reports
+
+
 def get_report_by_id(report_id: int) -> Optional[Report]:
     """READ - Get a report by ID"""
     engine = get_engine()
@@ -61,6 +120,75 @@ def search_reports_by_content(keyword: str):
         return reports
 
 
+def build_report_export_statement(
+    agent_id: Optional[int] = None,
+    terrorist_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    keyword: Optional[str] = None,
+    dangerous_only: bool = False,
+    include_names: bool = False,
+):
+    """Build the filtered SELECT used by the report export, ordered by report ID"""
+    columns = [
+        col(Report.id),
+        col(Report.content),
+        col(Report.agent_id),
+        col(Report.terrorist_id),
+        col(Report.created_at),
+    ]
+    if include_names:
+        columns += [
+            col(Terrorist.name).label("terrorist_name"),
+            col(Agent.name).label("agent_name"),
+        ]
+    statement = select(*columns)
+    if include_names:
+        statement = (
+            statement
+            .join(Terrorist, col(Terrorist.id) == col(Report.terrorist_id))
+            .join(Agent, col(Agent.id) == col(Report.agent_id))
+        )
+    if agent_id is not None:
+        statement = statement.where(col(Report.agent_id) == agent_id)
+    if terrorist_id is not None:
+        statement = statement.where(col(Report.terrorist_id) == terrorist_id)
+    if created_from is not None:
+        statement = statement.where(col(Report.created_at) >= created_from)
+    if created_to is not None:
+        statement = statement.where(col(Report.created_at) < created_to)
+    if keyword:
+        statement = statement.where(col(Report.content).contains(keyword))
+    if dangerous_only:
+        statement = statement.where(or_(*[col(Report.content).contains(word) for word in DANGEROUS_KEYWORDS]))
+    return statement.order_by(col(Report.id))
+
+
+def open_report_export(
+    statement_timeout_ms: Optional[int] = None,
+    **filters,
+) -> StreamingQuery:
+    """READ - Run the filtered report export with a server-side cursor"""
+    return StreamingQuery(build_report_export_statement(**filters), statement_timeout_ms)
+
+
+def get_max_report_id() -> int:
+    """READ - Highest report ID (0 when there are no reports)"""
+    engine = get_engine()
+    with Session(engine) as session:
+        return session.exec(select(func.max(col(Report.id)))).one() or 0
+
+
+def open_recent_reports_stream(since: datetime, until_id: int) -> StreamingQuery:
+    """READ - Stream (id, terrorist_id, created_at) of reports created since a time, up to an ID"""
+    statement = (
+        select(col(Report.id), col(Report.terrorist_id), col(Report.created_at))
+        .where(col(Report.created_at) >= since, col(Report.id) <= until_id)
+        .order_by(col(Report.id))
+    )
+    return StreamingQuery(statement)
+
+
 def delete_report(report_id: int) -> bool:
     """DELETE - Remove a report from the database"""
     engine = get_engine()
@@ -71,53 +199,109 @@ def delete_report(report_id: int) -> bool:
             return False
         
         session.delete(report)
+        session.execute(delete(ReportClassification).where(col(ReportClassification.report_id) == report_id))
+        session.execute(delete(WatchlistMatch).where(col(WatchlistMatch.report_id) == report_id))
+        record_change(session, "report", CHANGE_DELETE, report_id)
         session.commit()
         print(f"✓ Report {report_id} deleted successfully")
         return True
 
 
 def count_reports_by_terrorist(terrorist_id: int) -> int:
-    """Count how many reports exist for a specific terrorist"""
+    """Count how many reports exist for a specific terrorist (archived ones included)"""
     engine = get_engine()
     with Session(engine) as session:
         statement = select(func.count(col(Report.id))).where(col(Report.terrorist_id) == terrorist_id)
         count = session.exec(statement).one()
-        return count
+        counter = session.get(ArchivedReportCounter, terrorist_id)
+        return count + (counter.report_count if counter else 0)
 
 
-def get_dangerous_terrorists(min_reports: int = 5):
-    """Find terrorists with more than min_reports reports (dangerous terrorists)"""
+def _report_totals_statement(count_clusters: bool = False):
+    """
+    SELECT of (terrorist id, report_count, archived_dangerous_count) per terrorist
+    
+    Hot reports are counted live; archived ones come from their counters.
+    With count_clusters, reports linked as near-duplicates of an earlier
+    report are left out, so each cluster counts once.
+    Returns the statement and the total-count expression, for filtering.
+    """
+    hot_counts = (
+        select(col(Report.terrorist_id).label("terrorist_id"), func.count(col(Report.id)).label("hot_count"))
+        .group_by(col(Report.terrorist_id))
+        .subquery()
+    )
+    total = (
+        func.coalesce(hot_counts.c.hot_count, 0)
+        + func.coalesce(col(ArchivedReportCounter.report_count), 0)
+    )
+    duplicate_counts = None
+    if count_clusters:
+        duplicate_counts = (
+            select(
+                col(ReportDuplicate.terrorist_id).label("terrorist_id"),
+                func.count(col(ReportDuplicate.report_id)).label("duplicate_count"),
+            )
+            .group_by(col(ReportDuplicate.terrorist_id))
+            .subquery()
+        )
+        total = total - func.coalesce(duplicate_counts.c.duplicate_count, 0)
+    statement = (
+        select(
+            col(Terrorist.id),
+            total.label("report_count"),
+            func.coalesce(col(ArchivedReportCounter.dangerous_report_count), 0).label("archived_dangerous_count"),
+        )
+        .outerjoin(hot_counts, hot_counts.c.terrorist_id == col(Terrorist.id))
+        .outerjoin(ArchivedReportCounter, col(ArchivedReportCounter.terrorist_id) == col(Terrorist.id))
+    )
+    if duplicate_counts is not None:
+        statement = statement.outerjoin(duplicate_counts, duplicate_counts.c.terrorist_id == col(Terrorist.id))
+    return statement, total
+
+
+def get_dangerous_terrorists(min_reports: int = 5, count_clusters: bool = False):
+    """Find terrorists with more than min_reports reports (or near-duplicate clusters)"""
     engine = get_engine()
     with Session(engine) as session:
-        # Get terrorists with report count
+        # Get terrorists with report count (hot + archived)
+        totals, total = _report_totals_statement(count_clusters)
+        totals = totals.where(total > min_reports).subquery()
         statement = (
-            select(Terrorist, func.count(col(Report.id)).label("report_count"))
-            .join(Report, col(Terrorist.id) == col(Report.terrorist_id))
-            .group_by(col(Terrorist.id))
-            .having(func.count(col(Report.id)) > min_reports)
+            select(Terrorist, totals.c.report_count)
+            .join(totals, totals.c.id == col(Terrorist.id))
         )
         results = session.exec(statement).all()
         return results
 
 
-def get_super_dangerous_terrorists():
-    """Find super dangerous terrorists: >10 reports AND containing weapon keywords"""
+def get_super_dangerous_terrorists(count_clusters: bool = False, use_classification: bool = False):
+    """
+    Find super dangerous terrorists: >10 reports (or clusters) AND containing weapon keywords
+    
+    With use_classification (only valid once every report is classified under
+    DANGEROUS_RULES_VERSION), weapon keywords are looked up in
+    report_classification in the same query instead of re-reading content.
+    """
     engine = get_engine()
     with Session(engine) as session:
-        dangerous_keywords = ["פיגוע", "סכין", "רובה", "אקדח", "פצצה"]
+        # First, get terrorists with more than 10 reports (hot + archived)
+        statement, total = _report_totals_statement(count_clusters)
+        statement = statement.where(total > 10)
         
-        # First, get terrorists with more than 10 reports
-        statement = (
-            select(col(Terrorist.id), func.count(col(Report.id)).label("report_count"))
-            .join(Report, col(Terrorist.id) == col(Report.terrorist_id))
-            .group_by(col(Terrorist.id))
-            .having(func.count(col(Report.id)) > 10)
-        )
+        if use_classification:
+            has_dangerous_report = exists().where(
+                col(ReportClassification.terrorist_id) == col(Terrorist.id),
+                col(ReportClassification.dangerous).is_(True),
+            )
+            totals = statement.where(has_dangerous_report).subquery()
+            classified = select(Terrorist, totals.c.report_count).join(totals, totals.c.id == col(Terrorist.id))
+            return session.exec(classified).all()
         
         potential_terrorists = session.exec(statement).all()
         
         super_dangerous = []
-        for terrorist_id, report_count in potential_terrorists:
+        for terrorist_id, report_count, archived_dangerous_count in potential_terrorists:
             # Check if any of their reports contain dangerous keywords
             if terrorist_id is None:
                 continue
@@ -125,17 +309,15 @@ def get_super_dangerous_terrorists():
             terrorist = session.get(Terrorist, terrorist_id)
             if not terrorist:
                 continue
-                
-            # Get all reports for this terrorist
-            reports = get_reports_by_terrorist(terrorist_id)
             
-            # Check if any report contains any of the keywords
-            has_dangerous_content = False
-            for report in reports:
-                content_lower = report.content.lower()
-                if any(keyword in content_lower for keyword in dangerous_keywords):
-                    has_dangerous_content = True
-                    break
+            # Archived reports were classified when they were archived
+            has_dangerous_content = archived_dangerous_count > 0
+            if not has_dangerous_content:
+                # Get all reports for this terrorist
+                reports = get_reports_by_terrorist(terrorist_id)
+                
+                # Check if any report contains any of the keywords
+                has_dangerous_content = any(is_dangerous_content(report.content) for report in reports)
             
             if has_dangerous_content:
                 super_dangerous.append((terrorist, report_count))
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import and_, delete, update
+from sqlmodel import Session, select, col, func
+from app.models import Report, ReportArchive, ArchivedReportCounter, ReportClassification, RescanCheckpoint
+from db.database import get_engine
+
+
+def get_rescan_checkpoint(rules_version: str) -> Optional[RescanCheckpoint]:
+    """READ - Rescan progress for a rules version (None if it never started)"""
+    engine = get_engine()
+    with Session(engine) as session:
+        return session.get(RescanCheckpoint, rules_version)
+
+
+def start_rescan_checkpoint(rules_version: str) -> RescanCheckpoint:
+    """CREATE - Start (or restart from scratch) the rescan for a rules version"""
+    engine = get_engine()
+    with Session(engine, expire_on_commit=False) as session:
+        checkpoint = session.get(RescanCheckpoint, rules_version)
+        if checkpoint is not None:
+            session.delete(checkpoint)
+            session.flush()
+        checkpoint = RescanCheckpoint(rules_version=rules_version)
+        session.add(checkpoint)
+        session.commit()
+        return checkpoint
+
+
+def write_classifications(
+    rules_version: str,
+    rows: List[Dict],
+    through_field: str,
+    through_id: int,
+) -> None:
+    """
+    UPDATE - Replace the classifications of a batch of reports and advance the checkpoint
+
+    rows are report_classification dicts. The rows and the checkpoint are
+    committed together, so a resumed rescan never skips or redoes a batch.
+    Reports deleted while the batch was being classified are dropped again.
+    """
+    engine = get_engine()
+    report_ids = [row["report_id"] for row in rows]
+    with Session(engine) as session:
+        session.execute(delete(ReportClassification).where(col(ReportClassification.report_id).in_(report_ids)))
+        session.execute(ReportClassification.__table__.insert(), rows)
+        session.execute(
+            delete(ReportClassification).where(
+                col(ReportClassification.report_id).in_(report_ids),
+                col(ReportClassification.report_id).not_in(
+                    select(Report.id).where(col(Report.id).in_(report_ids))
+                ),
+                col(ReportClassification.report_id).not_in(
+                    select(ReportArchive.id).where(col(ReportArchive.id).in_(report_ids))
+                ),
+            )
+        )
+        checkpoint = session.get(RescanCheckpoint, rules_version, with_for_update=True)
+        setattr(checkpoint, through_field, through_id)
+        checkpoint.scanned += len(rows)
+        checkpoint.dangerous += sum(1 for row in rows if row["dangerous"])
+        checkpoint.updated_at = datetime.now(timezone.utc)
+        session.add(checkpoint)
+        session.commit()
+
+
+def complete_rescan(rules_version: str) -> None:
+    """UPDATE - Recount archived dangerous reports from the new classifications and mark the rescan done"""
+    engine = get_engine()
+    with Session(engine) as session:
+        dangerous_archived = (
+            select(func.count(col(ReportClassification.report_id)))
+            .join(ReportArchive, col(ReportArchive.id) == col(ReportClassification.report_id))
+            .where(and_(
+                col(ReportArchive.terrorist_id) == col(ArchivedReportCounter.terrorist_id),
+                col(ReportClassification.dangerous).is_(True),
+            ))
+            .scalar_subquery()
+        )
+        session.execute(update(ArchivedReportCounter).values(dangerous_report_count=dangerous_archived))
+        checkpoint = session.get(RescanCheckpoint, rules_version)
+        checkpoint.completed_at = datetime.now(timezone.utc)
+        session.add(checkpoint)
+        session.commit()
@@ -0,0 +1,141 @@
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import delete, inspect, text
+from sqlmodel import Session, select, col
+from app.models import Terrorist, TerroristScore, TerroristAgentCount, ScoringState
+from app.dal.sql_dal import upsert_increment
+from db.database import get_engine
+
+# (terrorist_id, agent_id, created_at, report weight, +1 for a new report / -1 for a deleted one)
+ScoreDelta = Tuple[int, int, datetime, float, int]
+
+
+def widen_score_columns() -> bool:
+    """
+    UPDATE - Turn terrorist_score columns created as 4-byte FLOAT (MySQL) into DOUBLE
+
+    create_all() never alters an existing table. Returns True if they were
+    altered; the stored scores lost precision and need a recompute.
+    """
+    engine = get_engine()
+    if engine.dialect.name != "mysql":
+        return False
+    columns = {column["name"]: column["type"] for column in inspect(engine).get_columns("terrorist_score")}
+    narrow = [
+        name for name in ("weighted_mass", "rank_value")
+        if columns[name].compile(dialect=engine.dialect).upper() != "DOUBLE"
+    ]
+    if not narrow:
+        return False
+    with engine.begin() as connection:
+        connection.execute(text(
+            "ALTER TABLE terrorist_score "
+            + ", ".join(f"MODIFY {name} DOUBLE NOT NULL" for name in narrow)
+        ))
+    return True
+
+
+def get_scoring_state() -> Optional[ScoringState]:
+    """READ - The scoring epoch and weights fingerprint (None before the first recompute)"""
+    engine = get_engine()
+    with Session(engine) as session:
+        return session.get(ScoringState, 1)
+
+
+def apply_score_deltas(
+    deltas: List[ScoreDelta],
+    contribution: Callable[[datetime, datetime, float], float],
+    rank_value: Callable[[float, int], float],
+) -> bool:
+    """
+    UPDATE - Add (or take off) reports to their terrorists' scores in one transaction
+
+    contribution(epoch, created_at, weight) gives a report's decayed mass and
+    rank_value(weighted_mass, distinct_agents) the indexed rank. Counts are
+    added with upserts (so two first reports about a terrorist can't both
+    insert its row), pair rows first and then score rows, each in key order,
+    so concurrent updates neither lose increments nor deadlock. Returns False
+    (nothing applied) before the first recompute.
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        state = session.get(ScoringState, 1)
+        if state is None:
+            return False
+        epoch = state.epoch if state.epoch.tzinfo else state.epoch.replace(tzinfo=timezone.utc)
+
+        pair_deltas: Dict[Tuple[int, int], int] = {}
+        # terrorist id -> [reports, weighted mass, distinct agents]
+        score_deltas: Dict[int, list] = {}
+        for terrorist_id, agent_id, created_at, weight, sign in deltas:
+            pair_deltas[(terrorist_id, agent_id)] = pair_deltas.get((terrorist_id, agent_id), 0) + sign
+            score_delta = score_deltas.setdefault(terrorist_id, [0, 0.0, 0])
+            score_delta[0] += sign
+            score_delta[1] += sign * contribution(epoch, created_at, weight)
+
+        for (terrorist_id, agent_id), delta in sorted(pair_deltas.items()):
+            if not delta:
+                continue
+            keys = {"terrorist_id": terrorist_id, "agent_id": agent_id}
+            upsert_increment(session, TerroristAgentCount, keys, {"report_count": delta})
+            pair = session.get(TerroristAgentCount, (terrorist_id, agent_id), populate_existing=True)
+            # The agent joins or leaves the terrorist's distinct agents
+            score_deltas[terrorist_id][2] += int(pair.report_count > 0) - int(pair.report_count - delta > 0)
+            if pair.report_count <= 0:
+                session.delete(pair)
+        session.flush()
+
+        for terrorist_id, (reports, weighted_mass, agents) in sorted(score_deltas.items()):
+            upsert_increment(
+                session,
+                TerroristScore,
+                {"terrorist_id": terrorist_id},
+                {"report_count": reports, "weighted_mass": weighted_mass, "distinct_agents": agents},
+                {"rank_value": 0.0},
+            )
+            score = session.get(TerroristScore, terrorist_id, populate_existing=True)
+            score.report_count = max(score.report_count, 0)
+            score.distinct_agents = max(score.distinct_agents, 0)
+            # Clamp float residue left by subtracting deleted reports
+            score.weighted_mass = max(score.weighted_mass, 0.0)
+            score.rank_value = rank_value(score.weighted_mass, score.distinct_agents)
+            session.add(score)
+        session.commit()
+        return True
+
+
+def replace_scores(
+    scores: List[Dict],
+    agent_counts: List[Dict],
+    epoch: datetime,
+    weights_fingerprint: str,
+) -> None:
+    """CREATE - Swap in freshly recomputed scores and pair counts, and record the new epoch"""
+    engine = get_engine()
+    with Session(engine) as session:
+        session.execute(delete(TerroristAgentCount))
+        session.execute(delete(TerroristScore))
+        if scores:
+            session.execute(TerroristScore.__table__.insert(), scores)
+        if agent_counts:
+            session.execute(TerroristAgentCount.__table__.insert(), agent_counts)
+        state = session.get(ScoringState, 1) or ScoringState(id=1, epoch=epoch, weights_fingerprint="")
+        state.epoch = epoch
+        state.weights_fingerprint = weights_fingerprint
+        state.recomputed_at = datetime.now(timezone.utc)
+        session.add(state)
+        session.commit()
+
+
+def get_top_scores(limit: int) -> List[Tuple[TerroristScore, Terrorist]]:
+    """READ - Highest-ranked terrorists (served from the rank_value index)"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = (
+            select(TerroristScore, Terrorist)
+            .join(Terrorist, col(Terrorist.id) == col(TerroristScore.terrorist_id))
+            .where(col(TerroristScore.rank_value) > 0)
+            .order_by(col(TerroristScore.rank_value).desc())
+            .limit(limit)
+        )
+        return list(session.exec(statement).all())
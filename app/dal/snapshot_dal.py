@@ -0,0 +1,119 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Index, Table, create_engine, func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+from app.dal.sql_dal import StreamingQuery
+from db.database import get_engine
+
+
+def get_snapshot_tables() -> List[Table]:
+    """All SQLModel tables, parents before children (foreign-key order)"""
+    return list(SQLModel.metadata.sorted_tables)
+
+
+def open_full_table_stream(table: Table) -> StreamingQuery:
+    """READ - Stream every row of a table, ordered by primary key"""
+    statement = select(*table.columns).order_by(*table.primary_key.columns)
+    return StreamingQuery(statement)
+
+
+def count_rows(table: Table) -> int:
+    """READ - Number of rows in a table"""
+    with get_engine().connect() as connection:
+        return connection.execute(select(func.count()).select_from(table)).scalar_one()
+
+
+def recreate_tables() -> None:
+    """DELETE - Drop and recreate every SQLModel table (empty)"""
+    engine = get_engine()
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+
+def _leads_with(columns: List[str], prefix: List[str]) -> bool:
+    return columns[:len(prefix)] == prefix
+
+
+def _backs_foreign_key(index: Index, table: Table) -> bool:
+    """Whether MySQL needs the index for a foreign key (it refuses to drop it: error 1553)"""
+    index_columns = [column.name for column in index.columns]
+    primary_key = [column.name for column in table.primary_key.columns]
+    for foreign_key in table.foreign_key_constraints:
+        fk_columns = [column.name for column in foreign_key.columns]
+        if _leads_with(index_columns, fk_columns) and not _leads_with(primary_key, fk_columns):
+            return True
+    return False
+
+
+def drop_secondary_indexes(table: Table) -> List[Index]:
+    """Drop a table's non-primary-key indexes before a bulk load; returns them for rebuilding
+
+    Indexes that back a foreign key stay: the key needs one on its columns.
+    """
+    indexes = [index for index in table.indexes if not _backs_foreign_key(index, table)]
+    with get_engine().begin() as connection:
+        for index in indexes:
+            index.drop(connection, checkfirst=True)
+    return indexes
+
+
+def create_indexes(indexes: List[Index]) -> None:
+    """Rebuild indexes dropped by drop_secondary_indexes"""
+    with get_engine().begin() as connection:
+        for index in indexes:
+            index.create(connection, checkfirst=True)
+
+
+def disable_foreign_key_checks(connection: Connection) -> None:
+    """Skip per-row foreign-key checks on this connection (rows are loaded out of order)"""
+    if connection.dialect.name == "mysql":
+        connection.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+        connection.execute(text("SET UNIQUE_CHECKS = 0"))
+    elif connection.dialect.name == "sqlite":
+        connection.execute(text("PRAGMA foreign_keys = OFF"))
+
+
+def enable_foreign_key_checks(connection: Connection) -> None:
+    """Undo disable_foreign_key_checks before the connection goes back to the pool"""
+    if connection.dialect.name == "mysql":
+        connection.execute(text("SET UNIQUE_CHECKS = 1"))
+        connection.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+
+
+def insert_rows(connection: Connection, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """CREATE - Insert rows (sent as multi-row INSERT statements by the driver)"""
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+def make_load_data_engine() -> Engine:
+    """Engine on the same database with LOAD DATA LOCAL INFILE enabled (MySQL only)"""
+    engine = get_engine()
+    return create_engine(engine.url, connect_args={"local_infile": True}, pool_size=engine.pool.size())
+
+
+def load_data_infile(connection: Connection, table: Table, path: str, columns: List[str]) -> None:
+    """CREATE - Bulk load a tab-separated file (MySQL default escaping, \\N for NULL)"""
+    column_list = ", ".join(f"`{name}`" for name in columns)
+    connection.execute(text(
+        f"LOAD DATA LOCAL INFILE :path INTO TABLE `{table.name}` "
+        f"CHARACTER SET utf8mb4 ({column_list})"
+    ), {"path": path})
+
+
+def reset_sequences(table: Table) -> None:
+    """Move PostgreSQL serial sequences past the restored ids (no-op elsewhere)"""
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        for column in table.primary_key.columns:
+            if column.autoincrement is True or column.autoincrement == "auto":
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', '{column.name}'), "
+                    f"COALESCE((SELECT MAX({column.name}) FROM {table.name}), 0) + 1, false)"
+                ))
+
+
+def get_dialect_name(engine: Optional[Engine] = None) -> str:
+    return (engine or get_engine()).dialect.name
@@ -0,0 +1,210 @@
+import json
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Executable
+from sqlmodel import Session, SQLModel
+from db.database import get_engine
+
+
+def insert_for_dialect(dialect_name: str):
+    """Pick the dialect-specific INSERT construct that supports upserts"""
+    if dialect_name == "mysql":
+        return mysql.insert
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Upsert is not supported for dialect '{dialect_name}'")
+
+
+def upsert_increment(
+    session: Session,
+    model: Type[SQLModel],
+    keys: Dict[str, Any],
+    increments: Dict[str, Any],
+    defaults: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    UPDATE - Add increments to a row's columns in one statement, inserting the row if missing
+
+    A missing row is inserted with keys + increments + defaults (the other
+    columns). Unlike a read-then-insert, two transactions adding to the same
+    new row can't both insert it: the second one waits and increments.
+    """
+    table = model.__table__
+    dialect_name = session.get_bind().dialect.name
+    statement = insert_for_dialect(dialect_name)(table).values(**keys, **increments, **(defaults or {}))
+    if dialect_name == "mysql":
+        statement = statement.on_duplicate_key_update(
+            {name: table.c[name] + statement.inserted[name] for name in increments}
+        )
+    else:
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + statement.excluded[name] for name in increments},
+        )
+    session.execute(statement)
+
+
+def _set_statement_timeout(connection: Connection, timeout_ms: Optional[int]) -> None:
+    """Apply a per-connection statement timeout in the dialect's own way"""
+    if not timeout_ms:
+        return
+    dialect_name = connection.dialect.name
+    if dialect_name == "mysql":
+        # Applies to read-only SELECT statements
+        connection.execute(text(f"SET SESSION MAX_EXECUTION_TIME = {int(timeout_ms)}"))
+    elif dialect_name == "postgresql":
+        connection.execute(text(f"SET statement_timeout = {int(timeout_ms)}"))
+    elif dialect_name == "sqlite":
+        deadline = time.monotonic() + timeout_ms / 1000
+        raw_connection = connection.connection.driver_connection
+        # A non-zero return value from the progress handler aborts the statement
+        raw_connection.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+
+
+def _reset_statement_timeout(connection: Connection, timeout_ms: Optional[int]) -> None:
+    """Undo _set_statement_timeout before the connection goes back to the pool"""
+    if not timeout_ms:
+        return
+    dialect_name = connection.dialect.name
+    if dialect_name == "mysql":
+        connection.execute(text("SET SESSION MAX_EXECUTION_TIME = 0"))
+    elif dialect_name == "postgresql":
+        connection.execute(text("SET statement_timeout = 0"))
+    elif dialect_name == "sqlite":
+        connection.connection.driver_connection.set_progress_handler(None, 0)
+
+
+def _backend_handle(connection: Connection) -> Any:
+    """What cancel_running_query needs to interrupt this connection's statement"""
+    dialect_name = connection.dialect.name
+    if dialect_name == "mysql":
+        return dialect_name, connection.execute(text("SELECT CONNECTION_ID()")).scalar_one()
+    if dialect_name == "postgresql":
+        return dialect_name, connection.execute(text("SELECT pg_backend_pid()")).scalar_one()
+    if dialect_name == "sqlite":
+        return dialect_name, connection.connection.driver_connection
+    return None
+
+
+def cancel_running_query(handle: Any) -> None:
+    """UPDATE - Interrupt the statement running on another connection (KILL QUERY on MySQL)"""
+    dialect_name, backend = handle
+    if dialect_name == "sqlite":
+        # Thread-safe; the running statement fails with "interrupted"
+        backend.interrupt()
+        return
+    with get_engine().connect() as connection:
+        if dialect_name == "mysql":
+            connection.execute(text(f"KILL QUERY {int(backend)}"))
+        elif dialect_name == "postgresql":
+            connection.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": int(backend)})
+
+
+class StreamingQuery:
+    """
+    A row-returning statement executed with a server-side cursor
+
+    The statement runs when the object is created, so SQL errors surface
+    before any response bytes are sent. Rows are then fetched in batches
+    (SSCursor on MySQL, named cursors on PostgreSQL) instead of loading the
+    whole result into memory. Always call close().
+
+    `query` is raw SQL text or a SQLAlchemy SELECT construct. on_started, if
+    given, receives a handle for cancel_running_query before the statement
+    runs, and None again just before close() releases the connection.
+    """
+
+    def __init__(
+        self,
+        query: Union[str, Executable],
+        statement_timeout_ms: Optional[int] = None,
+        on_started: Optional[Callable[[Any], None]] = None,
+    ):
+        self.statement_timeout_ms = statement_timeout_ms
+        self.connection = get_engine().connect().execution_options(stream_results=True)
+        self.result = None
+        self._closed = False
+        self._on_started = on_started
+        try:
+            _set_statement_timeout(self.connection, statement_timeout_ms)
+            if on_started is not None:
+                on_started(_backend_handle(self.connection))
+            self.result = self.connection.execute(text(query) if isinstance(query, str) else query)
+            if not self.result.returns_rows:
+                raise ValueError("Streaming is only supported for statements that return rows")
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.result.keys())
+
+    def iter_batches(self, batch_size: int) -> Iterator[Sequence[tuple]]:
+        """Yield lists of row tuples, at most batch_size at a time"""
+        while True:
+            rows = self.result.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+
+    def close(self) -> None:
+        """Release the cursor and return the connection to the pool (never commits)"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self.result is not None:
+                self.result.close()
+            _reset_statement_timeout(self.connection, self.statement_timeout_ms)
+        finally:
+            if self._on_started is not None:
+                # The handle must not outlive the connection (it goes back to the pool)
+                self._on_started(None)
+            self.connection.close()
+
+
+def open_streaming_query(
+    query: str,
+    statement_timeout_ms: Optional[int] = None,
+    on_started: Optional[Callable[[Any], None]] = None,
+) -> StreamingQuery:
+    """READ - Execute a raw SELECT with a server-side cursor for streaming"""
+    return StreamingQuery(query, statement_timeout_ms, on_started)
+
+
+def explain_query(query: str) -> Tuple[str, Any]:
+    """
+    READ - Get the execution plan of a query without running it
+
+    Returns (dialect name, plan): MySQL EXPLAIN FORMAT=JSON as a dict,
+    SQLite EXPLAIN QUERY PLAN as a list of row dicts, PostgreSQL
+    EXPLAIN (FORMAT JSON) as a list.
+    """
+    engine = get_engine()
+    dialect_name = engine.dialect.name
+    with engine.connect() as connection:
+        if dialect_name == "mysql":
+            value = connection.execute(text(f"EXPLAIN FORMAT=JSON {query}")).scalar_one()
+            return dialect_name, json.loads(value)
+        if dialect_name == "postgresql":
+            value = connection.execute(text(f"EXPLAIN (FORMAT JSON) {query}")).scalar_one()
+            return dialect_name, json.loads(value) if isinstance(value, str) else value
+        if dialect_name == "sqlite":
+            result = connection.execute(text(f"EXPLAIN QUERY PLAN {query}"))
+            return dialect_name, [dict(row._mapping) for row in result]
+    raise NotImplementedError(f"EXPLAIN is not supported for dialect '{dialect_name}'")
+
+
+def get_index_columns(table_name: str) -> List[List[str]]:
+    """READ - Column lists of the primary key and every index on a table"""
+    inspector = inspect(get_engine())
+    indexes = [inspector.get_pk_constraint(table_name).get("constrained_columns") or []]
+    indexes += [index["column_names"] for index in inspector.get_indexes(table_name)]
+    indexes += [constraint["column_names"] for constraint in inspector.get_unique_constraints(table_name)]
+    return [columns for columns in indexes if columns]
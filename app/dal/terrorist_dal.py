@@ -1,21 +1,207 @@
-from typing import Optional
+from typing import Optional, Dict, Iterable
+from datetime import datetime, timezone
+from sqlalchemy import or_, and_, update, inspect, text
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlmodel import Session, select, col
 from app.models import Terrorist
+from app.dal.change_log_dal import CHANGE_CREATE, record_change
+from app.dal.sql_dal import insert_for_dialect
 from db.database import get_engine
 
 
+def normalize_terrorist_name(name: str) -> str:
+    """Normalize a terrorist name for the unique name_key (trim, collapse spaces, casefold)"""
+    return " ".join(name.split()).casefold()
+
+
 def create_terrorist(name: str, affiliation: Optional[str] = None, location: Optional[str] = None) -> Terrorist:
     """CREATE - Add a new terrorist to the database"""
     engine = get_engine()
     with Session(engine) as session:
-        terrorist = Terrorist(name=name, affiliation=affiliation, location=location)
+        terrorist = Terrorist(
+            name=name,
+            name_key=normalize_terrorist_name(name),
+            affiliation=affiliation,
+            location=location,
+        )
         session.add(terrorist)
-        session.commit()
+        try:
+            session.flush()
+            record_change(session, "terrorist", CHANGE_CREATE, terrorist.id, terrorist)
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            raise ValueError(f"Terrorist '{name}' already exists")
         session.refresh(terrorist)
         print(f"✓ Added new terrorist: {terrorist.name}")
         return terrorist
 
 
+def upsert_terrorist(name: str, affiliation: Optional[str] = None, location: Optional[str] = None) -> int:
+    """
+    UPSERT - Insert a terrorist or resolve the existing one by name_key
+
+    Runs as a single statement so concurrent callers can't create duplicates.
+    Existing rows are left untouched. Returns the row id.
+
+    Whether the row was inserted comes from the write itself (RETURNING, or
+    the affected row count on MySQL), so exactly one racing caller logs the
+    create, with the row as stored. Only an existing name costs a second
+    statement, to read its id.
+    """
+    engine = get_engine()
+    dialect_name = engine.dialect.name
+    insert = insert_for_dialect(dialect_name)
+    values = {
+        "name": name,
+        "name_key": normalize_terrorist_name(name),
+        "affiliation": affiliation,
+        "location": location,
+        "created_at": datetime.now(timezone.utc),
+    }
+    with Session(engine) as session:
+        statement = insert(Terrorist).values(**values)
+        stored = None
+        if dialect_name == "mysql":
+            result = session.execute(statement.prefix_with("IGNORE"))
+            if result.rowcount:
+                stored = session.get(Terrorist, result.lastrowid)
+        else:
+            # A row comes back only when this statement inserted it
+            statement = statement.on_conflict_do_nothing(
+                index_elements=[col(Terrorist.name_key)]
+            ).returning(Terrorist)
+            stored = session.scalars(statement).first()
+        if stored is None:
+            return session.exec(
+                select(col(Terrorist.id)).where(col(Terrorist.name_key) == values["name_key"])
+            ).one()
+        terrorist_id = stored.id
+        record_change(session, "terrorist", CHANGE_CREATE, terrorist_id, stored)
+        session.commit()
+        return terrorist_id
+
+
+def upsert_terrorists(names: Iterable[str]) -> Dict[str, int]:
+    """
+    UPSERT - Resolve many terrorist names to ids at once (bulk ingest)
+
+    Inserts all missing names with one multi-row statement, then reads back
+    the rows with one SELECT. Returns a mapping of each given name to its id.
+    Creates are logged for the rows this statement inserted, as stored.
+    """
+    names = list(names)
+    rows_by_key = {}
+    for name in names:
+        rows_by_key.setdefault(normalize_terrorist_name(name), name)
+    if not rows_by_key:
+        return {}
+
+    engine = get_engine()
+    insert = insert_for_dialect(engine.dialect.name)
+    created_at = datetime.now(timezone.utc)
+    rows = [
+        {"name": name, "name_key": key, "created_at": created_at}
+        for key, name in rows_by_key.items()
+    ]
+    with Session(engine) as session:
+        statement = insert(Terrorist).values(rows)
+        if engine.dialect.name == "mysql":
+            result = session.execute(statement.prefix_with("IGNORE"))
+            # A multi-row INSERT takes one consecutive block of ids; ignored rows leave theirs unused
+            inserted_ids = set(range(result.lastrowid, result.lastrowid + len(rows))) if result.rowcount else set()
+        else:
+            statement = statement.on_conflict_do_nothing(
+                index_elements=[col(Terrorist.name_key)]
+            ).returning(col(Terrorist.id))
+            inserted_ids = set(session.execute(statement).scalars().all())
+
+        stored = session.exec(
+            select(Terrorist).where(col(Terrorist.name_key).in_(list(rows_by_key)))
+        ).all()
+        ids_by_key = {terrorist.name_key: terrorist.id for terrorist in stored}
+        for terrorist in stored:
+            if terrorist.id in inserted_ids:
+                record_change(session, "terrorist", CHANGE_CREATE, terrorist.id, terrorist)
+        session.commit()
+
+    return {name: ids_by_key[normalize_terrorist_name(name)] for name in names}
+
+
+def _has_name_key_column() -> bool:
+    return any(column["name"] == "name_key" for column in inspect(get_engine()).get_columns("terrorist"))
+
+
+def ensure_name_key_column() -> bool:
+    """
+    CREATE - Add name_key and its unique index to a terrorist table created before them
+
+    create_all() never alters an existing table. Returns True if the column was added.
+    """
+    engine = get_engine()
+    added = False
+    if not _has_name_key_column():
+        column_type = Terrorist.__table__.c.name_key.type.compile(dialect=engine.dialect)
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE terrorist ADD COLUMN name_key {column_type} NULL"))
+            added = True
+        except DBAPIError:
+            # Another worker starting up at the same time added it first
+            if not _has_name_key_column():
+                raise
+    # Before any backfill: the unique index is what keeps keys from colliding
+    for index in Terrorist.__table__.indexes:
+        if "name_key" in index.columns:
+            try:
+                index.create(engine, checkfirst=True)
+            except DBAPIError:
+                if index.name not in {existing["name"] for existing in inspect(engine).get_indexes("terrorist")}:
+                    raise
+    return added
+
+
+def backfill_name_keys(batch_size: int = 1000) -> Dict[str, int]:
+    """
+    UPDATE - Fill name_key for terrorists created before the column existed
+
+    Rows are processed in id order, so of several legacy rows that normalize
+    to the same key the oldest gets it; the others keep NULL (still found by
+    exact name) and are returned as skipped.
+    """
+    engine = get_engine()
+    filled = skipped = 0
+    after_id = 0
+    while True:
+        with Session(engine) as session:
+            rows = session.exec(
+                select(col(Terrorist.id), col(Terrorist.name))
+                .where(col(Terrorist.name_key).is_(None), col(Terrorist.id) > after_id)
+                .order_by(col(Terrorist.id))
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return {"filled": filled, "skipped": skipped}
+            after_id = rows[-1][0]
+            keys: Dict[str, int] = {}
+            for terrorist_id, name in rows:
+                keys.setdefault(normalize_terrorist_name(name), terrorist_id)
+            taken = set(session.exec(
+                select(col(Terrorist.name_key)).where(col(Terrorist.name_key).in_(list(keys)))
+            ).all())
+            batch_filled = 0
+            for key, terrorist_id in keys.items():
+                if key in taken:
+                    continue
+                session.execute(
+                    update(Terrorist).where(col(Terrorist.id) == terrorist_id).values(name_key=key)
+                )
+                batch_filled += 1
+            session.commit()
+            filled += batch_filled
+            skipped += len(rows) - batch_filled
+
+
 def get_terrorist_by_id(terrorist_id: int) -> Optional[Terrorist]:
     """READ - Get a terrorist by ID"""
     engine = get_engine()
@@ -24,10 +210,17 @@ def get_terrorist_by_id(terrorist_id: int) -> Optional[Terrorist]:
 
 
 def get_terrorist_by_name(name: str) -> Optional[Terrorist]:
-    """READ - Get a terrorist by exact name"""
+    """READ - Get a terrorist by name (matched on the normalized name_key, or exactly on legacy rows without one)"""
     engine = get_engine()
     with Session(engine) as session:
-        statement = select(Terrorist).where(Terrorist.name == name)
+        statement = (
+            select(Terrorist)
+            .where(or_(
+                col(Terrorist.name_key) == normalize_terrorist_name(name),
+                and_(col(Terrorist.name_key).is_(None), col(Terrorist.name) == name),
+            ))
+            .order_by(col(Terrorist.name_key).is_(None), col(Terrorist.id))
+        )
         terrorist = session.exec(statement).first()
         return terrorist
 
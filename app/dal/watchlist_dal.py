@@ -0,0 +1,84 @@
+import json
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete
+from sqlmodel import Session, select, col
+from app.models import Watchlist, WatchlistMatch
+from db.database import get_engine
+
+
+def create_watchlist(name: str, agent_id: int, keywords: List[str], terrorist_ids: List[int]) -> Watchlist:
+    """CREATE - Add a new watchlist"""
+    engine = get_engine()
+    with Session(engine) as session:
+        watchlist = Watchlist(
+            name=name,
+            agent_id=agent_id,
+            keywords=json.dumps(keywords, ensure_ascii=False),
+            terrorist_ids=json.dumps(terrorist_ids),
+        )
+        session.add(watchlist)
+        session.commit()
+        session.refresh(watchlist)
+        print(f"✓ Created watchlist '{watchlist.name}' (ID: {watchlist.id})")
+        return watchlist
+
+
+def get_watchlist_by_id(watchlist_id: int) -> Optional[Watchlist]:
+    """READ - Get a watchlist by ID"""
+    engine = get_engine()
+    with Session(engine) as session:
+        return session.get(Watchlist, watchlist_id)
+
+
+def get_all_watchlists(agent_id: Optional[int] = None) -> List[Watchlist]:
+    """READ - Get all watchlists, optionally only one agent's"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = select(Watchlist).order_by(col(Watchlist.id))
+        if agent_id is not None:
+            statement = statement.where(col(Watchlist.agent_id) == agent_id)
+        return list(session.exec(statement).all())
+
+
+def delete_watchlist(watchlist_id: int) -> bool:
+    """DELETE - Remove a watchlist and its recorded matches"""
+    engine = get_engine()
+    with Session(engine) as session:
+        watchlist = session.get(Watchlist, watchlist_id)
+        if not watchlist:
+            return False
+        session.execute(delete(WatchlistMatch).where(col(WatchlistMatch.watchlist_id) == watchlist_id))
+        session.delete(watchlist)
+        session.commit()
+        print(f"✓ Watchlist {watchlist_id} deleted successfully")
+        return True
+
+
+def create_watchlist_matches(matches: List[Dict[str, Any]]) -> List[WatchlistMatch]:
+    """CREATE - Record (watchlist_id, report_id, matched_keywords) matches in one transaction"""
+    engine = get_engine()
+    with Session(engine, expire_on_commit=False) as session:
+        rows = [
+            WatchlistMatch(
+                watchlist_id=match["watchlist_id"],
+                report_id=match["report_id"],
+                matched_keywords=json.dumps(match["matched_keywords"], ensure_ascii=False),
+            )
+            for match in matches
+        ]
+        session.add_all(rows)
+        session.commit()
+        return rows
+
+
+def get_watchlist_matches(watchlist_id: int, after_id: int = 0, limit: int = 100) -> List[WatchlistMatch]:
+    """READ - A watchlist's matches with id > after_id, oldest first"""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = (
+            select(WatchlistMatch)
+            .where(col(WatchlistMatch.watchlist_id) == watchlist_id, col(WatchlistMatch.id) > after_id)
+            .order_by(col(WatchlistMatch.id))
+            .limit(limit)
+        )
+        return list(session.exec(statement).all())
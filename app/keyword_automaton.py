@@ -0,0 +1,113 @@
+"""
+Keyword Automaton - Find every occurrence of many terms in one pass over a text
+
+An Aho-Corasick automaton compiled from a set of terms: matching costs
+O(len(text) + matches) no matter how many terms there are, instead of one
+substring scan per term. Terms and text are casefolded, so matching is
+case-insensitive like the LIKE-based report search.
+
+Uses the pyahocorasick C extension when installed, otherwise a pure-Python
+automaton with the same behaviour.
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # optional dependency
+    ahocorasick = None
+
+
+def normalize_term(term: str) -> str:
+    """Normalize a term the way texts are matched (trim, collapse spaces, casefold)"""
+    return " ".join(term.split()).casefold()
+
+
+class KeywordAutomaton:
+    """Compiled multi-term matcher"""
+
+    def __init__(self, terms: Iterable[str], whole_words: bool = False):
+        """
+        Args:
+            terms: Terms to look for (normalized with normalize_term; empty ones are ignored)
+            whole_words: Only report matches not surrounded by letters or digits
+        """
+        self.terms = sorted({normalize_term(term) for term in terms} - {""})
+        self.whole_words = whole_words
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for term in self.terms:
+                self._automaton.add_word(term, term)
+            if self.terms:
+                self._automaton.make_automaton()
+        else:
+            self._build()
+
+    def _build(self) -> None:
+        # Trie as parallel lists: goto transitions, failure links, terms ending here
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for term in self.terms:
+            node = 0
+            for char in term:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(term)
+
+        # Breadth-first failure links; each node also inherits its fallback's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                if node:
+                    fallback = self._fail[node]
+                    while fallback and char not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _iter_raw(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (end index, term) for every occurrence in already-normalized text"""
+        if not self.terms:
+            return
+        if ahocorasick is not None:
+            yield from self._automaton.iter(text)
+            return
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for term in self._output[node]:
+                yield index, term
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (start index, term) for every occurrence of a term
+
+        Indexes refer to the casefolded, whitespace-collapsed text.
+        """
+        text = normalize_term(text)
+        for end, term in self._iter_raw(text):
+            start = end - len(term) + 1
+            if self.whole_words and (
+                (start > 0 and text[start - 1].isalnum())
+                or (end + 1 < len(text) and text[end + 1].isalnum())
+            ):
+                continue
+            yield start, term
+
+    def find_terms(self, text: str) -> Set[str]:
+        """Distinct terms that occur in text"""
+        return {term for _, term in self.iter_matches(text)}
@@ -8,6 +8,19 @@ from contextlib import asynccontextmanager
 from config import settings
 from db.database import create_db_and_tables
 from app.router import api_router
+from app.responses import FastJSONResponse
+from app.middleware import AdmissionControlMiddleware, CompressionMiddleware, admission_stats
+from app.services.cache_service import get_entity_cache
+from app.services.response_cache_service import response_cache_stats
+from app.services.singleflight_service import singleflight_stats
+from app.services.sql_job_service import get_job_manager
+from app.services.group_commit_service import get_report_writer, group_commit_stats
+from app.services.report_feed_service import close_broker, report_feed_stats
+from app.services.sql_result_cache_service import sql_result_cache_stats
+from app.services.trending_service import start_trending, trending_stats
+from app.services.scoring_service import ensure_scores
+from app.services.entity_link_service import entity_link_stats
+from app.services.terrorist_service import backfill_name_keys
 
 
 @asynccontextmanager
@@ -21,11 +34,17 @@ async def lifespan(app: FastAPI):
     print("Creating database tables...")
     create_db_and_tables()
     print("Database tables created successfully!")
+    backfill_name_keys()
+    start_trending()
+    ensure_scores()
     
     yield
     
     # Shutdown
     print("Shutting down server...")
+    get_job_manager().shutdown()
+    get_report_writer().shutdown()
+    close_broker()
 
 
 # Create FastAPI application
@@ -35,9 +54,16 @@ app = FastAPI(
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
-# Configure CORS
+# Negotiated response compression (zstd / br / gzip above a size threshold)
+app.add_middleware(CompressionMiddleware)
+
+# Admission control: per route-class concurrency limits and load shedding
+app.add_middleware(AdmissionControlMiddleware)
+
+# Configure CORS (added last so it is outermost: shed 503s carry CORS headers too)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -68,3 +94,20 @@ def health_check():
         "status": "healthy",
         "service": "intelligence-api"
     }
+
+
+@app.get("/metrics")
+def metrics():
+    """Runtime metrics (cache hit ratios, etc.)"""
+    return {
+        "entity_cache": get_entity_cache().stats(),
+        "response_cache": response_cache_stats(),
+        "singleflight": singleflight_stats(),
+        "admission_control": admission_stats(),
+        "sql_jobs": get_job_manager().stats(),
+        "sql_result_cache": sql_result_cache_stats(),
+        "report_group_commit": group_commit_stats(),
+        "report_feed": report_feed_stats(),
+        "trending": trending_stats(),
+        "entity_links": entity_link_stats(),
+    }
@@ -0,0 +1,4 @@
+from .admission_control import AdmissionControlMiddleware, admission_stats
+from .compression import CompressionMiddleware
+
+__all__ = ["AdmissionControlMiddleware", "admission_stats", "CompressionMiddleware"]
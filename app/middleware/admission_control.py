@@ -0,0 +1,173 @@
+"""
+Admission Control Middleware - Per route-class concurrency limits with load shedding
+
+Each API request is classified (ingest, lookup, analytics, admin_sql, feed) and must
+take a slot from its class before it runs. When all slots are busy it waits in
+a bounded queue; when the queue is full (or the wait times out) it is rejected
+immediately with 503 and Retry-After. Heavy analytics and admin SQL therefore
+can't take every threadpool thread and DB connection away from report ingest.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+
+# (HTTP method or "*", path prefix relative to the API prefix, route class).
+# First match wins; unmatched API paths are "lookup".
+ROUTE_CLASS_RULES: List[Tuple[str, str, str]] = [
+    # Long-lived feed connections get their own slots so they never starve lookups
+    ("GET", "/feed/", "feed"),
+    # Polling background SQL jobs is cheap; only submitting/running SQL is admin_sql
+    ("GET", "/sql/jobs", "lookup"),
+    ("*", "/sql/", "admin_sql"),
+    ("GET", "/reports/export", "analytics"),
+    ("POST", "/exports/", "analytics"),
+    ("GET", "/reports/dangerous", "analytics"),
+    ("GET", "/reports/super-dangerous", "analytics"),
+    ("GET", "/reports/search/text", "analytics"),
+    ("POST", "/reports", "ingest"),
+    ("DELETE", "/reports/", "ingest"),
+    ("POST", "/terrorists", "ingest"),
+    ("POST", "/agents", "ingest"),
+    ("POST", "/watchlists", "ingest"),
+    ("DELETE", "/watchlists/", "ingest"),
+]
+
+
+def classify_request(method: str, path: str) -> Optional[str]:
+    """Return the route class of a request, or None if it isn't admission-controlled"""
+    if not path.startswith(settings.API_V1_PREFIX):
+        return None
+    relative_path = path[len(settings.API_V1_PREFIX):]
+    for rule_method, prefix, route_class in ROUTE_CLASS_RULES:
+        if rule_method in ("*", method) and relative_path.startswith(prefix):
+            return route_class
+    return "lookup"
+
+
+class RouteClassLimiter:
+    """Concurrency slots plus a bounded wait queue for one route class"""
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Metrics
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot; False means the request should be shed"""
+        started = time.perf_counter()
+        if not self._semaphore.locked():
+            # A slot is free: acquire() completes without suspending
+            await self._semaphore.acquire()
+        elif self.waiting >= self.max_queue:
+            self.rejected += 1
+            return False
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                return False
+            finally:
+                self.waiting -= 1
+
+        waited = time.perf_counter() - started
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.admitted += 1
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_queue_wait_ms": round(1000 * self.total_wait_seconds / self.admitted, 3) if self.admitted else 0.0,
+            "max_queue_wait_ms": round(1000 * self.max_wait_seconds, 3),
+        }
+
+
+def _build_limiters() -> Dict[str, RouteClassLimiter]:
+    return {
+        "ingest": RouteClassLimiter("ingest", settings.ADMISSION_INGEST_CONCURRENCY, settings.ADMISSION_INGEST_QUEUE),
+        "lookup": RouteClassLimiter("lookup", settings.ADMISSION_LOOKUP_CONCURRENCY, settings.ADMISSION_LOOKUP_QUEUE),
+        "analytics": RouteClassLimiter("analytics", settings.ADMISSION_ANALYTICS_CONCURRENCY, settings.ADMISSION_ANALYTICS_QUEUE),
+        "admin_sql": RouteClassLimiter("admin_sql", settings.ADMISSION_ADMIN_SQL_CONCURRENCY, settings.ADMISSION_ADMIN_SQL_QUEUE),
+        "feed": RouteClassLimiter("feed", settings.ADMISSION_FEED_CONCURRENCY, settings.ADMISSION_FEED_QUEUE),
+    }
+
+
+limiters = _build_limiters()
+
+
+def admission_stats() -> Dict[str, Any]:
+    """Per route-class slot usage, rejections and queue-wait metrics"""
+    return {
+        "enabled": settings.ADMISSION_CONTROL_ENABLED,
+        "classes": {name: limiter.stats() for name, limiter in limiters.items()},
+    }
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware, so the slot is held until the response body
+    (including streamed bodies) has been fully sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.ADMISSION_CONTROL_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_request(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiters[route_class]
+        if not await limiter.acquire(settings.ADMISSION_QUEUE_TIMEOUT_SECONDS):
+            await self._reject(send, route_class)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send, route_class: str) -> None:
+        body = json.dumps({
+            "detail": f"Server busy: too many concurrent '{route_class}' requests, retry later"
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(settings.ADMISSION_RETRY_AFTER_SECONDS).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,216 @@
+"""
+Compression Middleware - Negotiated zstd / brotli / gzip response compression
+
+The encoding is chosen from the request's Accept-Encoding (respecting q-values)
+among those available: zstd (needs `zstandard`), br (needs `brotli`) and gzip.
+Complete bodies smaller than COMPRESSION_MIN_SIZE are sent as-is; streamed
+bodies are compressed chunk by chunk and flushed so output keeps flowing.
+"""
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Server preference when the client accepts several encodings equally
+_PREFERENCE = ["zstd", "br", "gzip"]
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/msgpack",
+    "application/vnd.apache.arrow.stream",
+    "text/",
+)
+
+
+def available_encodings() -> List[str]:
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best available encoding for an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    candidates = [
+        encoding for encoding in available_encodings()
+        if weights.get(encoding, weights.get("*", 0.0)) > 0
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda encoding: (weights.get(encoding, weights.get("*", 0.0)), -_PREFERENCE.index(encoding)))
+
+
+class _Compressor:
+    """Incremental compressor with a common compress/flush/finish interface"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + self._compressor.flush() if flush else out
+        out = self._compressor.compress(data)
+        if flush:
+            if self.encoding == "zstd":
+                out += self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            else:
+                out += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    compressor = _Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def _merge_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Add Accept-Encoding to the response's Vary values (keeping Accept, Origin, ...)"""
+    values = []
+    for name, value in headers:
+        if name.lower() == b"vary":
+            values.extend(part.strip() for part in value.decode("latin-1").split(",") if part.strip())
+    if "*" not in values and "accept-encoding" not in (value.lower() for value in values):
+        values.append("Accept-Encoding")
+    merged = [(name, value) for name, value in headers if name.lower() != b"vary"]
+    merged.append((b"vary", ", ".join(values).encode("latin-1")))
+    return merged
+
+
+def _weak_etag(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Mark a strong ETag weak: the encoded bytes differ from the identity body it was made for"""
+    return [
+        (name, b"W/" + value if name.lower() == b"etag" and value.startswith(b'"') else value)
+        for name, value in headers
+    ]
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware so streamed responses can be compressed incrementally"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, send, encoding: str):
+        self._send = send
+        self.encoding = encoding
+        self.start_message = None
+        self.active = None  # None = undecided, True = compressing, False = passthrough
+        self.compressor: Optional[_Compressor] = None
+
+    def _should_compress(self, start_message) -> bool:
+        status = start_message["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        headers = {name.lower(): value for name, value in start_message["headers"]}
+        if b"content-encoding" in headers:
+            return False
+        content_type = headers.get(b"content-type", b"").decode("latin-1")
+        return content_type.startswith(_COMPRESSIBLE_TYPES)
+
+    def _compressed_start(self, content_length: Optional[int]):
+        headers = [
+            (name, value) for name, value in self.start_message["headers"]
+            if name.lower() != b"content-length"
+        ]
+        headers = _weak_etag(_merge_vary(headers))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return {**self.start_message, "headers": headers}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            if not self._should_compress(message):
+                self.active = False
+                if message["status"] == 304:
+                    # Revalidations answer with the ETag the compressed 200 carried
+                    message = {**message, "headers": _weak_etag(_merge_vary(list(message["headers"])))}
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.active is False:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.active is None:
+            if not more_body:
+                # Complete body in one message: compress only above the threshold
+                if len(body) < settings.COMPRESSION_MIN_SIZE:
+                    self.active = False
+                    # Same ETag as a compressed response, so a 304 validates either
+                    await self._send({**self.start_message, "headers": _weak_etag(_merge_vary(list(self.start_message["headers"])))})
+                    await self._send(message)
+                    return
+                compressed = compress_bytes(body, self.encoding)
+                self.active = True
+                await self._send(self._compressed_start(len(compressed)))
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            # Streamed body: compress incrementally
+            self.active = True
+            self.compressor = _Compressor(self.encoding)
+            await self._send(self._compressed_start(None))
+
+        if self.compressor is None:
+            return
+        chunk = self.compressor.compress(body, flush=True)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
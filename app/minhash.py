@@ -0,0 +1,101 @@
+"""
+MinHash - Compact signatures for estimating text similarity
+
+A text is reduced to its set of character shingles (overlapping k-grams of
+the normalized text). Its MinHash signature keeps, for each of num_perm
+random hash functions, the smallest hash of any shingle; the fraction of
+positions where two signatures agree estimates the Jaccard similarity of
+the two shingle sets.
+
+For locality-sensitive hashing the signature is cut into bands of equal
+size: two texts whose similarity is s share at least one band with
+probability 1 - (1 - s^rows)^bands, so near-duplicates are found by looking
+up band hashes instead of comparing against every stored text.
+"""
+import hashlib
+import random
+import struct
+from typing import List, Optional, Set
+
+from app.keyword_automaton import normalize_term
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    """Shingles texts and computes their MinHash signatures"""
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int = 1):
+        """
+        Args:
+            num_perm: Hash functions (signature length)
+            shingle_size: Characters per shingle
+            seed: Seed of the hash functions; signatures are only comparable for equal seeds
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        # Universal hashing: h(x) = (a * x + b) mod p, truncated to 32 bits
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def shingles(self, text: str) -> Set[int]:
+        """64-bit hashes of the text's character shingles (case and whitespace insensitive)"""
+        text = normalize_term(text)
+        size = self.shingle_size
+        if len(text) <= size:
+            grams = {text} if text else set()
+        else:
+            grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+        return {_hash64(gram.encode("utf-8")) for gram in grams}
+
+    def signature(self, text: str) -> Optional[List[int]]:
+        """MinHash signature of a text, or None for an empty one"""
+        hashes = self.shingles(text)
+        if not hashes:
+            return None
+        return [
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+            for a, b in self._permutations
+        ]
+
+
+def similarity(first: List[int], second: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures of equal length"""
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def band_keys(signature: List[int], bands: int, namespace: int = 0) -> List[int]:
+    """
+    Signed 64-bit hash of each band of a signature
+
+    namespace is hashed in too, so only texts of the same namespace (e.g.
+    the same terrorist) become candidates of each other.
+    """
+    rows = len(signature) // bands
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                struct.pack(f"<qi{rows}I", namespace, band, *signature[band * rows:(band + 1) * rows]),
+                digest_size=8,
+            ).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(bands)
+    ]
+
+
+def encode_signature(signature: List[int]) -> bytes:
+    return struct.pack(f"<{len(signature)}I", *signature)
+
+
+def decode_signature(data: bytes) -> List[int]:
+    return list(struct.unpack(f"<{len(data) // 4}I", data))
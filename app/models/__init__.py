@@ -1,5 +1,37 @@
 from .agent import Agent
 from .terrorist import Terrorist
 from .report import Report
+from .report_archive import ReportArchive, ArchivedReportCounter
+from .change_log import ChangeLog, ChangeLogRetention
+from .watchlist import Watchlist, WatchlistMatch
+from .terrorist_score import TerroristScore, TerroristAgentCount, ScoringState
+from .report_cluster import ReportFingerprint, ReportLshBand, ReportDuplicate
+from .terrorist_link import ReportMention, TerroristLink
+from .report_classification import ReportClassification, RescanCheckpoint
+from .report_facet import ReportFacet, TerroristFacet
+from .data_version import DataVersionToken
 
-__all__ = ["Agent", "Terrorist", "Report"]
+__all__ = [
+    "Agent",
+    "Terrorist",
+    "Report",
+    "ReportArchive",
+    "ArchivedReportCounter",
+    "ChangeLog",
+    "ChangeLogRetention",
+    "Watchlist",
+    "WatchlistMatch",
+    "TerroristScore",
+    "TerroristAgentCount",
+    "ScoringState",
+    "ReportFingerprint",
+    "ReportLshBand",
+    "ReportDuplicate",
+    "ReportMention",
+    "TerroristLink",
+    "ReportClassification",
+    "RescanCheckpoint",
+    "ReportFacet",
+    "TerroristFacet",
+    "DataVersionToken",
+]
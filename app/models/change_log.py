@@ -0,0 +1,29 @@
+from typing import Optional
+from sqlalchemy import Column, Text
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class ChangeLog(SQLModel, table=True):
+    """Change log entry - One create/delete of an agent, terrorist or report, in sequence order"""
+    __tablename__ = "change_log"
+    # Never reuse seqs of purged rows (SQLite otherwise restarts from MAX(rowid) + 1)
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: Optional[int] = Field(default=None, primary_key=True)
+    entity: str = Field(max_length=20)  # "agent", "terrorist" or "report"
+    entity_id: int
+    op: str = Field(max_length=10)  # "create" or "delete"
+    # JSON of the created row (None for deletes)
+    data: Optional[str] = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+
+
+class ChangeLogRetention(SQLModel, table=True):
+    """Single row recording how far the change log has been purged"""
+    __tablename__ = "change_log_retention"
+
+    id: int = Field(default=1, primary_key=True, sa_column_kwargs={"autoincrement": False})
+    # Every seq up to and including this one may have been purged
+    purged_through_seq: int = 0
+    purged_at: Optional[datetime] = None
@@ -0,0 +1,12 @@
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class DataVersionToken(SQLModel, table=True):
+    """Tokens of the last data change: row 1 by offline commands (manage.py), row 2 by servers"""
+    __tablename__ = "data_version"
+
+    id: int = Field(default=1, primary_key=True, sa_column_kwargs={"autoincrement": False})
+    # Random, not a counter: restoring a snapshot can't bring back an old value
+    token: str = Field(default="", max_length=32)
+    changed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,27 @@
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class ReportArchive(SQLModel, table=True):
+    """Archived report - Cold copy of a report moved out of the hot report table"""
+    __tablename__ = "report_archive"
+
+    # Same id as the original report
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    content: str
+    created_at: datetime = Field(index=True)
+    archived_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Foreign Keys
+    agent_id: int = Field(foreign_key="agent.id", index=True)
+    terrorist_id: int = Field(foreign_key="terrorist.id", index=True)
+
+
+class ArchivedReportCounter(SQLModel, table=True):
+    """Per-terrorist counts of archived reports, so report totals stay correct"""
+    __tablename__ = "archived_report_counter"
+
+    terrorist_id: int = Field(foreign_key="terrorist.id", primary_key=True)
+    report_count: int = 0
+    # Archived reports containing weapon keywords (see report_dal.DANGEROUS_KEYWORDS)
+    dangerous_report_count: int = 0
@@ -0,0 +1,35 @@
+from typing import Optional
+from sqlalchemy import Column, Text
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class ReportClassification(SQLModel, table=True):
+    """Weapon-keyword classification of a report (live or archived)"""
+    __tablename__ = "report_classification"
+
+    report_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    dangerous: bool = Field(default=False, index=True)
+    # JSON list of the weapon keywords found in the content
+    matched_keywords: str = Field(default="[]", sa_column=Column(Text, nullable=False))
+    # report_dal.DANGEROUS_RULES_VERSION the report was classified with
+    rules_version: str = Field(max_length=16)
+    classified_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Foreign Keys
+    terrorist_id: int = Field(foreign_key="terrorist.id", index=True)
+
+
+class RescanCheckpoint(SQLModel, table=True):
+    """Progress of the report rescan for one version of the classification rules"""
+    __tablename__ = "rescan_checkpoint"
+
+    rules_version: str = Field(primary_key=True, max_length=16)
+    # Reports up to these IDs have been classified (live and archived tables)
+    report_through_id: int = 0
+    archive_through_id: int = 0
+    scanned: int = 0
+    dangerous: int = 0
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    completed_at: Optional[datetime] = None
@@ -0,0 +1,42 @@
+from typing import Optional
+from sqlalchemy import BigInteger, Column, LargeBinary
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class ReportFingerprint(SQLModel, table=True):
+    """MinHash signature of a near-duplicate cluster's representative report"""
+    __tablename__ = "report_fingerprint"
+
+    # The representative report's id, which is also the cluster id
+    report_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    # REPORT_DEDUP_NUM_PERM little-endian uint32 minimum hashes
+    signature: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Foreign Keys
+    terrorist_id: int = Field(foreign_key="terrorist.id", index=True)
+
+
+class ReportLshBand(SQLModel, table=True):
+    """LSH index entry: one hashed signature band of a representative report"""
+    __tablename__ = "report_lsh_band"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Hash of (terrorist, band number, band values); reports sharing a key are candidates
+    band_key: int = Field(sa_column=Column(BigInteger, nullable=False, index=True))
+    report_id: int = Field(index=True)
+
+
+class ReportDuplicate(SQLModel, table=True):
+    """A report linked to the cluster of an earlier near-duplicate"""
+    __tablename__ = "report_duplicate"
+
+    report_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    cluster_id: int = Field(index=True)
+    # Estimated Jaccard similarity to the cluster's representative
+    similarity: float
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Foreign Keys
+    terrorist_id: int = Field(foreign_key="terrorist.id", index=True)
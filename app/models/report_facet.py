@@ -0,0 +1,32 @@
+from sqlmodel import Field, SQLModel
+from datetime import date
+
+
+class ReportFacet(SQLModel, table=True):
+    """Report and terrorist counts per time bucket, affiliation and location (rollup)"""
+    __tablename__ = "report_facet"
+
+    # "day", "week", "month", or "all" (a single bucket for all time)
+    granularity: str = Field(primary_key=True, max_length=5)
+    bucket_start: date = Field(primary_key=True)
+    # "" when the terrorist has none (primary key columns can't be NULL)
+    affiliation: str = Field(default="", primary_key=True, max_length=100)
+    location: str = Field(default="", primary_key=True, max_length=100)
+    report_count: int = 0
+    # Distinct terrorists with reports in the bucket
+    terrorist_count: int = 0
+
+
+class TerroristFacet(SQLModel, table=True):
+    """Reports per terrorist and time bucket; tells when a terrorist enters or leaves a bucket"""
+    __tablename__ = "report_facet_terrorist"
+
+    granularity: str = Field(primary_key=True, max_length=5)
+    bucket_start: date = Field(primary_key=True)
+    # Copied from the terrorist, so range facets are read from this table alone
+    affiliation: str = Field(default="", max_length=100)
+    location: str = Field(default="", max_length=100)
+    report_count: int = 0
+
+    # Foreign Keys
+    terrorist_id: int = Field(foreign_key="terrorist.id", primary_key=True)
@@ -11,6 +11,10 @@ class Terrorist(SQLModel, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True, max_length=100)
+    # Normalized form of name (see terrorist_dal.normalize_terrorist_name),
+    # unique so concurrent get-or-create calls can't insert duplicates.
+    # Wider than name: casefold() can expand a character to up to three.
+    name_key: Optional[str] = Field(default=None, unique=True, index=True, max_length=300)
     affiliation: Optional[str] = Field(default=None, max_length=100)
     location: Optional[str] = Field(default=None, max_length=100)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,21 @@
+from sqlmodel import Field, SQLModel
+
+
+class ReportMention(SQLModel, table=True):
+    """A terrorist named in a report's content (other than the report's own terrorist)"""
+    __tablename__ = "report_mention"
+
+    report_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    mentioned_terrorist_id: int = Field(foreign_key="terrorist.id", primary_key=True, index=True)
+    # The report's own terrorist, so the co-occurrence counts can be undone on delete
+    terrorist_id: int = Field(foreign_key="terrorist.id", index=True)
+
+
+class TerroristLink(SQLModel, table=True):
+    """Co-occurrence edge: reports naming both terrorists (stored in both directions)"""
+    __tablename__ = "terrorist_link"
+
+    # The primary key doubles as the adjacency index: all links of a terrorist are one range scan
+    terrorist_id: int = Field(foreign_key="terrorist.id", primary_key=True)
+    linked_terrorist_id: int = Field(foreign_key="terrorist.id", primary_key=True)
+    report_count: int = 0
@@ -0,0 +1,37 @@
+from typing import Optional
+from sqlalchemy import Column, Double
+from sqlmodel import Field, SQLModel
+from datetime import datetime
+
+
+class TerroristScore(SQLModel, table=True):
+    """Danger score of a terrorist, kept up to date as reports are added and deleted"""
+    __tablename__ = "terrorist_score"
+
+    terrorist_id: int = Field(foreign_key="terrorist.id", primary_key=True)
+    # Sum of report weights decayed to the scoring epoch (see ScoringState.epoch).
+    # DOUBLE: a plain float is 4-byte FLOAT on MySQL, too coarse for summed increments
+    weighted_mass: float = Field(default=0.0, sa_column=Column(Double, nullable=False, default=0.0))
+    report_count: int = 0
+    distinct_agents: int = 0
+    # weighted_mass with the agent factor applied; current score = rank_value * decay since epoch
+    rank_value: float = Field(default=0.0, sa_column=Column(Double, nullable=False, default=0.0, index=True))
+
+
+class TerroristAgentCount(SQLModel, table=True):
+    """Reports per (terrorist, agent) pair, to keep distinct_agents exact"""
+    __tablename__ = "terrorist_agent_count"
+
+    terrorist_id: int = Field(foreign_key="terrorist.id", primary_key=True)
+    agent_id: int = Field(foreign_key="agent.id", primary_key=True)
+    report_count: int = 0
+
+
+class ScoringState(SQLModel, table=True):
+    """Single row: the epoch scores are expressed at and the weights they were computed with"""
+    __tablename__ = "scoring_state"
+
+    id: int = Field(default=1, primary_key=True, sa_column_kwargs={"autoincrement": False})
+    epoch: datetime
+    weights_fingerprint: str = Field(max_length=64)
+    recomputed_at: Optional[datetime] = None
@@ -0,0 +1,32 @@
+from typing import Optional
+from sqlalchemy import Column, Text
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class Watchlist(SQLModel, table=True):
+    """Watchlist - An agent's standing query, matched against every new report"""
+    __tablename__ = "watchlist"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(max_length=100)
+    # JSON lists; a report matches if it contains any keyword or is about any terrorist
+    keywords: str = Field(default="[]", sa_column=Column(Text, nullable=False))
+    terrorist_ids: str = Field(default="[]", sa_column=Column(Text, nullable=False))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Foreign Keys
+    agent_id: int = Field(foreign_key="agent.id", index=True)
+
+
+class WatchlistMatch(SQLModel, table=True):
+    """Watchlist match - A report that hit a watchlist when it was ingested"""
+    __tablename__ = "watchlist_match"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    watchlist_id: int = Field(foreign_key="watchlist.id", index=True)
+    # No foreign key: matches outlive the report moving to the archive (deleted with the report)
+    report_id: int = Field(index=True)
+    # JSON list of the keywords found ([] for a terrorist-only match)
+    matched_keywords: str = Field(default="[]", sa_column=Column(Text, nullable=False))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
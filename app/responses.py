@@ -0,0 +1,256 @@
+"""
+Fast JSON responses
+
+- FastJSONResponse: default response class, rendered with orjson when it is
+  installed (stdlib json otherwise).
+- Precompiled serializers for the hot response schemas: pydantic TypeAdapters
+  built once at import, dumping straight to JSON bytes. With
+  FAST_RESPONSES_SKIP_VALIDATION the schema objects are built with
+  model_construct (rows coming from our own DB are already typed), so each
+  payload is neither validated twice nor re-encoded by the stdlib encoder.
+- Content negotiation for list endpoints: clients sending
+  `Accept: application/msgpack` or `application/vnd.apache.arrow.stream`
+  get MessagePack or Arrow IPC bodies when `msgpack` / `pyarrow` is
+  installed, JSON otherwise.
+- stream_rows: NDJSON / CSV encoding of a server-side cursor, chunk by chunk,
+  for StreamingResponse bodies.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from typing import Any, Generic, Iterable, Iterator, List, Optional, Type, TypeVar
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from config import settings
+from app.schemas.agent_schemas import AgentResponse
+from app.schemas.report_schemas import ReportResponse, ReportSearchResponse
+from app.schemas.terrorist_schemas import TerroristResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # optional dependency
+    pyarrow = None
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def json_default(value: Any) -> Any:
+    """Encode values JSON has no type for: ISO 8601 dates and times (as orjson does), str otherwise"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize JSON-compatible content (plus datetimes, decimals, ...) to compact UTF-8 bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"), default=json_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200, headers: dict = None) -> Response:
+    """Wrap already-serialized JSON bytes in a response"""
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+_FORMAT_MEDIA_TYPES = {
+    "json": JSON_MEDIA_TYPE,
+    "msgpack": MSGPACK_MEDIA_TYPE,
+    "arrow": ARROW_MEDIA_TYPE,
+}
+_ACCEPTED_MEDIA_TYPES = {
+    MSGPACK_MEDIA_TYPE: "msgpack",
+    "application/x-msgpack": "msgpack",
+    ARROW_MEDIA_TYPE: "arrow",
+}
+
+
+def available_formats() -> List[str]:
+    formats = ["json"]
+    if msgpack is not None:
+        formats.append("msgpack")
+    if pyarrow is not None:
+        formats.append("arrow")
+    return formats
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Pick the list-response format for an Accept header ("json" by default)"""
+    if not accept:
+        return "json"
+    formats = available_formats()
+    for media_range in accept.split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in (JSON_MEDIA_TYPE, "*/*", "application/*"):
+            return "json"
+        response_format = _ACCEPTED_MEDIA_TYPES.get(media_type)
+        if response_format in formats:
+            return response_format
+    return "json"
+
+
+def media_type_for(response_format: str) -> str:
+    return _FORMAT_MEDIA_TYPES[response_format]
+
+
+def encode_rows(rows: List[dict], response_format: str) -> bytes:
+    """Encode a list of flat JSON-compatible dicts in the negotiated format"""
+    if response_format == "msgpack":
+        return msgpack.packb(rows, use_bin_type=True)
+    if response_format == "arrow":
+        table = pyarrow.Table.from_pylist(rows)
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return dumps(rows)
+
+
+def rows_response(rows: List[dict], response_format: str = "json", status_code: int = 200, headers: dict = None) -> Response:
+    """Response for a list of rows in the negotiated format"""
+    return Response(
+        content=encode_rows(rows, response_format),
+        status_code=status_code,
+        media_type=media_type_for(response_format),
+        headers=headers,
+    )
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+
+def _encode_ndjson_batch(columns, rows) -> bytes:
+    return b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def _csv_value(value: Any) -> Any:
+    # ISO 8601 like the NDJSON output, rather than str()'s space-separated form
+    return json_default(value) if isinstance(value, (datetime, date, time)) else value
+
+
+def _encode_csv_rows(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def stream_rows(
+    stream,
+    output_format: str,
+    batch_size: int,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Encode rows from a server-side cursor (sql_dal.StreamingQuery) chunk by chunk
+    
+    Only one batch is held in memory at a time. Stops at max_rows / max_bytes
+    when given and marks the output as truncated (a final
+    {"__truncated__": reason} line, or a "# truncated" CSV line).
+    Closes the stream when done.
+    """
+    columns = stream.columns
+    sent_rows = 0
+    sent_bytes = 0
+    truncated = None
+    try:
+        if output_format == "csv":
+            header = _encode_csv_rows([columns])
+            sent_bytes += len(header)
+            yield header
+        
+        for rows in stream.iter_batches(batch_size):
+            if max_rows is not None and sent_rows + len(rows) > max_rows:
+                rows = rows[:max_rows - sent_rows]
+                truncated = "max_rows"
+            if output_format == "csv":
+                chunk = _encode_csv_rows(rows)
+            else:
+                chunk = _encode_ndjson_batch(columns, rows)
+            if max_bytes is not None and sent_bytes + len(chunk) > max_bytes:
+                truncated = "max_bytes"
+                break
+            sent_rows += len(rows)
+            sent_bytes += len(chunk)
+            yield chunk
+            if truncated:
+                break
+        
+        if truncated:
+            if output_format == "csv":
+                yield f"# truncated: {truncated} (rows={sent_rows})\n".encode("utf-8")
+            else:
+                yield dumps({"__truncated__": truncated, "rows": sent_rows}) + b"\n"
+    finally:
+        stream.close()
+
+
+class PrecompiledSerializer(Generic[SchemaT]):
+    """Serializer for one response schema, compiled once"""
+
+    def __init__(self, schema: Type[SchemaT]):
+        self.schema = schema
+        self.fields = tuple(schema.model_fields)
+        self._one = TypeAdapter(schema)
+        self._many = TypeAdapter(List[schema])
+
+    def build(self, obj: Any) -> SchemaT:
+        """Build the schema object from an ORM row (or any attribute holder)"""
+        if isinstance(obj, self.schema):
+            return obj
+        if settings.FAST_RESPONSES_SKIP_VALIDATION:
+            return self.schema.model_construct(**{field: getattr(obj, field, None) for field in self.fields})
+        return self.schema.model_validate(obj, from_attributes=True)
+
+    def dump(self, obj: Any) -> bytes:
+        return self._one.dump_json(self.build(obj))
+
+    def dump_many(self, objs: Iterable[Any]) -> bytes:
+        return self._many.dump_json([self.build(obj) for obj in objs])
+
+    def to_python(self, objs: Iterable[Any]) -> List[dict]:
+        """JSON-compatible dicts, for embedding in a larger payload"""
+        return self._many.dump_python([self.build(obj) for obj in objs], mode="json")
+
+    def response(self, obj: Any, status_code: int = 200) -> Response:
+        return json_bytes_response(self.dump(obj), status_code)
+
+    def list_response(self, objs: Iterable[Any], status_code: int = 200, response_format: str = "json") -> Response:
+        if response_format == "json":
+            return json_bytes_response(self.dump_many(objs), status_code)
+        return rows_response(self.to_python(objs), response_format, status_code)
+
+
+agent_serializer = PrecompiledSerializer(AgentResponse)
+terrorist_serializer = PrecompiledSerializer(TerroristResponse)
+report_serializer = PrecompiledSerializer(ReportResponse)
+report_search_serializer = PrecompiledSerializer(ReportSearchResponse)
@@ -6,6 +6,11 @@ from app.routes.agents_routes import router as agents_router
 from app.routes.terrorists_routes import router as terrorists_router
 from app.routes.reports_routes import router as reports_router
 from app.routes.sql_routes import router as sql_router
+from app.routes.exports_routes import router as exports_router
+from app.routes.feed_routes import router as feed_router
+from app.routes.changes_routes import router as changes_router
+from app.routes.watchlists_routes import router as watchlists_router
+from app.routes.analytics_routes import router as analytics_router
 
 api_router = APIRouter()
 
@@ -13,3 +18,8 @@ api_router.include_router(agents_router, prefix="/agents", tags=["agents"])
 api_router.include_router(terrorists_router, prefix="/terrorists", tags=["terrorists"])
 api_router.include_router(reports_router, prefix="/reports", tags=["reports"])
 api_router.include_router(sql_router, prefix="/sql", tags=["sql"])
+api_router.include_router(exports_router, prefix="/exports", tags=["exports"])
+api_router.include_router(feed_router, prefix="/feed", tags=["feed"])
+api_router.include_router(changes_router, prefix="/changes", tags=["changes"])
+api_router.include_router(watchlists_router, prefix="/watchlists", tags=["watchlists"])
+api_router.include_router(analytics_router, prefix="/analytics", tags=["analytics"])
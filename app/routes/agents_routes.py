@@ -4,6 +4,7 @@ Agent endpoint routes
 from fastapi import APIRouter, HTTPException, status
 from app.schemas.agent_schemas import AgentCreate, AgentLogin, AgentResponse
 from app.services import agent_service
+from app.responses import agent_serializer
 
 router = APIRouter()
 
@@ -23,7 +24,7 @@ def register_agent_endpoint(agent_data: AgentCreate):
             username=agent_data.username,
             password=agent_data.password
         )
-        return AgentResponse.model_validate(agent)
+        return agent_serializer.response(agent, status_code=201)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,7 +55,7 @@ def login_agent_endpoint(login_data: AgentLogin):
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid username or password"
             )
-        return AgentResponse.model_validate(agent)
+        return agent_serializer.response(agent)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,52 @@
+"""
+Analytics endpoint routes (aggregates served from rollup tables)
+"""
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from app.schemas.analytics_schemas import FacetsResponse
+from app.services import facet_service
+
+router = APIRouter()
+
+
+@router.get("/facets", response_model=FacetsResponse)
+def get_facets_endpoint(
+    granularity: Literal["day", "week", "month"] = Query("day", description="Time bucket size"),
+    start: Optional[date] = Query(None, description="Only buckets containing or after this date"),
+    end: Optional[date] = Query(None, description="Only buckets starting on or before this date"),
+    affiliation: Optional[str] = Query(None, description="Only terrorists with this affiliation"),
+    location: Optional[str] = Query(None, description="Only terrorists in this location"),
+    limit: Optional[int] = Query(None, ge=1, description="Values per facet (default REPORT_FACETS_MAX_VALUES)")
+):
+    """
+    Get report and terrorist counts by affiliation, location and time bucket
+    
+    Read from rollup tables maintained as reports are created and deleted,
+    so the cost doesn't grow with the number of reports. Terrorist counts
+    are distinct terrorists with at least one report in the range / bucket.
+    """
+    try:
+        return facet_service.get_facets(
+            granularity=granularity,
+            start=start,
+            end=end,
+            affiliation=affiliation,
+            location=location,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve facets: {str(e)}"
+        )
@@ -0,0 +1,40 @@
+"""
+Change log routes (incremental downstream sync)
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from app.schemas.change_schemas import ChangesResponse
+from app.services import change_log_service
+
+router = APIRouter()
+
+
+@router.get("", response_model=ChangesResponse)
+def get_changes_endpoint(
+    after: int = Query(0, ge=0, description="Last seq already applied (0 = from the beginning)"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum records (capped at CHANGE_LOG_MAX_PAGE_SIZE)"),
+):
+    """
+    Get creates and deletes of agents, terrorists and reports after a cursor
+    
+    Records come in seq order. Apply them, then call again with
+    after=next_after; has_more tells whether another page is waiting.
+    Responds 410 when the cursor is older than the retained change log.
+    """
+    try:
+        return change_log_service.get_changes(after=after, limit=limit)
+    except change_log_service.ChangeCursorExpired as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read changes: {str(e)}"
+        )
@@ -0,0 +1,50 @@
+"""
+Export endpoint routes
+"""
+from fastapi import APIRouter, HTTPException, Query, status
+from app.schemas.export_schemas import ParquetSnapshotResponse, ParquetWatermarksResponse
+from app.services import parquet_export_service
+
+router = APIRouter()
+
+
+@router.post("/parquet", response_model=ParquetSnapshotResponse)
+def export_parquet_snapshot_endpoint(
+    incremental: bool = Query(True, description="Only append rows newer than the last watermark")
+):
+    """
+    Write agents, terrorists, reports and archived reports to Parquet, partitioned by created_at month
+    
+    Files go to the server's PARQUET_EXPORT_DIR. Incremental snapshots only
+    add rows past the previous snapshot's watermarks (ids; archived_at for
+    archived reports); a full snapshot (incremental=false) replaces the dataset.
+    """
+    try:
+        return parquet_export_service.export_parquet_snapshot(incremental=incremental)
+    except NotImplementedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(e)
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Parquet export failed: {str(e)}"
+        )
+
+
+@router.get("/parquet", response_model=ParquetWatermarksResponse)
+def get_parquet_watermarks_endpoint():
+    """Get the watermarks of the last Parquet snapshot"""
+    try:
+        return {"watermarks": parquet_export_service.load_watermarks()}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read watermarks: {str(e)}"
+        )
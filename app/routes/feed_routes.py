@@ -0,0 +1,128 @@
+"""
+Report feed routes (Server-Sent Events and WebSocket)
+"""
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from config import settings
+from app.responses import dumps
+from app.services.report_feed_service import get_feed_hub
+
+router = APIRouter()
+
+# WebSocket close code for "try again later" (subscriber dropped or limit reached)
+WS_TRY_AGAIN_LATER = 1013
+
+
+def _sse_message(event: dict) -> bytes:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: ".encode("utf-8") + dumps(event) + b"\n\n"
+
+
+@router.get("/reports/sse")
+async def report_feed_sse_endpoint(
+    request: Request,
+    terrorist_id: Optional[int] = Query(None, description="Only reports about this terrorist"),
+    agent_id: Optional[int] = Query(None, description="Only reports written by this agent"),
+    keyword: Optional[str] = Query(None, description="Only reports containing this keyword"),
+    watchlist_id: Optional[int] = Query(None, description="Instead: watchlist.match events of this watchlist"),
+):
+    """
+    Stream report.created / report.deleted events as Server-Sent Events
+    
+    With watchlist_id, the stream carries that watchlist's watchlist.match
+    notifications instead.
+    
+    A comment line is sent every REPORT_FEED_HEARTBEAT_SECONDS to keep the
+    connection alive. A subscriber that falls too far behind receives a
+    `dropped` event and the stream ends; reconnect to resume.
+    """
+    hub = get_feed_hub()
+    try:
+        subscription = hub.subscribe(
+            terrorist_id=terrorist_id, agent_id=agent_id, keyword=keyword, watchlist_id=watchlist_id
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    async def event_stream():
+        try:
+            yield b": connected\n\n"
+            while True:
+                events = await subscription.next_events(settings.REPORT_FEED_HEARTBEAT_SECONDS)
+                if subscription.dropped:
+                    yield b"event: dropped\ndata: {\"reason\": \"slow consumer\"}\n\n"
+                    return
+                if not events:
+                    if await request.is_disconnected():
+                        return
+                    yield b": heartbeat\n\n"
+                    continue
+                yield b"".join(_sse_message(event) for event in events)
+        finally:
+            hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Read (and ignore) client messages until the client goes away"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/reports/ws")
+async def report_feed_ws_endpoint(
+    websocket: WebSocket,
+    terrorist_id: Optional[int] = None,
+    agent_id: Optional[int] = None,
+    keyword: Optional[str] = None,
+    watchlist_id: Optional[int] = None,
+):
+    """
+    Push report.created / report.deleted (or, with watchlist_id,
+    watchlist.match) events over a WebSocket as JSON
+    
+    Closed with code 1013 (try again later) when the subscriber falls too
+    far behind or the subscriber limit is reached. Messages from the client
+    are ignored; reading them is how a disconnect is noticed while the feed
+    is idle.
+    """
+    hub = get_feed_hub()
+    try:
+        subscription = hub.subscribe(
+            terrorist_id=terrorist_id, agent_id=agent_id, keyword=keyword, watchlist_id=watchlist_id
+        )
+    except RuntimeError as e:
+        await websocket.close(code=WS_TRY_AGAIN_LATER, reason=str(e))
+        return
+    
+    await websocket.accept()
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_events = asyncio.ensure_future(subscription.next_events(settings.REPORT_FEED_HEARTBEAT_SECONDS))
+            await asyncio.wait({next_events, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_events.cancel()
+                return
+            events = next_events.result()
+            if subscription.dropped:
+                await websocket.close(code=WS_TRY_AGAIN_LATER, reason="slow consumer")
+                return
+            for event in events:
+                await websocket.send_text(dumps(event).decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        hub.unsubscribe(subscription)
@@ -1,19 +1,85 @@
 """
 Report endpoint routes
 """
-from typing import List
-from fastapi import APIRouter, Query, HTTPException, status
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Literal, Optional
+from fastapi import APIRouter, Query, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from config import settings
 from app.schemas.report_schemas import (
     ReportCreate,
     ReportResponse,
     ReportSearchResponse,
     DangerousTerroristResponse,
+    TrendingTerroristResponse,
+    RankedTerroristResponse,
+    ReportClusterResponse,
+)
+from app.services import report_service, response_cache_service, trending_service, scoring_service, dedup_service
+from app.services.dedup_service import DuplicateReportError
+from app.responses import (
+    CSV_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    encode_rows,
+    media_type_for,
+    negotiate_format,
+    report_serializer,
+    report_search_serializer,
+    stream_rows,
 )
-from app.services import report_service
 
 router = APIRouter()
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+
+def _cached_list_response(
+    request: Request,
+    endpoint: str,
+    params: Dict[str, Any],
+    compute: Callable[[], List[dict]],
+) -> Response:
+    """
+    Serve a list response from the data-versioned response cache
+    
+    The body format (JSON, MessagePack or Arrow) is negotiated from the
+    Accept header and is part of the cache key / ETag. Returns 304 Not
+    Modified without touching the DB when the client's If-None-Match
+    matches the current data version.
+    """
+    response_format = negotiate_format(request.headers.get("accept"))
+    params = {**params, "format": response_format}
+    etag = response_cache_service.current_etag(endpoint, params)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    etag, body = response_cache_service.get_or_compute(
+        endpoint, params, compute, encode=lambda rows: encode_rows(rows, response_format)
+    )
+    headers["ETag"] = etag
+    return Response(content=body, media_type=media_type_for(response_format), headers=headers)
+
+
+def _to_dangerous_response(terrorist, report_count: int) -> DangerousTerroristResponse:
+    """Build a DangerousTerroristResponse from a (Terrorist, report_count) pair"""
+    return DangerousTerroristResponse(
+        terrorist_id=terrorist.id,
+        terrorist_name=terrorist.name,
+        affiliation=terrorist.affiliation,
+        location=terrorist.location,
+        report_count=report_count,
+    )
+
+
 @router.post("/", response_model=ReportResponse, status_code=201)
 def create_report_endpoint(report_data: ReportCreate):
     """
@@ -22,6 +88,9 @@ def create_report_endpoint(report_data: ReportCreate):
     - **content**: Content of the intelligence report
     - **agent_id**: ID of the agent creating the report
     - **terrorist_id**: ID of the terrorist being reported on
+    
+    With REPORT_DEDUP_MODE=reject, a near-duplicate of an earlier report
+    about the same terrorist is refused with 409.
     """
     try:
         report = report_service.create_report(
@@ -29,7 +98,12 @@ def create_report_endpoint(report_data: ReportCreate):
             agent_id=report_data.agent_id,
             terrorist_id=report_data.terrorist_id
         )
-        return ReportResponse.model_validate(report)
+        return report_serializer.response(report, status_code=201)
+    except DuplicateReportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -79,16 +153,23 @@ def delete_report_endpoint(
 
 @router.get("/search/text", response_model=List[ReportSearchResponse])
 def search_reports_by_text_endpoint(
-    keyword: str = Query(..., description="Keyword to search for in report content")
+    request: Request,
+    keyword: str = Query(..., description="Keyword to search for in report content"),
+    include_archive: bool = Query(False, description="Also search archived reports")
 ):
     """
     Search reports by keyword in content
     
+    Responds with MessagePack or Arrow IPC when requested via Accept.
+    
     - **keyword**: Keyword to search for
+    - **include_archive**: Also search archived reports (slower)
     """
     try:
-        reports = report_service.search_reports_by_text(keyword)
-        return [ReportSearchResponse.model_validate(r) for r in reports]
+        reports = report_service.search_reports_by_text(keyword, include_archive)
+        return report_search_serializer.list_response(
+            reports, response_format=negotiate_format(request.headers.get("accept"))
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -96,20 +177,73 @@ def search_reports_by_text_endpoint(
         )
 
 
+@router.get("/export")
+def export_reports_endpoint(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Output format"),
+    agent_id: Optional[int] = Query(None, description="Only reports written by this agent"),
+    terrorist_id: Optional[int] = Query(None, description="Only reports about this terrorist"),
+    created_from: Optional[datetime] = Query(None, description="Only reports created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only reports created before this time"),
+    keyword: Optional[str] = Query(None, description="Only reports containing this keyword"),
+    dangerous_only: bool = Query(False, description="Only reports containing weapon keywords"),
+    include_names: bool = Query(False, description="Add terrorist_name and agent_name"),
+):
+    """
+    Stream reports as NDJSON or CSV, ordered by report ID
+    
+    Rows are read through a server-side cursor and encoded batch by batch,
+    so memory stays flat whatever the export size and output starts
+    immediately.
+    """
+    try:
+        stream = report_service.open_report_export(
+            agent_id=agent_id,
+            terrorist_id=terrorist_id,
+            created_from=created_from,
+            created_to=created_to,
+            keyword=keyword,
+            dangerous_only=dangerous_only,
+            include_names=include_names,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Export failed: {str(e)}"
+        )
+    
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        stream_rows(stream, format, settings.REPORT_EXPORT_BATCH_SIZE),
+        media_type=CSV_MEDIA_TYPE if format == "csv" else NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="reports.{extension}"'},
+        # Also closes the cursor if the client disconnects before streaming starts
+        background=BackgroundTask(stream.close),
+    )
+
+
 @router.get("/search/terrorist/{terrorist_id}")
-def search_reports_by_terrorist_endpoint(terrorist_id: int):
+def search_reports_by_terrorist_endpoint(
+    terrorist_id: int,
+    include_archive: bool = Query(False, description="Include archived reports in the list")
+):
     """
     Search reports by terrorist ID
     
-    Returns total count and first 5 reports
+    Returns total count (archived reports included) and first 5 reports
     
     - **terrorist_id**: ID of the terrorist
+    - **include_archive**: Fill the list with archived reports too
     """
     try:
-        result = report_service.search_reports_by_terrorist(terrorist_id)
+        result = report_service.search_reports_by_terrorist(terrorist_id, include_archive)
         return {
             "total_count": result["total_count"],
-            "reports": [ReportSearchResponse.model_validate(r) for r in result["reports"]]
+            "reports": report_search_serializer.to_python(result["reports"])
         }
     except Exception as e:
         raise HTTPException(
@@ -119,15 +253,28 @@ def search_reports_by_terrorist_endpoint(terrorist_id: int):
 
 
 @router.get("/dangerous", response_model=List[DangerousTerroristResponse])
-def get_dangerous_terrorists_endpoint():
+def get_dangerous_terrorists_endpoint(
+    request: Request,
+    count_clusters: bool = Query(False, description="Count near-duplicate clusters instead of raw reports")
+):
     """
     Get dangerous terrorists (more than 5 reports)
     
-    Returns list of terrorists with their report counts
+    Returns list of terrorists with their report counts.
+    Supports ETag / If-None-Match (304 when no report was added or deleted)
+    and MessagePack / Arrow IPC bodies via Accept.
     """
     try:
-        terrorists = report_service.get_dangerous_terrorists()
-        return [DangerousTerroristResponse.model_validate(t) for t in terrorists]
+        return _cached_list_response(
+            request,
+            "dangerous",
+            {"count_clusters": count_clusters},
+            lambda: jsonable_encoder([
+                _to_dangerous_response(terrorist, report_count)
+                for terrorist, report_count
+                in report_service.get_dangerous_terrorists(count_clusters=count_clusters)
+            ]),
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -135,20 +282,136 @@ def get_dangerous_terrorists_endpoint():
         )
 
 
+@router.get("/trending", response_model=List[TrendingTerroristResponse])
+def get_trending_terrorists_endpoint(
+    window: Literal["1h", "24h", "7d"] = Query("24h", description="Sliding window"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum terrorists to return")
+):
+    """
+    Get the terrorists with the most new reports in a sliding window
+    
+    Served from in-memory time-bucketed counters (no reports table scan),
+    so sudden spikes in activity show up right away.
+    """
+    try:
+        return [
+            TrendingTerroristResponse(
+                terrorist_id=terrorist.id,
+                terrorist_name=terrorist.name,
+                affiliation=terrorist.affiliation,
+                location=terrorist.location,
+                report_count=report_count,
+                max_overestimate=max_overestimate,
+            )
+            for terrorist, report_count, max_overestimate
+            in trending_service.get_trending_terrorists(window, limit)
+        ]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve trending terrorists: {str(e)}"
+        )
+
+
+@router.get("/ranked", response_model=List[RankedTerroristResponse])
+def get_ranked_terrorists_endpoint(
+    limit: int = Query(10, ge=1, le=100, description="Maximum terrorists to return")
+):
+    """
+    Get the terrorists with the highest danger score
+    
+    Reports count by keyword weight and decay with age; terrorists reported
+    by more distinct agents score higher. Served from the score index, which
+    is kept up to date as reports are created and deleted.
+    """
+    try:
+        return [
+            RankedTerroristResponse(
+                terrorist_id=terrorist.id,
+                terrorist_name=terrorist.name,
+                affiliation=terrorist.affiliation,
+                location=terrorist.location,
+                score=score,
+                report_count=report_count,
+                distinct_agents=distinct_agents,
+            )
+            for terrorist, score, report_count, distinct_agents
+            in scoring_service.get_ranked_terrorists(limit)
+        ]
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve ranked terrorists: {str(e)}"
+        )
+
+
 @router.get("/super-dangerous", response_model=List[DangerousTerroristResponse])
-def get_super_dangerous_terrorists_endpoint():
+def get_super_dangerous_terrorists_endpoint(
+    request: Request,
+    count_clusters: bool = Query(False, description="Count near-duplicate clusters instead of raw reports")
+):
     """
     Get super dangerous terrorists
     
     Criteria: >10 reports AND contains weapon keywords (פיגוע, סכין, רובה, אקדח, פצצה)
     
-    Returns list of terrorists with their report counts
+    Returns list of terrorists with their report counts.
+    Supports ETag / If-None-Match (304 when no report was added or deleted)
+    and MessagePack / Arrow IPC bodies via Accept.
     """
     try:
-        terrorists = report_service.get_super_dangerous_terrorists()
-        return [DangerousTerroristResponse.model_validate(t) for t in terrorists]
+        return _cached_list_response(
+            request,
+            "super-dangerous",
+            {"count_clusters": count_clusters},
+            lambda: jsonable_encoder([
+                _to_dangerous_response(terrorist, report_count)
+                for terrorist, report_count
+                in report_service.get_super_dangerous_terrorists(count_clusters=count_clusters)
+            ]),
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve super dangerous terrorists: {str(e)}"
         )
+
+
+@router.get("/{report_id}/cluster", response_model=ReportClusterResponse)
+def get_report_cluster_endpoint(report_id: int):
+    """
+    Get the near-duplicate cluster a report belongs to
+    
+    The cluster is identified by its first report; the others were linked
+    to it at ingest (REPORT_DEDUP_MODE=link).
+    """
+    try:
+        cluster = dedup_service.get_report_cluster(report_id)
+        if cluster is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Report {report_id} is not in a near-duplicate cluster"
+            )
+        return cluster
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve report cluster: {str(e)}"
+        )
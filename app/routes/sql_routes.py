@@ -1,60 +1,278 @@
 """
 SQL endpoint routes
 """
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
+import time
+from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlmodel import Session, text
+from config import settings
 from db.database import get_engine
+from app.dal import sql_dal
+from app.responses import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, stream_rows
+from app.schemas.sql_schemas import (
+    SQLQuery,
+    SQLStreamQuery,
+    SQLJobCreate,
+    SQLJobResponse,
+    SQLJobResultsResponse,
+)
+from app.services.sql_job_service import get_job_manager
+from app.services import sql_advisor_service, sql_result_cache_service
+from app.services.response_cache_service import bump_data_version
 
 router = APIRouter()
 
 
-class SQLQuery(BaseModel):
-    """Schema for SQL query"""
-    query: str
+def _execute_sql(query: str) -> dict:
+    """Run a raw SQL statement and build the /execute response payload"""
+    engine = get_engine()
+    started = time.perf_counter()
+    with Session(engine) as session:
+        result = session.execute(text(query))
+        sql_advisor_service.record_query_time(query, 1000 * (time.perf_counter() - started))
+        
+        # Try to fetch results (for SELECT queries)
+        try:
+            rows = result.fetchall()
+            # Convert rows to list of dicts
+            if rows:
+                columns = result.keys()
+                results = [dict(zip(columns, row)) for row in rows]
+                return {
+                    "success": True,
+                    "row_count": len(results),
+                    "results": results
+                }
+            else:
+                return {
+                    "success": True,
+                    "message": "Query executed successfully (no results)"
+                }
+        except Exception:
+            # For non-SELECT queries (INSERT, UPDATE, DELETE, etc.)
+            session.commit()
+            # Raw writes may change anything: invalidate version-keyed caches
+            bump_data_version()
+            return {
+                "success": True,
+                "message": "Query executed successfully"
+            }
 
 
 @router.post("/execute")
-def execute_sql_endpoint(sql_data: SQLQuery):
+def execute_sql_endpoint(sql_data: SQLQuery, request: Request):
     """
     Execute a raw SQL query
     
     **WARNING**: This endpoint is for development/admin use only.
     It can execute any SQL query, including destructive operations.
     
+    Results of read-only, deterministic SELECTs are cached until the data
+    changes; send `Cache-Control: no-cache` to force re-execution. The
+    `X-Cache` response header reports HIT, MISS or BYPASS.
+    
     - **query**: SQL query to execute
     """
     try:
-        engine = get_engine()
-        with Session(engine) as session:
-            result = session.execute(text(sql_data.query))
-            
-            # Try to fetch results (for SELECT queries)
-            try:
-                rows = result.fetchall()
-                # Convert rows to list of dicts
-                if rows:
-                    columns = result.keys()
-                    results = [dict(zip(columns, row)) for row in rows]
-                    return {
-                        "success": True,
-                        "row_count": len(results),
-                        "results": results
-                    }
-                else:
-                    return {
-                        "success": True,
-                        "message": "Query executed successfully (no results)"
-                    }
-            except Exception:
-                # For non-SELECT queries (INSERT, UPDATE, DELETE, etc.)
-                session.commit()
-                return {
-                    "success": True,
-                    "message": "Query executed successfully"
-                }
+        if sql_result_cache_service.is_cacheable(sql_data.query):
+            bypass = "no-cache" in request.headers.get("cache-control", "").lower()
+            cache_status, body = sql_result_cache_service.get_or_execute(
+                sql_data.query, lambda: _execute_sql(sql_data.query), bypass
+            )
+            return Response(content=body, media_type="application/json", headers={"X-Cache": cache_status})
+        return _execute_sql(sql_data.query)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"SQL execution failed: {str(e)}"
+        )
+
+
+@router.post("/execute/stream")
+def execute_sql_stream_endpoint(sql_data: SQLStreamQuery):
+    """
+    Execute a raw SELECT and stream the rows as NDJSON or CSV
+    
+    Rows are read through a server-side cursor and sent in chunks, so large
+    results never sit in worker memory. Output is capped by max rows, max
+    bytes and a statement timeout (see SQL_STREAM_* settings).
+    
+    - **query**: SELECT query to execute
+    - **format**: "ndjson" (default) or "csv"
+    - **max_rows**: Optional row cap (at most SQL_STREAM_MAX_ROWS)
+    """
+    max_rows = min(sql_data.max_rows or settings.SQL_STREAM_MAX_ROWS, settings.SQL_STREAM_MAX_ROWS)
+    started = time.perf_counter()
+    try:
+        stream = sql_dal.open_streaming_query(sql_data.query, settings.SQL_STATEMENT_TIMEOUT_MS)
+        sql_advisor_service.record_query_time(sql_data.query, 1000 * (time.perf_counter() - started))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"SQL execution failed: {str(e)}"
         )
+    
+    media_type = CSV_MEDIA_TYPE if sql_data.format == "csv" else NDJSON_MEDIA_TYPE
+    return StreamingResponse(
+        stream_rows(
+            stream, sql_data.format, settings.SQL_STREAM_BATCH_SIZE, max_rows, settings.SQL_STREAM_MAX_BYTES
+        ),
+        media_type=media_type,
+        # Also closes the cursor if the client disconnects before streaming starts
+        background=BackgroundTask(stream.close),
+    )
+
+
+@router.post("/jobs", response_model=SQLJobResponse, status_code=202)
+def submit_sql_job_endpoint(job_data: SQLJobCreate):
+    """
+    Submit a long-running SELECT as a background job
+    
+    Returns immediately with a job id; poll GET /sql/jobs/{job_id} and page
+    through GET /sql/jobs/{job_id}/results.
+    
+    - **query**: SELECT query to execute
+    - **max_rows**: Optional row cap (at most SQL_STREAM_MAX_ROWS)
+    """
+    try:
+        job = get_job_manager().submit(job_data.query, job_data.max_rows)
+        return SQLJobResponse(**job.to_dict())
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+        )
+
+
+@router.get("/jobs", response_model=List[SQLJobResponse])
+def list_sql_jobs_endpoint():
+    """List known SQL jobs (newest first)"""
+    return [SQLJobResponse(**job.to_dict()) for job in get_job_manager().list_jobs()]
+
+
+@router.get("/jobs/{job_id}", response_model=SQLJobResponse)
+def get_sql_job_endpoint(job_id: str):
+    """
+    Get the status of a SQL job
+    
+    - **job_id**: ID returned on submit
+    """
+    job = get_job_manager().get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"SQL job {job_id} not found"
+        )
+    return SQLJobResponse(**job.to_dict())
+
+
+@router.get("/jobs/{job_id}/results", response_model=SQLJobResultsResponse)
+def get_sql_job_results_endpoint(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Index of the first row"),
+    limit: int = Query(100, ge=1, le=10000, description="Maximum rows to return")
+):
+    """
+    Get a page of a SQL job's spooled results
+    
+    Rows already spooled can be read while the job is still running.
+    
+    - **job_id**: ID returned on submit
+    - **offset**: Index of the first row
+    - **limit**: Maximum rows to return
+    """
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"SQL job {job_id} not found"
+        )
+    if job.status == "failed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"SQL job failed: {job.error}"
+        )
+    return SQLJobResultsResponse(
+        job_id=job.id,
+        status=job.status,
+        offset=offset,
+        limit=limit,
+        row_count=job.row_count,
+        results=manager.read_results(job, offset, limit),
+    )
+
+
+@router.delete("/jobs/{job_id}", response_model=SQLJobResponse)
+def cancel_sql_job_endpoint(job_id: str):
+    """
+    Cancel a queued or running SQL job
+    
+    - **job_id**: ID returned on submit
+    """
+    job = get_job_manager().cancel(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"SQL job {job_id} not found"
+        )
+    return SQLJobResponse(**job.to_dict())
+
+
+@router.post("/explain")
+def explain_sql_endpoint(sql_data: SQLQuery):
+    """
+    Show the execution plan of a SELECT without running it
+    
+    Flags full scans, filesorts and temporary tables on report/terrorist/agent
+    and suggests composite indexes that would avoid them.
+    
+    - **query**: SELECT query to explain
+    """
+    try:
+        return sql_advisor_service.explain(sql_data.query)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"EXPLAIN failed: {str(e)}"
+        )
+
+
+@router.get("/slow-queries")
+def get_slow_queries_endpoint():
+    """
+    Admin SQL statements slower than SQL_SLOW_QUERY_MS
+    
+    Grouped by normalized statement (literals replaced) and ordered by total time.
+    """
+    return sql_advisor_service.get_slow_queries()
+
+
+@router.get("/slow-queries/analysis")
+def analyze_slow_queries_endpoint():
+    """
+    EXPLAIN every slow SELECT and aggregate the findings
+    
+    Returns plan issues per (table, issue) and index suggestions, both
+    weighted by the total time of the affected statements.
+    """
+    try:
+        return sql_advisor_service.analyze_slow_queries()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Slow query analysis failed: {str(e)}"
+        )
@@ -1,9 +1,16 @@
 """
 Terrorist endpoint routes
 """
-from fastapi import APIRouter, HTTPException, status
-from app.schemas.terrorist_schemas import TerroristCreate, TerroristResponse
-from app.services import terrorist_service
+from fastapi import APIRouter, HTTPException, Query, status
+from config import settings
+from app.schemas.terrorist_schemas import (
+    TerroristCreate,
+    TerroristResponse,
+    TerroristNetworkResponse,
+    NetworkNodeResponse,
+)
+from app.services import terrorist_service, entity_link_service
+from app.responses import terrorist_serializer
 
 router = APIRouter()
 
@@ -23,7 +30,12 @@ def create_terrorist_endpoint(terrorist_data: TerroristCreate):
             affiliation=terrorist_data.affiliation,
             location=terrorist_data.location
         )
-        return TerroristResponse.model_validate(terrorist)
+        return terrorist_serializer.response(terrorist, status_code=201)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -45,7 +57,7 @@ def get_terrorist_endpoint(terrorist_id: int):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Terrorist with ID {terrorist_id} not found"
             )
-        return TerroristResponse.model_validate(terrorist)
+        return terrorist_serializer.response(terrorist)
     except HTTPException:
         raise
     except Exception as e:
@@ -53,3 +65,55 @@ def get_terrorist_endpoint(terrorist_id: int):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve terrorist: {str(e)}"
         )
+
+
+@router.get("/{terrorist_id}/network", response_model=TerroristNetworkResponse)
+def get_terrorist_network_endpoint(
+    terrorist_id: int,
+    depth: int = Query(1, ge=1, le=settings.ENTITY_LINK_MAX_DEPTH, description="Maximum hops from this terrorist"),
+    min_reports: int = Query(1, ge=1, description="Only links seen in at least this many reports"),
+    max_nodes: int = Query(
+        settings.ENTITY_LINK_MAX_NODES, ge=1, le=settings.ENTITY_LINK_MAX_NODES, description="Maximum terrorists returned"
+    )
+):
+    """
+    Get the co-occurrence network around a terrorist
+    
+    Two terrorists are linked when a report about one names the other in
+    its content, or a report names both. Links are counted at ingest, so
+    the graph is read from the link table's adjacency index.
+    """
+    try:
+        if not terrorist_service.get_terrorist_by_id(terrorist_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Terrorist with ID {terrorist_id} not found"
+            )
+        network = entity_link_service.get_network(terrorist_id, depth, min_reports, max_nodes)
+        return TerroristNetworkResponse(
+            terrorist_id=terrorist_id,
+            nodes=[
+                NetworkNodeResponse(
+                    terrorist_id=terrorist.id,
+                    terrorist_name=terrorist.name,
+                    affiliation=terrorist.affiliation,
+                    location=terrorist.location,
+                    depth=node_depth,
+                )
+                for terrorist, node_depth in network["nodes"]
+            ],
+            edges=network["edges"],
+            truncated=network["truncated"],
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve terrorist network: {str(e)}"
+        )
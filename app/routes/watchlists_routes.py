@@ -0,0 +1,126 @@
+"""
+Watchlist endpoint routes (standing queries matched at ingest)
+"""
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from app.schemas.watchlist_schemas import WatchlistCreate, WatchlistResponse, WatchlistMatchResponse
+from app.services import watchlist_service
+
+router = APIRouter()
+
+
+@router.post("/", response_model=WatchlistResponse, status_code=201)
+def create_watchlist_endpoint(watchlist_data: WatchlistCreate):
+    """
+    Register a standing query
+    
+    Every new report containing any of the keywords, or about any of the
+    terrorists, is recorded as a match and pushed on
+    /feed/reports/sse?watchlist_id=<id>.
+    """
+    try:
+        watchlist = watchlist_service.create_watchlist(
+            name=watchlist_data.name,
+            agent_id=watchlist_data.agent_id,
+            keywords=watchlist_data.keywords,
+            terrorist_ids=watchlist_data.terrorist_ids,
+        )
+        return watchlist_service.watchlist_to_dict(watchlist)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create watchlist: {str(e)}"
+        )
+
+
+@router.get("/", response_model=List[WatchlistResponse])
+def get_all_watchlists_endpoint(
+    agent_id: Optional[int] = Query(None, description="Only this agent's watchlists")
+):
+    """Get all watchlists"""
+    try:
+        return [
+            watchlist_service.watchlist_to_dict(watchlist)
+            for watchlist in watchlist_service.get_all_watchlists(agent_id)
+        ]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get watchlists: {str(e)}"
+        )
+
+
+@router.get("/{watchlist_id}", response_model=WatchlistResponse)
+def get_watchlist_endpoint(watchlist_id: int):
+    """Get a watchlist by ID"""
+    watchlist = watchlist_service.get_watchlist_by_id(watchlist_id)
+    if not watchlist:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Watchlist with ID {watchlist_id} not found"
+        )
+    return watchlist_service.watchlist_to_dict(watchlist)
+
+
+@router.get("/{watchlist_id}/matches", response_model=List[WatchlistMatchResponse])
+def get_watchlist_matches_endpoint(
+    watchlist_id: int,
+    after: int = Query(0, ge=0, description="Only matches with a higher match ID"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum matches to return")
+):
+    """Get the reports a watchlist matched, oldest first"""
+    try:
+        return [
+            watchlist_service.match_to_dict(match)
+            for match in watchlist_service.get_watchlist_matches(watchlist_id, after, limit)
+        ]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get watchlist matches: {str(e)}"
+        )
+
+
+@router.delete("/{watchlist_id}")
+def delete_watchlist_endpoint(
+    watchlist_id: int,
+    agent_id: int = Query(None, description="ID of the agent requesting deletion")
+):
+    """
+    Delete a watchlist and its recorded matches
+    
+    - **watchlist_id**: ID of the watchlist to delete
+    - **agent_id**: Optional - ID of the agent requesting deletion (for authorization)
+    """
+    try:
+        success = watchlist_service.delete_watchlist(watchlist_id, agent_id)
+        
+        if not success:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Watchlist with ID {watchlist_id} not found"
+            )
+        
+        return {"message": f"Watchlist {watchlist_id} deleted successfully"}
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete watchlist: {str(e)}"
+        )
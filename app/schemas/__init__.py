@@ -12,6 +12,33 @@ from .report_schemas import (
     ReportResponse,
     ReportSearchResponse,
     DangerousTerroristResponse,
+    TrendingTerroristResponse,
+)
+from .sql_schemas import (
+    SQLQuery,
+    SQLStreamQuery,
+    SQLJobCreate,
+    SQLJobResponse,
+    SQLJobResultsResponse,
+)
+from .export_schemas import (
+    TableSnapshotSummary,
+    ParquetSnapshotResponse,
+    ParquetWatermarksResponse,
+)
+from .watchlist_schemas import (
+    WatchlistCreate,
+    WatchlistResponse,
+    WatchlistMatchResponse,
+)
+from .change_schemas import (
+    ChangeRecord,
+    ChangesResponse,
+)
+from .analytics_schemas import (
+    FacetValueResponse,
+    FacetBucketResponse,
+    FacetsResponse,
 )
 from .common_schemas import (
     ErrorResponse,
@@ -31,6 +58,28 @@ __all__ = [
     "ReportResponse",
     "ReportSearchResponse",
     "DangerousTerroristResponse",
+    "TrendingTerroristResponse",
+    # SQL schemas
+    "SQLQuery",
+    "SQLStreamQuery",
+    "SQLJobCreate",
+    "SQLJobResponse",
+    "SQLJobResultsResponse",
+    # Export schemas
+    "TableSnapshotSummary",
+    "ParquetSnapshotResponse",
+    "ParquetWatermarksResponse",
+    # Watchlist schemas
+    "WatchlistCreate",
+    "WatchlistResponse",
+    "WatchlistMatchResponse",
+    # Change log schemas
+    "ChangeRecord",
+    "ChangesResponse",
+    # Analytics schemas
+    "FacetValueResponse",
+    "FacetBucketResponse",
+    "FacetsResponse",
     # Common schemas
     "ErrorResponse",
     "SuccessResponse",
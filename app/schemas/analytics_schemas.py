@@ -0,0 +1,34 @@
+"""
+Analytics Request/Response Schemas
+"""
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+
+class FacetValueResponse(BaseModel):
+    """Schema for the counts of one affiliation or location"""
+    value: Optional[str]  # None for terrorists without one
+    report_count: int
+    terrorist_count: int
+
+
+class FacetBucketResponse(BaseModel):
+    """Schema for the counts of one day / week / month"""
+    bucket_start: date
+    report_count: int
+    terrorist_count: int
+
+
+class FacetsResponse(BaseModel):
+    """Schema for report and terrorist counts by affiliation, location and time bucket"""
+    granularity: str
+    start: Optional[date]
+    end: Optional[date]
+    affiliation: Optional[str]
+    location: Optional[str]
+    report_count: int
+    terrorist_count: int
+    affiliations: List[FacetValueResponse]
+    locations: List[FacetValueResponse]
+    buckets: List[FacetBucketResponse]
@@ -0,0 +1,25 @@
+"""
+Change Log Response Schemas
+"""
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class ChangeRecord(BaseModel):
+    """Schema for one change log record"""
+    seq: int
+    entity: str
+    entity_id: int
+    op: str
+    data: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+
+class ChangesResponse(BaseModel):
+    """Schema for a page of changes after a cursor"""
+    changes: List[ChangeRecord]
+    next_after: int
+    has_more: bool
+    oldest_seq: Optional[int] = None
+    latest_seq: Optional[int] = None
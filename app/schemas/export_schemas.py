@@ -0,0 +1,27 @@
+"""
+Export Request/Response Schemas
+"""
+from pydantic import BaseModel
+from typing import Dict, Optional, Union
+
+
+class TableSnapshotSummary(BaseModel):
+    """Schema for one table of a Parquet snapshot"""
+    rows: int
+    files: int
+    # Highest exported id, or the archived_at cutoff (ISO 8601) for report_archive
+    watermark: Optional[Union[int, str]]
+
+
+class ParquetSnapshotResponse(BaseModel):
+    """Schema for a completed Parquet snapshot"""
+    snapshot_id: str
+    output_dir: str
+    incremental: bool
+    tables: Dict[str, TableSnapshotSummary]
+    duration_seconds: float
+
+
+class ParquetWatermarksResponse(BaseModel):
+    """Schema for the current Parquet snapshot watermarks"""
+    watermarks: Dict[str, Optional[Union[int, str]]]
@@ -3,7 +3,7 @@ Report Request/Response Schemas
 """
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class ReportCreate(BaseModel):
@@ -39,6 +39,39 @@ class ReportSearchResponse(BaseModel):
         from_attributes = True
 
 
+class ReportDuplicateResponse(BaseModel):
+    """Schema for a report linked to a near-duplicate cluster"""
+    report_id: int
+    similarity: float = Field(..., description="Estimated Jaccard similarity to the cluster's first report")
+
+
+class ReportClusterResponse(BaseModel):
+    """Schema for a cluster of near-duplicate reports"""
+    cluster_id: int = Field(..., description="ID of the cluster's first (representative) report")
+    duplicates: List[ReportDuplicateResponse]
+
+
+class TrendingTerroristResponse(BaseModel):
+    """Schema for a terrorist trending in a sliding window"""
+    terrorist_id: int
+    terrorist_name: str
+    affiliation: Optional[str]
+    location: Optional[str]
+    report_count: int
+    max_overestimate: int = Field(0, description="Upper bound of how much report_count may be too high")
+
+
+class RankedTerroristResponse(BaseModel):
+    """Schema for a terrorist ranked by time-decayed danger score"""
+    terrorist_id: int
+    terrorist_name: str
+    affiliation: Optional[str]
+    location: Optional[str]
+    score: float
+    report_count: int
+    distinct_agents: int
+
+
 class DangerousTerroristResponse(BaseModel):
     """Schema for dangerous terrorist with report count"""
     terrorist_id: int
@@ -0,0 +1,46 @@
+"""
+SQL Request/Response Schemas
+"""
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+
+
+class SQLQuery(BaseModel):
+    """Schema for SQL query"""
+    query: str
+
+
+class SQLStreamQuery(SQLQuery):
+    """Schema for a streamed SQL query"""
+    format: Literal["ndjson", "csv"] = Field("ndjson", description="Output format")
+    max_rows: Optional[int] = Field(None, gt=0, description="Row cap (cannot exceed the server limit)")
+
+
+class SQLJobCreate(SQLQuery):
+    """Schema for submitting a background SQL job"""
+    max_rows: Optional[int] = Field(None, gt=0, description="Row cap (cannot exceed the server limit)")
+
+
+class SQLJobResponse(BaseModel):
+    """Schema for SQL job status"""
+    job_id: str
+    status: str
+    query: str
+    columns: List[str]
+    row_count: int
+    truncated: bool
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class SQLJobResultsResponse(BaseModel):
+    """Schema for a page of SQL job results"""
+    job_id: str
+    status: str
+    offset: int
+    limit: int
+    row_count: int
+    results: List[Dict[str, Any]]
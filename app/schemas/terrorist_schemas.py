@@ -3,7 +3,7 @@ Terrorist Request/Response Schemas
 """
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class TerroristCreate(BaseModel):
@@ -23,3 +23,27 @@ class TerroristResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class NetworkNodeResponse(BaseModel):
+    """Schema for a terrorist in a co-occurrence network"""
+    terrorist_id: int
+    terrorist_name: str
+    affiliation: Optional[str]
+    location: Optional[str]
+    depth: int = Field(..., description="Hops from the terrorist at the center")
+
+
+class NetworkEdgeResponse(BaseModel):
+    """Schema for a co-occurrence link between two terrorists"""
+    source: int
+    target: int
+    report_count: int = Field(..., description="Reports naming both terrorists")
+
+
+class TerroristNetworkResponse(BaseModel):
+    """Schema for the co-occurrence network around a terrorist"""
+    terrorist_id: int
+    nodes: List[NetworkNodeResponse]
+    edges: List[NetworkEdgeResponse]
+    truncated: bool = Field(False, description="True if max_nodes cut the network short")
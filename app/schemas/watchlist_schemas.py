@@ -0,0 +1,33 @@
+"""
+Watchlist Request/Response Schemas
+"""
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List
+
+
+class WatchlistCreate(BaseModel):
+    """Schema for creating a new watchlist"""
+    name: str = Field(..., min_length=1, max_length=100, description="Display name")
+    agent_id: int = Field(..., description="ID of the agent who owns the watchlist")
+    keywords: List[str] = Field(default_factory=list, description="Words to look for in new reports")
+    terrorist_ids: List[int] = Field(default_factory=list, description="Terrorists whose new reports should match")
+
+
+class WatchlistResponse(BaseModel):
+    """Schema for watchlist response"""
+    id: int
+    name: str
+    agent_id: int
+    keywords: List[str]
+    terrorist_ids: List[int]
+    created_at: datetime
+
+
+class WatchlistMatchResponse(BaseModel):
+    """Schema for a report that matched a watchlist"""
+    id: int
+    watchlist_id: int
+    report_id: int
+    matched_keywords: List[str]
+    created_at: datetime
@@ -12,6 +12,8 @@ from .terrorist_service import (
     search_terrorists_by_name,
     get_all_terrorists,
     get_or_create_terrorist,
+    get_or_create_terrorist_id,
+    get_or_create_terrorists,
 )
 from .report_service import (
     create_report,
@@ -40,6 +42,8 @@ __all__ = [
     "search_terrorists_by_name",
     "get_all_terrorists",
     "get_or_create_terrorist",
+    "get_or_create_terrorist_id",
+    "get_or_create_terrorists",
     # Report services
     "create_report",
     "get_report_by_id",
@@ -4,6 +4,8 @@ Agent Service - Business Logic Layer for Agent Operations
 from typing import Optional, List
 from app.models import Agent
 from app.dal import agent_dal
+from app.services.cache_service import get_entity_cache
+from app.services.response_cache_service import bump_data_version
 
 
 def create_agent(name: str, username: str, password: str) -> Agent:
@@ -26,8 +28,11 @@ def create_agent(name: str, username: str, password: str) -> Agent:
     if existing_agent:
         raise ValueError(f"Username '{username}' already exists")
     
-    # Create the agent
-    return agent_dal.create_agent(name, username, password)
+    # Create the agent and write it through to the cache
+    agent = agent_dal.create_agent(name, username, password)
+    get_entity_cache().set(f"agent:{agent.id}", agent)
+    bump_data_version()
+    return agent
 
 
 def authenticate_agent(username: str, password: str) -> Optional[Agent]:
@@ -46,7 +51,7 @@ def authenticate_agent(username: str, password: str) -> Optional[Agent]:
 
 def get_agent_by_id(agent_id: int) -> Optional[Agent]:
     """
-    Get agent by ID
+    Get agent by ID (served from the entity cache when possible)
     
     Args:
         agent_id: ID of the agent
@@ -54,7 +59,9 @@ def get_agent_by_id(agent_id: int) -> Optional[Agent]:
     Returns:
         Agent object if found, None otherwise
     """
-    return agent_dal.get_agent_by_id(agent_id)
+    return get_entity_cache().get_or_load(
+        Agent, f"agent:{agent_id}", lambda: agent_dal.get_agent_by_id(agent_id)
+    )
 
 
 def get_agent_by_username(username: str) -> Optional[Agent]:
@@ -0,0 +1,72 @@
+"""
+Archive Service - Cold-archive tiering for old reports
+
+Reports older than REPORT_ARCHIVE_AFTER_DAYS are moved in batches from the
+hot `report` table into `report_archive`. Per-terrorist counters of archived
+reports (total and weapon-keyword reports) are kept in the same transaction,
+so report counts and the dangerous / super-dangerous analytics stay correct
+while their scans only touch the hot working set. Searches read the archive
+only when asked to (include_archive).
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from config import settings
+from app.dal import archive_dal
+from app.services.response_cache_service import bump_data_version_offline
+
+
+def archive_old_reports(
+    older_than_days: Optional[float] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Move reports older than a cutoff into the archive
+    
+    Args:
+        older_than_days: Age threshold (defaults to REPORT_ARCHIVE_AFTER_DAYS)
+        batch_size: Reports moved per transaction (defaults to REPORT_ARCHIVE_BATCH_SIZE)
+        max_batches: Stop after this many batches (None = until done)
+        
+    Returns:
+        Dict with the cutoff, reports archived, batches and duration
+        
+    Raises:
+        ValueError: If older_than_days is negative
+    """
+    older_than_days = settings.REPORT_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    if older_than_days < 0:
+        raise ValueError("older_than_days must not be negative")
+    batch_size = batch_size or settings.REPORT_ARCHIVE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    
+    started = time.perf_counter()
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_dal.archive_reports_batch(cutoff, batch_size)
+        if not moved:
+            break
+        archived += moved
+        batches += 1
+    
+    if archived:
+        bump_data_version_offline()
+    return {
+        "cutoff": cutoff.isoformat(),
+        "archived": archived,
+        "batches": batches,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def get_archive_stats() -> Dict[str, int]:
+    """
+    Get totals of archived reports
+    
+    Returns:
+        Dict with archived report, dangerous report and terrorist counts
+    """
+    return archive_dal.get_archive_stats()
@@ -0,0 +1,324 @@
+"""
+Cache Service - Bounded entity cache for rarely-changing rows (agents, terrorists)
+
+The default backend is an in-process LRU with TTL. Set ENTITY_CACHE_BACKEND to
+"redis" to share entries between uvicorn workers; ENTITY_CACHE_REDIS_URL may be
+"fakeredis://" to use the in-memory fakeredis stand-in locally.
+"""
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Type, TypeVar
+
+from sqlmodel import SQLModel
+
+from config import settings
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+# Never cached (and blank on cached entities): authentication always reads the DB
+SECRET_FIELDS = {"password"}
+
+
+class LRUTTLCache:
+    """Thread-safe in-memory LRU cache with a per-entry time-to-live"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Remove a key (no-op if missing)"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class ByteSizeLRUCache:
+    """Thread-safe LRU of byte strings bounded by total size in bytes (plus a TTL)"""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes) -> bool:
+        """Store a value; returns False if it is larger than max_entry_bytes"""
+        if len(value) > self.max_entry_bytes:
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rejected_too_large": self.rejected,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_fake_redis_server = None
+
+
+def make_redis_client(url: str):
+    """Create a Redis client; "fakeredis://" URLs share one in-process fake server"""
+    global _fake_redis_server
+    if url.startswith("fakeredis://"):
+        import fakeredis
+        if _fake_redis_server is None:
+            _fake_redis_server = fakeredis.FakeServer()
+        return fakeredis.FakeRedis(server=_fake_redis_server)
+    import redis
+    return redis.Redis.from_url(url)
+
+
+class RedisCache:
+    """Shared cache over the Redis protocol; entries expire via Redis TTLs"""
+
+    def __init__(self, url: str, ttl_seconds: float, prefix: str = "intel:entity:"):
+        self._client = make_redis_client(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        value = self._client.get(self.prefix + key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._client.set(self.prefix + key, value, ex=max(1, int(self.ttl_seconds)))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "redis",
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _blank_secrets(model: Type[SQLModel]) -> Dict[str, str]:
+    """Placeholder values for the model's SECRET_FIELDS"""
+    return {name: "" for name in SECRET_FIELDS if name in model.model_fields}
+
+
+class EntityCache:
+    """
+    Cache of SQLModel rows keyed by "<kind>:<key>"
+
+    In-memory entries hold model instances; the Redis backend stores their
+    JSON and rebuilds instances on read. With either backend, SECRET_FIELDS
+    are blanked, so no password ever lands in the cache.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._shared = isinstance(backend, RedisCache)
+
+    def get(self, model: Type[ModelT], key: str) -> Optional[ModelT]:
+        value = self.backend.get(key)
+        if value is None:
+            return None
+        if self._shared:
+            # model_validate (not model_validate_json) so table models get typed fields
+            return model.model_validate({**_blank_secrets(model), **json.loads(value)})
+        return value
+
+    def set(self, key: str, entity: SQLModel) -> None:
+        if self._shared:
+            self.backend.set(key, entity.model_dump_json(exclude=SECRET_FIELDS))
+        elif _blank_secrets(type(entity)):
+            self.backend.set(key, type(entity).model_validate({
+                **entity.model_dump(), **_blank_secrets(type(entity))
+            }))
+        else:
+            self.backend.set(key, entity)
+
+    def get_value(self, key: str) -> Any:
+        """Get a plain scalar value (e.g. an id stored under a secondary key)"""
+        value = self.backend.get(key)
+        if value is not None and self._shared:
+            return int(value)
+        return value
+
+    def set_value(self, key: str, value: Any) -> None:
+        self.backend.set(key, value)
+
+    def get_or_load(self, model: Type[ModelT], key: str, loader: Callable[[], Optional[ModelT]]) -> Optional[ModelT]:
+        """Return the cached entity or load it; missing rows are not cached"""
+        entity = self.get(model, key)
+        if entity is not None:
+            return entity
+        entity = loader()
+        if entity is not None:
+            self.set(key, entity)
+        return entity
+
+    def invalidate(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": True, **self.backend.stats()}
+
+
+class _DisabledCache(EntityCache):
+    """Pass-through used when ENTITY_CACHE_ENABLED is False"""
+
+    def __init__(self):
+        self.backend = None
+        self._shared = False
+
+    def get(self, model, key):
+        return None
+
+    def set(self, key, entity):
+        pass
+
+    def get_value(self, key):
+        return None
+
+    def set_value(self, key, value):
+        pass
+
+    def invalidate(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {"enabled": False}
+
+
+def _build_entity_cache() -> EntityCache:
+    if not settings.ENTITY_CACHE_ENABLED:
+        return _DisabledCache()
+    if settings.ENTITY_CACHE_BACKEND == "redis":
+        return EntityCache(RedisCache(settings.ENTITY_CACHE_REDIS_URL, settings.ENTITY_CACHE_TTL_SECONDS))
+    return EntityCache(LRUTTLCache(settings.ENTITY_CACHE_MAX_SIZE, settings.ENTITY_CACHE_TTL_SECONDS))
+
+
+entity_cache = _build_entity_cache()
+
+
+def get_entity_cache() -> EntityCache:
+    """Return the process-wide entity cache"""
+    return entity_cache
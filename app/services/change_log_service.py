@@ -0,0 +1,142 @@
+"""
+Change Log Service - Ordered change feed for incremental downstream sync
+
+Every create/delete of an agent, terrorist or report appends a row to
+`change_log` in the same transaction as the write itself, so a change is
+logged if and only if it was committed. Consumers keep the last seq they
+applied and poll `GET /changes?after=<seq>`; the cost of a sync is
+proportional to the number of changes, not to the size of the tables.
+
+Seqs are assigned at insert time, so a transaction that commits late can
+make a lower seq appear after a higher one. Pages therefore stop at the
+first gap younger than CHANGE_LOG_GAP_TIMEOUT_SECONDS; older gaps are seqs
+of rolled-back transactions and are skipped.
+
+Records older than CHANGE_LOG_RETENTION_DAYS are purged
+(`python manage.py purge-changes`). A consumer whose cursor falls behind
+the retained range gets ChangeCursorExpired and must resync from a full
+export, then continue from the latest seq named in the error (replayed
+changes are harmless: creates are applied as upserts, deletes of missing
+rows are no-ops).
+"""
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from config import settings
+from app.dal import change_log_dal
+from app.models import ChangeLog
+from app.services.response_cache_service import bump_data_version_offline
+
+
+class ChangeCursorExpired(ValueError):
+    """The requested changes were already purged from the change log"""
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive values come back from databases that don't store the offset
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _change_to_dict(change: ChangeLog) -> Dict[str, Any]:
+    return {
+        "seq": change.seq,
+        "entity": change.entity,
+        "entity_id": change.entity_id,
+        "op": change.op,
+        "data": json.loads(change.data) if change.data is not None else None,
+        "created_at": _as_utc(change.created_at),
+    }
+
+
+def get_changes(after: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Get change records committed after a cursor
+    
+    Args:
+        after: Last seq the consumer has applied (0 to start from the beginning)
+        limit: Maximum records to return (defaults to and is capped at CHANGE_LOG_MAX_PAGE_SIZE)
+        
+    Returns:
+        Dict with the changes (in seq order), next_after (the cursor for the
+        next call), has_more, and the oldest/latest seq in the log
+        
+    Raises:
+        ValueError: If after or limit is negative / not positive
+        ChangeCursorExpired: If changes after the cursor were already purged
+    """
+    if after < 0:
+        raise ValueError("after must not be negative")
+    limit = min(limit or settings.CHANGE_LOG_MAX_PAGE_SIZE, settings.CHANGE_LOG_MAX_PAGE_SIZE)
+    if limit <= 0:
+        raise ValueError("limit must be positive")
+    
+    bounds = change_log_dal.get_change_log_bounds()
+    if after < bounds["purged_through_seq"]:
+        raise ChangeCursorExpired(
+            f"Changes after seq {after} were purged (purged through seq {bounds['purged_through_seq']}); "
+            f"resync from a full export, then continue from seq {bounds['latest_seq'] or 0}"
+        )
+    
+    # One extra row tells whether more changes are waiting
+    changes = change_log_dal.get_changes_after(after, limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    
+    # Stop before a recent gap: an in-flight transaction may still commit that seq
+    settle_cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.CHANGE_LOG_GAP_TIMEOUT_SECONDS)
+    expected_seq = after + 1
+    for index, change in enumerate(changes):
+        if change.seq != expected_seq and _as_utc(change.created_at) > settle_cutoff:
+            changes = changes[:index]
+            has_more = True
+            break
+        expected_seq = change.seq + 1
+    
+    return {
+        "changes": [_change_to_dict(change) for change in changes],
+        "next_after": changes[-1].seq if changes else after,
+        "has_more": has_more,
+        "oldest_seq": bounds["oldest_seq"],
+        "latest_seq": bounds["latest_seq"],
+    }
+
+
+def purge_change_log(
+    retention_days: Optional[float] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Delete change records older than the retention period
+    
+    Args:
+        retention_days: Records kept for this many days (defaults to CHANGE_LOG_RETENTION_DAYS)
+        batch_size: Records deleted per transaction (defaults to CHANGE_LOG_PURGE_BATCH_SIZE)
+        
+    Returns:
+        Dict with the cutoff, records purged and duration
+        
+    Raises:
+        ValueError: If retention_days is negative
+    """
+    retention_days = settings.CHANGE_LOG_RETENTION_DAYS if retention_days is None else retention_days
+    if retention_days < 0:
+        raise ValueError("retention_days must not be negative")
+    batch_size = batch_size or settings.CHANGE_LOG_PURGE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    
+    started = time.perf_counter()
+    purged = 0
+    while True:
+        deleted = change_log_dal.delete_changes_before(cutoff, batch_size)
+        if not deleted:
+            break
+        purged += deleted
+    if purged:
+        bump_data_version_offline()
+    return {
+        "cutoff": cutoff.isoformat(),
+        "purged": purged,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
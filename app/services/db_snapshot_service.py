@@ -0,0 +1,304 @@
+"""
+DB Snapshot Service - Bulk snapshot and restore of every SQLModel table
+
+A snapshot is a directory with one set of gzip-compressed chunk files per
+table (NDJSON, one JSON array of column values per row) and a manifest.json
+listing tables in foreign-key order, their columns, chunk files and row
+counts. Tables are dumped in parallel through server-side cursors; the
+manifest is written last, so a directory without one is incomplete.
+
+A restore loads into empty tables (or drops and recreates them first):
+secondary indexes are dropped, chunks are loaded in parallel with
+foreign-key checks off using multi-row INSERTs (or LOAD DATA LOCAL INFILE
+on MySQL when SNAPSHOT_USE_LOAD_DATA is set), then indexes are rebuilt and
+row counts verified against the manifest.
+
+Tables are read on separate connections, so take snapshots while writes
+are paused if cross-table consistency matters.
+"""
+import gzip
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import DateTime, Table
+
+from config import settings
+from app.dal import snapshot_dal
+from app.services.cache_service import get_entity_cache
+from app.services.response_cache_service import bump_data_version_offline
+from db.database import get_engine
+
+MANIFEST_FILE = "manifest.json"
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _dump_table(table: Table, snapshot_dir: str, chunk_rows: int) -> Dict[str, Any]:
+    """Stream one table into numbered chunk files"""
+    columns = [column.name for column in table.columns]
+    chunks: List[Dict[str, Any]] = []
+    chunk_file = None
+    rows_in_chunk = 0
+    total_rows = 0
+
+    def close_chunk():
+        nonlocal chunk_file
+        if chunk_file is not None:
+            chunk_file.close()
+            chunk_file = None
+
+    stream = snapshot_dal.open_full_table_stream(table)
+    try:
+        for rows in stream.iter_batches(settings.SNAPSHOT_FETCH_SIZE):
+            for row in rows:
+                if chunk_file is None:
+                    file_name = f"{table.name}.{len(chunks):05d}.ndjson.gz"
+                    chunk_file = gzip.open(
+                        os.path.join(snapshot_dir, file_name), "wt",
+                        encoding="utf-8", compresslevel=settings.SNAPSHOT_COMPRESS_LEVEL,
+                    )
+                    chunks.append({"file": file_name, "rows": 0})
+                    rows_in_chunk = 0
+                chunk_file.write(json.dumps([_encode_value(value) for value in row], ensure_ascii=False))
+                chunk_file.write("\n")
+                rows_in_chunk += 1
+                chunks[-1]["rows"] = rows_in_chunk
+                total_rows += 1
+                if rows_in_chunk >= chunk_rows:
+                    close_chunk()
+    finally:
+        close_chunk()
+        stream.close()
+
+    return {"name": table.name, "columns": columns, "rows": total_rows, "chunks": chunks}
+
+
+def create_snapshot(
+    output_dir: Optional[str] = None,
+    chunk_rows: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Dump every table to compressed chunk files
+
+    Args:
+        output_dir: Snapshot directory (defaults to SNAPSHOT_DIR/<timestamp>)
+        chunk_rows: Rows per chunk file (defaults to SNAPSHOT_CHUNK_ROWS)
+        workers: Tables dumped in parallel (defaults to SNAPSHOT_WORKERS)
+
+    Returns:
+        The snapshot manifest plus its directory and duration
+
+    Raises:
+        ValueError: If output_dir already contains a snapshot
+    """
+    started = time.perf_counter()
+    created_at = datetime.now(timezone.utc)
+    snapshot_dir = output_dir or os.path.join(settings.SNAPSHOT_DIR, created_at.strftime("%Y%m%dT%H%M%SZ"))
+    if os.path.exists(os.path.join(snapshot_dir, MANIFEST_FILE)):
+        raise ValueError(f"{snapshot_dir} already contains a snapshot")
+    os.makedirs(snapshot_dir, exist_ok=True)
+    chunk_rows = chunk_rows or settings.SNAPSHOT_CHUNK_ROWS
+
+    tables = snapshot_dal.get_snapshot_tables()
+    if snapshot_dal.get_dialect_name() == "sqlite":
+        workers = 1  # a single SQLite connection can't serve parallel cursors
+    with ThreadPoolExecutor(max_workers=workers or settings.SNAPSHOT_WORKERS) as pool:
+        futures = [pool.submit(_dump_table, table, snapshot_dir, chunk_rows) for table in tables]
+        table_manifests = [future.result() for future in futures]
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "created_at": created_at.isoformat(),
+        "dialect": snapshot_dal.get_dialect_name(),
+        "tables": table_manifests,
+    }
+    temp_path = os.path.join(snapshot_dir, MANIFEST_FILE + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(temp_path, os.path.join(snapshot_dir, MANIFEST_FILE))
+
+    return {
+        **manifest,
+        "snapshot_dir": os.path.abspath(snapshot_dir),
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def read_manifest(snapshot_dir: str) -> Dict[str, Any]:
+    """
+    Load and validate a snapshot manifest
+
+    Raises:
+        ValueError: If the directory holds no complete snapshot or it doesn't match the models
+    """
+    path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise ValueError(f"No complete snapshot in {snapshot_dir} (manifest.json missing)")
+    with open(path, "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    if manifest.get("format") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+
+    known_tables = {table.name: table for table in snapshot_dal.get_snapshot_tables()}
+    for table_manifest in manifest["tables"]:
+        table = known_tables.get(table_manifest["name"])
+        if table is None:
+            raise ValueError(f"Snapshot table '{table_manifest['name']}' is not a known model")
+        unknown_columns = set(table_manifest["columns"]) - set(table.columns.keys())
+        if unknown_columns:
+            raise ValueError(f"Snapshot columns {sorted(unknown_columns)} are not in table '{table.name}'")
+    return manifest
+
+
+def _iter_chunk_rows(path: str, table: Table, columns: List[str]):
+    """Yield row dicts from a chunk file, decoding datetime columns"""
+    datetime_columns = [
+        index for index, name in enumerate(columns)
+        if isinstance(getattr(table.c[name].type, "impl", table.c[name].type), DateTime)
+    ]
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            values = json.loads(line)
+            for index in datetime_columns:
+                if values[index] is not None:
+                    values[index] = datetime.fromisoformat(values[index])
+            yield dict(zip(columns, values))
+
+
+def _tsv_value(value: Any) -> str:
+    """Format a value for LOAD DATA's default escaping"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(sep=" ")
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
+    )
+
+
+def _load_chunk(engine, table: Table, columns: List[str], path: str, use_load_data: bool) -> int:
+    """Load one chunk file on its own connection; returns rows loaded"""
+    row_count = 0
+    with engine.begin() as connection:
+        snapshot_dal.disable_foreign_key_checks(connection)
+        try:
+            if use_load_data:
+                with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", delete=False) as tsv:
+                    for row in _iter_chunk_rows(path, table, columns):
+                        tsv.write("\t".join(_tsv_value(row[name]) for name in columns) + "\n")
+                        row_count += 1
+                try:
+                    snapshot_dal.load_data_infile(connection, table, tsv.name, columns)
+                finally:
+                    os.remove(tsv.name)
+            else:
+                batch: List[Dict[str, Any]] = []
+                for row in _iter_chunk_rows(path, table, columns):
+                    batch.append(row)
+                    if len(batch) >= settings.SNAPSHOT_RESTORE_BATCH_ROWS:
+                        snapshot_dal.insert_rows(connection, table, batch)
+                        row_count += len(batch)
+                        batch = []
+                snapshot_dal.insert_rows(connection, table, batch)
+                row_count += len(batch)
+        finally:
+            snapshot_dal.enable_foreign_key_checks(connection)
+    return row_count
+
+
+def restore_snapshot(
+    snapshot_dir: str,
+    replace: bool = False,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Restore a snapshot into the configured database
+
+    Args:
+        snapshot_dir: Directory written by create_snapshot
+        replace: Drop and recreate all tables first; otherwise they must be empty
+        workers: Chunks loaded in parallel (defaults to SNAPSHOT_WORKERS)
+
+    Returns:
+        Summary with per-table restored row counts and duration
+
+    Raises:
+        ValueError: If the snapshot is invalid, tables aren't empty, or
+            restored row counts don't match the manifest
+    """
+    started = time.perf_counter()
+    manifest = read_manifest(snapshot_dir)
+    tables = {table.name: table for table in snapshot_dal.get_snapshot_tables()}
+
+    if replace:
+        snapshot_dal.recreate_tables()
+    else:
+        non_empty = [name for name, table in tables.items() if snapshot_dal.count_rows(table)]
+        if non_empty:
+            raise ValueError(f"Tables are not empty: {', '.join(non_empty)} (use replace to overwrite)")
+
+    dialect_name = snapshot_dal.get_dialect_name()
+    use_load_data = settings.SNAPSHOT_USE_LOAD_DATA and dialect_name == "mysql"
+    engine = snapshot_dal.make_load_data_engine() if use_load_data else get_engine()
+    if dialect_name == "sqlite":
+        workers = 1  # SQLite allows a single writer
+
+    dropped_indexes = {name: snapshot_dal.drop_secondary_indexes(table) for name, table in tables.items()}
+    restored = {table_manifest["name"]: 0 for table_manifest in manifest["tables"]}
+    try:
+        with ThreadPoolExecutor(max_workers=workers or settings.SNAPSHOT_WORKERS) as pool:
+            futures = []
+            for table_manifest in manifest["tables"]:
+                table = tables[table_manifest["name"]]
+                for chunk in table_manifest["chunks"]:
+                    future = pool.submit(
+                        _load_chunk, engine, table, table_manifest["columns"],
+                        os.path.join(snapshot_dir, chunk["file"]), use_load_data,
+                    )
+                    futures.append((table.name, future))
+            for table_name, future in futures:
+                restored[table_name] += future.result()
+    finally:
+        # Rebuild even after a failed load so the schema isn't left without its indexes
+        with ThreadPoolExecutor(max_workers=1 if dialect_name == "sqlite" else len(dropped_indexes) or 1) as pool:
+            list(pool.map(snapshot_dal.create_indexes, dropped_indexes.values()))
+        if engine is not get_engine():
+            engine.dispose()
+
+    for table in tables.values():
+        snapshot_dal.reset_sequences(table)
+    # Everything changed underneath the caches
+    get_entity_cache().clear()
+    bump_data_version_offline()
+
+    for table_manifest in manifest["tables"]:
+        if restored[table_manifest["name"]] != table_manifest["rows"]:
+            raise ValueError(
+                f"Table '{table_manifest['name']}': restored {restored[table_manifest['name']]} rows, "
+                f"snapshot has {table_manifest['rows']}"
+            )
+
+    return {
+        "snapshot_dir": os.path.abspath(snapshot_dir),
+        "method": "load_data" if use_load_data else "insert",
+        "tables": restored,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,149 @@
+"""
+Dedup Service - Near-duplicate report detection at ingest
+
+Agents often file the same intel several times with small edits. Every new
+report gets a MinHash signature of its character shingles; the signature's
+LSH band hashes (scoped to the report's terrorist) are looked up in
+`report_lsh_band` to find earlier reports that are probably similar, and
+the candidates' stored signatures decide whether the estimated similarity
+reaches REPORT_DEDUP_THRESHOLD.
+
+- REPORT_DEDUP_MODE=link: the report is created and linked to the earlier
+  report's cluster (GET /reports/{id}/cluster).
+- REPORT_DEDUP_MODE=reject: the report is refused (409).
+- REPORT_DEDUP_MODE=off: no detection.
+
+Only a cluster's first report (its representative) is indexed, with a
+fixed-size signature and one BIGINT key per band, all stored in the
+database: nothing grows in process memory however many reports there are.
+The dangerous analytics can count clusters instead of raw reports
+(?count_clusters=true). Changing the signature settings makes stored
+signatures incomparable with new ones.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from app.dal import dedup_dal
+from app.minhash import MinHasher, band_keys, decode_signature, encode_signature, similarity
+
+DEDUP_MODES = ("off", "link", "reject")
+
+
+class DuplicateReportError(ValueError):
+    """A report was rejected as a near-duplicate of an earlier one"""
+
+    def __init__(self, cluster_id: int, similarity: float):
+        super().__init__(
+            f"Report is a near-duplicate of report {cluster_id} (similarity {similarity:.2f})"
+        )
+        self.cluster_id = cluster_id
+        self.similarity = similarity
+
+
+@dataclass
+class DedupCheck:
+    """Result of checking a report before it is created"""
+    signature: List[int]
+    band_keys: List[int]
+    cluster_id: Optional[int] = None
+    similarity: float = 0.0
+
+
+_hasher: Optional[MinHasher] = None
+
+
+def get_hasher() -> MinHasher:
+    """Return the MinHasher for the configured signature settings"""
+    global _hasher
+    if (
+        _hasher is None
+        or _hasher.num_perm != settings.REPORT_DEDUP_NUM_PERM
+        or _hasher.shingle_size != settings.REPORT_DEDUP_SHINGLE_SIZE
+    ):
+        _hasher = MinHasher(settings.REPORT_DEDUP_NUM_PERM, settings.REPORT_DEDUP_SHINGLE_SIZE)
+    return _hasher
+
+
+def check_report(content: str, terrorist_id: int) -> Optional[DedupCheck]:
+    """
+    Look for an earlier near-duplicate of a report about to be created
+
+    Args:
+        content: Content of the new report
+        terrorist_id: ID of the terrorist it is about
+
+    Returns:
+        DedupCheck to pass to record_report() once the report exists, or
+        None when detection is off or the content is empty
+
+    Raises:
+        DuplicateReportError: In reject mode, if a near-duplicate exists
+        ValueError: If the dedup settings are invalid
+    """
+    if settings.REPORT_DEDUP_MODE == "off":
+        return None
+    if settings.REPORT_DEDUP_MODE not in DEDUP_MODES:
+        raise ValueError(f"Unknown REPORT_DEDUP_MODE '{settings.REPORT_DEDUP_MODE}'")
+    if settings.REPORT_DEDUP_NUM_PERM % settings.REPORT_DEDUP_BANDS:
+        raise ValueError("REPORT_DEDUP_NUM_PERM must be a multiple of REPORT_DEDUP_BANDS")
+
+    signature = get_hasher().signature(content)
+    if signature is None:
+        return None
+    check = DedupCheck(signature, band_keys(signature, settings.REPORT_DEDUP_BANDS, terrorist_id))
+    for candidate in dedup_dal.find_candidates(check.band_keys, settings.REPORT_DEDUP_MAX_CANDIDATES):
+        score = similarity(signature, decode_signature(candidate.signature))
+        if score >= settings.REPORT_DEDUP_THRESHOLD and score > check.similarity:
+            check.cluster_id, check.similarity = candidate.report_id, score
+
+    if check.cluster_id is not None and settings.REPORT_DEDUP_MODE == "reject":
+        raise DuplicateReportError(check.cluster_id, check.similarity)
+    return check
+
+
+def record_report(report: Any, check: Optional[DedupCheck]) -> None:
+    """
+    Add a created report to its cluster, or start a new one
+
+    Args:
+        report: The created report
+        check: What check_report() returned for it
+    """
+    if check is None:
+        return
+    if check.cluster_id is not None and dedup_dal.create_duplicate(
+        report.id, check.cluster_id, report.terrorist_id, check.similarity
+    ):
+        return
+    # No near-duplicate (or its cluster was deleted meanwhile): this report represents a new cluster
+    dedup_dal.create_representative(report.id, report.terrorist_id, encode_signature(check.signature), check.band_keys)
+
+
+def on_report_deleted(report_id: int) -> None:
+    """Take a deleted report out of its cluster"""
+    dedup_dal.remove_report(report_id)
+
+
+def get_report_cluster(report_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get the near-duplicate cluster a report belongs to
+
+    Args:
+        report_id: ID of the report
+
+    Returns:
+        Dict with cluster_id (the representative report's ID) and its
+        duplicates (report_id, similarity), or None if the report isn't clustered
+    """
+    cluster = dedup_dal.get_cluster(report_id)
+    if cluster is None:
+        return None
+    cluster_id, duplicates = cluster
+    return {
+        "cluster_id": cluster_id,
+        "duplicates": [
+            {"report_id": duplicate.report_id, "similarity": duplicate.similarity}
+            for duplicate in duplicates
+        ],
+    }
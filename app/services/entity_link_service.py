@@ -0,0 +1,249 @@
+"""
+Entity Link Service - Terrorists named in report content and their co-occurrence graph
+
+Report bodies often name other terrorists besides the report's own. At
+ingest, the content is matched against every terrorist name in one pass
+with a whole-word Aho-Corasick automaton (see keyword_automaton). Each
+named terrorist is stored as a mention in `report_mention`, and every pair
+of terrorists in the report (its own terrorist and the named ones) gets
++1 on its `terrorist_link` edge. /terrorists/{id}/network walks these edges
+breadth-first; each step is one range scan of the link table's primary key.
+
+The name automaton is maintained incrementally. Terrorists created since
+the last refresh (found by ID, at most ENTITY_LINK_REFRESH_SECONDS later, or
+right away when this process created them) go into a small delta automaton
+that is recompiled on its own. Only after ENTITY_LINK_DELTA_NAMES new names
+is everything folded back into the main automaton. IDs are allocated before
+commit, so a terrorist can show up below IDs already loaded: refreshes keep
+re-reading terrorists created less than ENTITY_LINK_SETTLE_SECONDS ago.
+
+Names shorter than ENTITY_LINK_MIN_NAME_LENGTH are ignored. Existing
+reports are linked by `python manage.py link-mentions`.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import settings
+from app.keyword_automaton import KeywordAutomaton, normalize_term
+from app.dal import entity_link_dal, export_dal
+from app.dal.entity_link_dal import MentionRecord
+from app.models import Report
+from app.services.response_cache_service import bump_data_version_offline
+
+
+class EntityLinker:
+    """Terrorist name automaton, grown incrementally as terrorists are added"""
+
+    def __init__(self, delta_limit: int, min_name_length: int):
+        self.delta_limit = delta_limit
+        self.min_name_length = min_name_length
+        self.ids_by_name: Dict[str, int] = {}
+        self.loaded_through_id = 0
+        # Through this ID every insert has committed (or never will); refreshes read past it
+        self.settled_through_id = 0
+        self._automaton = KeywordAutomaton([], whole_words=True)
+        self._delta_names: List[str] = []
+        self._delta = KeywordAutomaton([], whole_words=True)
+        self.refreshed_at = 0.0
+
+    def add_names(self, rows: List[Tuple[int, str, datetime]], settle_cutoff: datetime) -> None:
+        """Add (id, name, created_at) rows of terrorists past settled_through_id, in ID order"""
+        added = False
+        settling = False
+        for terrorist_id, name, created_at in rows:
+            self.loaded_through_id = max(self.loaded_through_id, terrorist_id)
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            # A lower ID may still be uncommitted while a row this recent is visible
+            settling = settling or created_at > settle_cutoff
+            if not settling:
+                self.settled_through_id = terrorist_id
+            term = normalize_term(name)
+            if len(term) < self.min_name_length or term in self.ids_by_name:
+                continue
+            self.ids_by_name[term] = terrorist_id
+            self._delta_names.append(term)
+            added = True
+        if not added:
+            return
+        if len(self._delta_names) > self.delta_limit:
+            self._automaton = KeywordAutomaton(self.ids_by_name, whole_words=True)
+            self._delta_names = []
+        self._delta = KeywordAutomaton(self._delta_names, whole_words=True)
+
+    def find(self, content: str) -> Set[int]:
+        """IDs of the terrorists whose names occur in content as whole words"""
+        terms = self._automaton.find_terms(content) | self._delta.find_terms(content)
+        return {self.ids_by_name[term] for term in terms}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "names": len(self.ids_by_name),
+            "pending_names": len(self._delta_names),
+            "loaded_through_id": self.loaded_through_id,
+            "settled_through_id": self.settled_through_id,
+        }
+
+
+_linker = EntityLinker(settings.ENTITY_LINK_DELTA_NAMES, settings.ENTITY_LINK_MIN_NAME_LENGTH)
+_linker_lock = threading.Lock()
+_stale = True
+
+
+def mark_names_stale() -> None:
+    """Pick up new terrorists on the next link (after this process created some)"""
+    global _stale
+    _stale = True
+
+
+def get_linker() -> EntityLinker:
+    """Return the name automaton, loading terrorists added since the last refresh"""
+    global _stale
+    with _linker_lock:
+        if _stale or time.monotonic() - _linker.refreshed_at > settings.ENTITY_LINK_REFRESH_SECONDS:
+            _stale = False
+            settle_cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.ENTITY_LINK_SETTLE_SECONDS)
+            _linker.add_names(entity_link_dal.get_terrorist_names_after(_linker.settled_through_id), settle_cutoff)
+            _linker.refreshed_at = time.monotonic()
+        return _linker
+
+
+def find_mentions(content: str, terrorist_id: int) -> List[int]:
+    """
+    Find the other terrorists named in a report's content
+
+    Args:
+        content: Report content
+        terrorist_id: The report's own terrorist (not counted as a mention)
+
+    Returns:
+        Sorted IDs of the named terrorists (at most ENTITY_LINK_MAX_MENTIONS)
+    """
+    mentioned = get_linker().find(content or "") - {terrorist_id}
+    return sorted(mentioned)[:settings.ENTITY_LINK_MAX_MENTIONS]
+
+
+def link_existing_reports(after_id: int = 0, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Link reports already in the database (live ones; re-running is safe)
+
+    Args:
+        after_id: Only reports with a higher ID (to resume an interrupted run)
+        batch_size: Reports per transaction (default ENTITY_LINK_BATCH_SIZE)
+
+    Returns:
+        Summary: reports linked, mentions found, last report ID, duration
+    """
+    started = time.perf_counter()
+    batch_size = batch_size or settings.ENTITY_LINK_BATCH_SIZE
+    reports = mentions = 0
+    last_id = after_id
+    stream = export_dal.open_table_stream(Report, ["id", "terrorist_id", "content"], after_id)
+    try:
+        for rows in stream.iter_batches(batch_size):
+            records: List[MentionRecord] = [
+                (report_id, terrorist_id, find_mentions(content, terrorist_id))
+                for report_id, terrorist_id, content in rows
+            ]
+            entity_link_dal.replace_report_mentions(records)
+            reports += len(records)
+            mentions += sum(len(mentioned) for _, _, mentioned in records)
+            last_id = records[-1][0]
+    finally:
+        stream.close()
+        if reports:
+            bump_data_version_offline()
+    return {
+        "reports": reports,
+        "mentions": mentions,
+        "last_id": last_id,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def on_report_created(report: Report) -> None:
+    """Link a newly created report"""
+    if not settings.ENTITY_LINK_ENABLED:
+        return
+    mentioned = find_mentions(report.content, report.terrorist_id)
+    if mentioned:
+        entity_link_dal.replace_report_mentions([(report.id, report.terrorist_id, mentioned)])
+
+
+def on_report_deleted(report_id: int) -> None:
+    """Remove a deleted report's mentions from the graph"""
+    entity_link_dal.delete_report_mentions(report_id)
+
+
+def get_network(
+    terrorist_id: int,
+    depth: int = 1,
+    min_reports: int = 1,
+    max_nodes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Get the co-occurrence graph around a terrorist
+
+    Args:
+        terrorist_id: ID of the terrorist at the center
+        depth: Maximum number of hops from the center
+        min_reports: Only follow links seen in at least this many reports
+        max_nodes: Stop adding terrorists beyond this many (default ENTITY_LINK_MAX_NODES)
+
+    Returns:
+        Dict with nodes (Terrorist and its hop distance), edges
+        (source, target, report_count; each pair once) and truncated
+
+    Raises:
+        ValueError: If the terrorist doesn't exist or depth is out of range
+    """
+    if not 1 <= depth <= settings.ENTITY_LINK_MAX_DEPTH:
+        raise ValueError(f"depth must be between 1 and {settings.ENTITY_LINK_MAX_DEPTH}")
+    max_nodes = min(max_nodes or settings.ENTITY_LINK_MAX_NODES, settings.ENTITY_LINK_MAX_NODES)
+    if not entity_link_dal.get_terrorists_by_ids([terrorist_id]):
+        raise ValueError(f"Terrorist with ID {terrorist_id} not found")
+
+    depths: Dict[int, int] = {terrorist_id: 0}
+    edges: Dict[Tuple[int, int], int] = {}
+    truncated = False
+    frontier = [terrorist_id]
+    # One extra round at the last depth only collects edges between already found terrorists
+    for hop in range(1, depth + 2):
+        if not frontier:
+            break
+        next_frontier = []
+        for link in entity_link_dal.get_links(frontier, min_reports):
+            linked = link.linked_terrorist_id
+            if linked not in depths:
+                if hop > depth:
+                    continue
+                if len(depths) >= max_nodes:
+                    truncated = True
+                    continue
+                depths[linked] = hop
+                next_frontier.append(linked)
+            pair = (min(link.terrorist_id, linked), max(link.terrorist_id, linked))
+            edges[pair] = link.report_count
+        frontier = next_frontier
+
+    terrorists = {terrorist.id: terrorist for terrorist in entity_link_dal.get_terrorists_by_ids(list(depths))}
+    return {
+        "terrorist_id": terrorist_id,
+        "nodes": [
+            (terrorists[node_id], node_depth)
+            for node_id, node_depth in sorted(depths.items(), key=lambda item: (item[1], item[0]))
+            if node_id in terrorists
+        ],
+        "edges": [
+            {"source": source, "target": target, "report_count": count}
+            for (source, target), count in sorted(edges.items())
+        ],
+        "truncated": truncated,
+    }
+
+
+def entity_link_stats() -> Dict[str, Any]:
+    """Size of the terrorist name automaton"""
+    return {"enabled": settings.ENTITY_LINK_ENABLED, **_linker.stats()}
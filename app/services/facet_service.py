@@ -0,0 +1,183 @@
+"""
+Facet Service - Report and terrorist counts by affiliation, location and time bucket
+
+GET /analytics/facets is answered from two rollup tables kept up to date
+as reports are created and deleted (archived reports stay counted, like
+the other report analytics):
+
+- report_facet: reports and distinct terrorists per (granularity, bucket,
+  affiliation, location). Granularity "all" is a single all-time bucket.
+- report_facet_terrorist: reports per (granularity, bucket, terrorist). It
+  tells when a terrorist enters or leaves a bucket, and gives distinct
+  terrorist counts across a range of buckets.
+
+Without a date range, facets read a handful of all-time rows; the time
+series reads one row per bucket and value. With a range, affiliation and
+location facets read one row per terrorist and bucket in the range. Ranges
+are applied in whole buckets: a week starts on Monday, a month on the 1st
+(UTC).
+
+Rollups for reports that existed before facets were added (or after a
+missed update) are rebuilt by `python manage.py rebuild-facets`.
+"""
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Union
+
+from config import settings
+from app.dal import export_dal, facet_dal
+from app.dal.facet_dal import FacetKey
+from app.models import Report, ReportArchive
+from app.services.response_cache_service import bump_data_version_offline
+
+GRANULARITIES = ("day", "week", "month")
+# Granularity of the single all-time bucket
+ALL_TIME = "all"
+ALL_TIME_BUCKET = date(1970, 1, 1)
+
+
+def bucket_start(moment: Union[datetime, date], granularity: str) -> date:
+    """First day of the day / week / month bucket containing a moment (UTC)"""
+    if isinstance(moment, datetime):
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc)
+        moment = moment.date()
+    if granularity == "day":
+        return moment
+    if granularity == "week":
+        return moment - timedelta(days=moment.weekday())
+    if granularity == "month":
+        return moment.replace(day=1)
+    return ALL_TIME_BUCKET
+
+
+def _add_report(counts: Dict[FacetKey, int], terrorist_id: int, created_at: datetime, sign: int) -> None:
+    for granularity in (*GRANULARITIES, ALL_TIME):
+        key = (terrorist_id, granularity, bucket_start(created_at, granularity))
+        counts[key] = counts.get(key, 0) + sign
+
+
+def on_reports_created(reports: List[Report]) -> None:
+    """Count newly created reports in the rollups"""
+    if not settings.REPORT_FACETS_ENABLED:
+        return
+    deltas: Dict[FacetKey, int] = {}
+    for report in reports:
+        _add_report(deltas, report.terrorist_id, report.created_at, 1)
+    facet_dal.apply_facet_deltas(deltas)
+
+
+def on_report_deleted(report: Any) -> None:
+    """Take a deleted (live or archived) report out of the rollups"""
+    if not settings.REPORT_FACETS_ENABLED:
+        return
+    deltas: Dict[FacetKey, int] = {}
+    _add_report(deltas, report.terrorist_id, report.created_at, -1)
+    facet_dal.apply_facet_deltas(deltas)
+
+
+def rebuild_facets(batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Rebuild the rollups from all live and archived reports
+
+    Reports created while the rebuild runs may be missed or counted twice;
+    run it while ingest is stopped (or run it again).
+
+    Args:
+        batch_size: Reports fetched per round trip (default REPORT_FACETS_REBUILD_BATCH_SIZE)
+
+    Returns:
+        Summary: reports counted, terrorist bucket rows written, duration
+    """
+    started = time.perf_counter()
+    batch_size = batch_size or settings.REPORT_FACETS_REBUILD_BATCH_SIZE
+    counts: Dict[FacetKey, int] = {}
+    reports = 0
+    for model in (Report, ReportArchive):
+        stream = export_dal.open_table_stream(model, ["id", "terrorist_id", "created_at"])
+        try:
+            for rows in stream.iter_batches(batch_size):
+                for _, terrorist_id, created_at in rows:
+                    _add_report(counts, terrorist_id, created_at, 1)
+                reports += len(rows)
+        finally:
+            stream.close()
+    facet_dal.replace_facets(counts)
+    bump_data_version_offline()
+    return {
+        "reports": reports,
+        "terrorist_buckets": len(counts),
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _facet_counts(rows: List[tuple]) -> List[Dict[str, Any]]:
+    return [
+        {"value": value or None, "report_count": report_count, "terrorist_count": terrorist_count}
+        for value, report_count, terrorist_count in rows
+    ]
+
+
+def get_facets(
+    granularity: str = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    affiliation: Optional[str] = None,
+    location: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Get report and terrorist counts by affiliation, location and time bucket
+
+    Args:
+        granularity: Time bucket size: "day", "week" or "month"
+        start: Only buckets containing or after this date
+        end: Only buckets starting on or before this date
+        affiliation: Only terrorists with this affiliation
+        location: Only terrorists in this location
+        limit: Values returned per facet (default and maximum REPORT_FACETS_MAX_VALUES)
+
+    Returns:
+        Dict with the applied filters, report_count and terrorist_count
+        totals, affiliations and locations (value, report_count,
+        terrorist_count; most reports first) and buckets (bucket_start,
+        report_count, terrorist_count; oldest first, at most the latest
+        REPORT_FACETS_MAX_BUCKETS)
+
+    Raises:
+        ValueError: If the granularity or the date range is invalid
+        RuntimeError: If facets are disabled
+    """
+    if not settings.REPORT_FACETS_ENABLED:
+        raise RuntimeError("Report facets are disabled (REPORT_FACETS_ENABLED=false)")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    if start is not None and end is not None and start > end:
+        raise ValueError("start must not be after end")
+    max_values = min(limit or settings.REPORT_FACETS_MAX_VALUES, settings.REPORT_FACETS_MAX_VALUES)
+
+    first_bucket = bucket_start(start, granularity) if start is not None else None
+    bucketed = (first_bucket, end, affiliation, location)
+    if start is None and end is None:
+        # Every report is in the single all-time bucket
+        values = (ALL_TIME, None, None, affiliation, location)
+    else:
+        values = (granularity, *bucketed)
+    report_count, terrorist_count = facet_dal.get_facet_totals(*values)
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "affiliation": affiliation,
+        "location": location,
+        "report_count": report_count,
+        "terrorist_count": terrorist_count,
+        "affiliations": _facet_counts(facet_dal.get_facet_values("affiliation", *values, max_values)),
+        "locations": _facet_counts(facet_dal.get_facet_values("location", *values, max_values)),
+        "buckets": [
+            {"bucket_start": bucket, "report_count": reports, "terrorist_count": terrorists}
+            for bucket, reports, terrorists in facet_dal.get_facet_buckets(
+                granularity, *bucketed, settings.REPORT_FACETS_MAX_BUCKETS
+            )
+        ],
+    }
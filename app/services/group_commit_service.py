@@ -0,0 +1,148 @@
+"""
+Group Commit Service - Micro-batching writer for concurrent single-row inserts
+
+Callers hand their row to a GroupCommitWriter and block until it is stored.
+One flusher thread collects concurrent submissions for up to max_wait_ms or
+max_rows, writes them in one transaction and resolves each caller with its
+own result. Commit (fsync) cost is paid once per batch instead of once per
+request, while callers keep the single-row contract.
+
+If a batch fails as a whole, its rows are retried one by one so a bad row
+only fails its own caller.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from app.dal import report_dal
+from app.models import Report
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Collects submitted items and writes them in batches on one thread"""
+
+    def __init__(
+        self,
+        name: str,
+        write_batch: Callable[[List[Any]], List[Any]],
+        max_rows: int,
+        max_wait_ms: float,
+    ):
+        self.name = name
+        self.write_batch = write_batch
+        self.max_rows = max_rows
+        self.max_wait_seconds = max_wait_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Metrics
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_rows = 0
+        self.fallback_batches = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} writer is shut down")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-group-commit", daemon=True)
+                self._thread.start()
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Queue an item and wait for its own result (or exception)"""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future.result(timeout)
+
+    def _collect(self, first) -> Tuple[List[Tuple[Any, Future]], bool]:
+        """Gather a batch starting with first; returns (batch, stop requested)"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _flush(self, batch: List[Tuple[Any, Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = self.write_batch(items)
+        except Exception:
+            # Retry one by one so each caller gets its own result or error
+            self.fallback_batches += 1
+            for item, future in batch:
+                try:
+                    future.set_result(self.write_batch([item])[0])
+                except Exception as e:
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        self.batches += 1
+        self.rows += len(batch)
+        self.max_batch_rows = max(self.max_batch_rows, len(batch))
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            self._flush(batch)
+            if stop:
+                return
+
+    def shutdown(self) -> None:
+        """Flush what is queued and stop the flusher thread"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_rows": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_batch_rows": self.max_batch_rows,
+            "fallback_batches": self.fallback_batches,
+            "queued": self._queue.qsize(),
+        }
+
+
+def _write_reports(rows: List[Tuple[str, int, int]]) -> List[Report]:
+    return report_dal.create_reports(rows)
+
+
+report_writer = GroupCommitWriter(
+    "reports",
+    _write_reports,
+    settings.REPORT_GROUP_COMMIT_MAX_ROWS,
+    settings.REPORT_GROUP_COMMIT_MAX_WAIT_MS,
+)
+
+
+def get_report_writer() -> GroupCommitWriter:
+    """Return the shared group-commit writer for reports"""
+    return report_writer
+
+
+def group_commit_stats() -> Dict[str, Any]:
+    """Batch counters of the report group-commit writer"""
+    return {"enabled": settings.REPORT_GROUP_COMMIT_ENABLED, **report_writer.stats()}
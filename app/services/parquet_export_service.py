@@ -0,0 +1,301 @@
+"""
+Parquet Export Service - Columnar snapshots of agents, terrorists, reports and archived reports
+
+Each table is written under PARQUET_EXPORT_DIR as a Hive-style dataset
+partitioned by created_at month:
+
+    <dir>/report/month=2026-10/part-<snapshot>.parquet
+
+so `pandas.read_parquet("<dir>/report")` gets every row plus a `month`
+column. Rows are read through a server-side cursor and written batch by batch
+(one row group per batch and month), so memory stays bounded whatever the
+table size.
+
+Incremental snapshots only read rows whose id is above the table's watermark
+(the highest id exported so far, kept in <dir>/_watermarks.json) and add new
+part files next to the existing ones. Ids are allocated before commit, so a
+row can appear below ids already visible: like the change log, an export
+stops at a gap in the ids while the row after it is younger than
+PARQUET_EXPORT_SETTLE_SECONDS, and the next snapshot resumes from there.
+Archived reports keep their original (old) ids, so report_archive is
+watermarked by archived_at instead: each snapshot takes the rows archived up
+to PARQUET_EXPORT_SETTLE_SECONDS ago. A report exported before it was
+archived shows up in both report and report_archive until the next full
+snapshot.
+
+Files are written under hidden names and renamed only once every table is
+done, right before the watermarks are saved, so an interrupted snapshot
+leaves nothing that readers pick up.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from sqlalchemy import DateTime, Integer, String
+from sqlmodel import SQLModel
+
+from config import settings
+from app.dal import export_dal
+from app.models import Agent, Report, ReportArchive, Terrorist
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+WATERMARKS_FILE = "_watermarks.json"
+
+# Table name -> (model, exported columns). Agent passwords are never exported.
+EXPORT_TABLES: Dict[str, Tuple[Type[SQLModel], List[str]]] = {
+    "agent": (Agent, ["id", "name", "username", "created_at"]),
+    "terrorist": (Terrorist, ["id", "name", "name_key", "affiliation", "location", "created_at"]),
+    "report": (Report, ["id", "content", "agent_id", "terrorist_id", "created_at"]),
+    "report_archive": (
+        ReportArchive, ["id", "content", "agent_id", "terrorist_id", "created_at", "archived_at"]
+    ),
+}
+# Tables watermarked by a time column (ISO 8601) instead of the highest id
+TIME_WATERMARKS: Dict[str, str] = {"report_archive": "archived_at"}
+
+Watermark = Union[int, str, None]
+
+_snapshot_lock = threading.Lock()
+
+
+def _require_pyarrow() -> None:
+    if pyarrow is None:
+        raise NotImplementedError("Parquet export requires the pyarrow package")
+
+
+def _arrow_type(column):
+    # Unwrap TypeDecorators such as SQLModel's AutoString
+    column_type = getattr(column.type, "impl", column.type)
+    if isinstance(column_type, Integer):
+        return pyarrow.int64()
+    if isinstance(column_type, DateTime):
+        # Stored naive in UTC; pyarrow treats naive datetimes as UTC
+        return pyarrow.timestamp("us", tz="UTC")
+    if isinstance(column_type, String):
+        return pyarrow.string()
+    raise TypeError(f"No Parquet type mapping for column {column.name} ({column.type})")
+
+
+def _arrow_schema(model: Type[SQLModel], columns: List[str]):
+    table = model.__table__
+    return pyarrow.schema([
+        pyarrow.field(name, _arrow_type(table.c[name]), nullable=table.c[name].nullable)
+        for name in columns
+    ])
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Stored naive in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _month_of(value: datetime) -> str:
+    return _as_utc(value).strftime("%Y-%m")
+
+
+def _initial_watermarks() -> Dict[str, Watermark]:
+    return {name: None if name in TIME_WATERMARKS else 0 for name in EXPORT_TABLES}
+
+
+def load_watermarks(output_dir: Optional[str] = None) -> Dict[str, Watermark]:
+    """
+    Read the per-table watermarks of the last snapshot
+
+    Args:
+        output_dir: Snapshot directory (defaults to PARQUET_EXPORT_DIR)
+
+    Returns:
+        Dict of table name -> highest exported id (0 when never exported),
+        or for report_archive the archived_at cutoff (None when never exported)
+    """
+    path = os.path.join(output_dir or settings.PARQUET_EXPORT_DIR, WATERMARKS_FILE)
+    watermarks = _initial_watermarks()
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as file:
+            watermarks.update(json.load(file).get("watermarks", {}))
+    return watermarks
+
+
+def _save_watermarks(output_dir: str, watermarks: Dict[str, Watermark], snapshot_id: str) -> None:
+    path = os.path.join(output_dir, WATERMARKS_FILE)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump({"snapshot_id": snapshot_id, "watermarks": watermarks}, file, indent=2)
+    os.replace(temp_path, path)
+
+
+def _settled_rows(rows: List[tuple], expected_id: int, created_index: int, settle_cutoff: datetime) -> List[tuple]:
+    """Rows up to the first id gap that an in-flight transaction may still fill"""
+    for index, row in enumerate(rows):
+        if row[0] != expected_id and _as_utc(row[created_index]) > settle_cutoff:
+            return rows[:index]
+        expected_id = row[0] + 1
+    return rows
+
+
+def _export_table(
+    table_dir: str,
+    name: str,
+    watermark: Watermark,
+    snapshot_id: str,
+    batch_size: int,
+    settle_cutoff: datetime,
+) -> Dict[str, Any]:
+    """
+    Write the table's rows past its watermark into per-month hidden part files
+
+    Returns the table summary plus the (hidden, final) path pairs to publish.
+    """
+    model, columns = EXPORT_TABLES[name]
+    schema = _arrow_schema(model, columns)
+    month_index = columns.index("created_at")
+    writers: Dict[str, Any] = {}
+    pending: List[Tuple[str, str]] = []
+    row_count = 0
+
+    time_column = TIME_WATERMARKS.get(name)
+    if time_column is not None:
+        after = datetime.fromisoformat(watermark) if watermark else None
+        stream = export_dal.open_table_stream_between(model, columns, time_column, after, settle_cutoff)
+        watermark = settle_cutoff.isoformat()
+    else:
+        stream = export_dal.open_table_stream(model, columns, watermark)
+    try:
+        for rows in stream.iter_batches(batch_size):
+            gap = False
+            if time_column is None:
+                settled = _settled_rows(rows, watermark + 1, month_index, settle_cutoff)
+                gap = len(settled) < len(rows)
+                rows = settled
+            by_month: Dict[str, List[tuple]] = {}
+            for row in rows:
+                by_month.setdefault(_month_of(row[month_index]), []).append(row)
+            for month, month_rows in by_month.items():
+                if month not in writers:
+                    partition_dir = os.path.join(table_dir, f"month={month}")
+                    os.makedirs(partition_dir, exist_ok=True)
+                    file_name = f"part-{snapshot_id}.parquet"
+                    hidden_path = os.path.join(partition_dir, "." + file_name)
+                    pending.append((hidden_path, os.path.join(partition_dir, file_name)))
+                    writers[month] = pyarrow.parquet.ParquetWriter(
+                        hidden_path, schema, compression=settings.PARQUET_EXPORT_COMPRESSION
+                    )
+                batch = pyarrow.Table.from_pydict(
+                    {name: [row[i] for row in month_rows] for i, name in enumerate(columns)},
+                    schema=schema,
+                )
+                writers[month].write_table(batch)
+            row_count += len(rows)
+            if time_column is None and rows:
+                watermark = rows[-1][0]
+            if gap:
+                break
+    except Exception:
+        for writer in writers.values():
+            writer.close()
+        for hidden_path, _ in pending:
+            if os.path.exists(hidden_path):
+                os.remove(hidden_path)
+        raise
+    finally:
+        stream.close()
+
+    for writer in writers.values():
+        writer.close()
+    return {
+        "rows": row_count,
+        "files": len(pending),
+        "watermark": watermark,
+        "pending": pending,
+    }
+
+
+def export_parquet_snapshot(
+    incremental: bool = True,
+    output_dir: Optional[str] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Export agents, terrorists, reports and archived reports to partitioned Parquet files
+
+    Args:
+        incremental: Only append rows past the last watermarks; when False
+            the existing snapshot is replaced by a full export
+        output_dir: Snapshot directory (defaults to PARQUET_EXPORT_DIR)
+        batch_size: Rows per fetch / row group (defaults to PARQUET_EXPORT_BATCH_SIZE)
+
+    Returns:
+        Summary with per-table row counts, files written and new watermarks
+
+    Raises:
+        NotImplementedError: If pyarrow is not installed
+        RuntimeError: If another snapshot is already running
+    """
+    _require_pyarrow()
+    if not _snapshot_lock.acquire(blocking=False):
+        raise RuntimeError("A Parquet snapshot is already running")
+    try:
+        output_dir = output_dir or settings.PARQUET_EXPORT_DIR
+        batch_size = batch_size or settings.PARQUET_EXPORT_BATCH_SIZE
+        started = time.perf_counter()
+        snapshot_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        os.makedirs(output_dir, exist_ok=True)
+
+        watermarks = load_watermarks(output_dir) if incremental else _initial_watermarks()
+        settle_cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.PARQUET_EXPORT_SETTLE_SECONDS)
+        # A full export is staged next to the live dataset and swapped in at the end
+        staging_suffix = "" if incremental else f".staging-{snapshot_id}"
+
+        tables: Dict[str, Dict[str, Any]] = {}
+        try:
+            for name in EXPORT_TABLES:
+                tables[name] = _export_table(
+                    os.path.join(output_dir, name + staging_suffix),
+                    name,
+                    watermarks[name],
+                    snapshot_id,
+                    batch_size,
+                    settle_cutoff,
+                )
+        except Exception:
+            for summary in tables.values():
+                for hidden_path, _ in summary["pending"]:
+                    if os.path.exists(hidden_path):
+                        os.remove(hidden_path)
+            if staging_suffix:
+                for name in EXPORT_TABLES:
+                    shutil.rmtree(os.path.join(output_dir, name + staging_suffix), ignore_errors=True)
+            raise
+
+        # Publish: reveal the part files, then record the new watermarks
+        for summary in tables.values():
+            for hidden_path, final_path in summary.pop("pending"):
+                os.replace(hidden_path, final_path)
+        if staging_suffix:
+            for name in EXPORT_TABLES:
+                live_dir = os.path.join(output_dir, name)
+                staged_dir = live_dir + staging_suffix
+                shutil.rmtree(live_dir, ignore_errors=True)
+                if os.path.isdir(staged_dir):
+                    os.replace(staged_dir, live_dir)
+        new_watermarks = {name: summary["watermark"] for name, summary in tables.items()}
+        _save_watermarks(output_dir, new_watermarks, snapshot_id)
+
+        return {
+            "snapshot_id": snapshot_id,
+            "output_dir": os.path.abspath(output_dir),
+            "incremental": incremental,
+            "tables": tables,
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        }
+    finally:
+        _snapshot_lock.release()
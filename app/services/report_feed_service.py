@@ -0,0 +1,289 @@
+"""
+Report Feed Service - Push notifications of created and deleted reports
+
+Writers publish events (report.created, report.deleted and watchlist.match
+for reports that hit a standing query) through a broker; every worker process fans the
+events it receives out to its own subscribers via an in-process FeedHub.
+
+- LocalBroker: single-process stand-in, delivers straight to the local hub.
+- RedisBroker: Redis pub/sub, so subscribers on any worker see every write
+  ("fakeredis://" URLs work for local testing).
+
+In-process consumers (e.g. the trending tracker) register a listener on the
+hub and see every worker's events the same way.
+
+Each subscriber has a bounded buffer. A subscriber that falls behind by more
+than REPORT_FEED_BUFFER_SIZE events is dropped (told so, then disconnected)
+rather than slowing down writers or growing memory without limit.
+"""
+import asyncio
+import collections
+import itertools
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from config import settings
+from app.services.cache_service import make_redis_client
+
+REPORT_CREATED = "report.created"
+REPORT_DELETED = "report.deleted"
+WATCHLIST_MATCH = "watchlist.match"
+
+
+class Subscription:
+    """One feed consumer: its filters, bounded buffer and wake-up event"""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        buffer_size: int,
+        terrorist_id: Optional[int] = None,
+        agent_id: Optional[int] = None,
+        keyword: Optional[str] = None,
+        watchlist_id: Optional[int] = None,
+    ):
+        self.loop = loop
+        self.buffer_size = buffer_size
+        self.terrorist_id = terrorist_id
+        self.agent_id = agent_id
+        self.keyword = keyword.lower() if keyword else None
+        # Set: only this watchlist's match events; unset: only report events
+        self.watchlist_id = watchlist_id
+        self.dropped = False
+        self.delivered = 0
+        self._buffer: collections.deque = collections.deque()
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if event["type"] == WATCHLIST_MATCH:
+            if event["watchlist_id"] != self.watchlist_id:
+                return False
+        elif self.watchlist_id is not None:
+            return False
+        report = event["report"]
+        if self.terrorist_id is not None and report["terrorist_id"] != self.terrorist_id:
+            return False
+        if self.agent_id is not None and report["agent_id"] != self.agent_id:
+            return False
+        if self.keyword is not None and self.keyword not in (report.get("content") or "").lower():
+            return False
+        return True
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """Buffer an event (any thread); False if this subscriber had to be dropped"""
+        with self._lock:
+            if self.dropped:
+                return False
+            if len(self._buffer) >= self.buffer_size:
+                self.dropped = True
+                self._buffer.clear()
+            else:
+                self._buffer.append(event)
+        try:
+            self.loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Event loop already closed: the consumer is gone
+            self.dropped = True
+        return not self.dropped
+
+    async def next_events(self, timeout: float) -> List[Dict[str, Any]]:
+        """Wait up to timeout for buffered events; [] on timeout or when dropped"""
+        if not self._buffer and not self.dropped:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        with self._lock:
+            self._ready.clear()
+            events = list(self._buffer)
+            self._buffer.clear()
+        self.delivered += len(events)
+        return events
+
+
+class FeedHub:
+    """In-process fan-out of feed events to matching subscribers"""
+
+    def __init__(self, buffer_size: int, max_subscribers: int):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscriptions: List[Subscription] = []
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        # Metrics
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(self, **filters) -> Subscription:
+        """
+        Register a subscriber on the running event loop
+
+        Raises:
+            RuntimeError: If the subscriber limit is reached
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.buffer_size, **filters)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                raise RuntimeError("Too many feed subscribers, retry later")
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call listener(event) synchronously for every event this process receives"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def notify_listeners(self, event: Dict[str, Any]) -> None:
+        for listener in list(self._listeners):
+            listener(event)
+
+    def publish_local(self, event: Dict[str, Any]) -> None:
+        """Deliver an event to this process's listeners and subscribers (safe from any thread)"""
+        self.notify_listeners(event)
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        self.published += 1
+        for subscription in subscriptions:
+            if subscription.matches(event) and not subscription.offer(event):
+                self.dropped_subscribers += 1
+                self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+class LocalBroker:
+    """Single-process broker: publishing delivers straight to the local hub"""
+
+    name = "local"
+
+    def __init__(self, hub: FeedHub):
+        self.hub = hub
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self.hub.publish_local(event)
+
+    def close(self) -> None:
+        pass
+
+
+class RedisBroker:
+    """Cross-worker broker over Redis pub/sub; a listener thread feeds the local hub"""
+
+    name = "redis"
+
+    def __init__(self, hub: FeedHub, url: str, channel: str):
+        self.hub = hub
+        self.channel = channel
+        self._client = make_redis_client(url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(channel)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._listen, name="report-feed-redis", daemon=True)
+        self._thread.start()
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self._client.publish(self.channel, json.dumps(event, default=str))
+
+    def _listen(self) -> None:
+        while not self._closed.is_set():
+            message = self._pubsub.get_message(timeout=1.0)
+            if message and message["type"] == "message":
+                self.hub.publish_local(json.loads(message["data"]))
+
+    def close(self) -> None:
+        self._closed.set()
+        self._thread.join(timeout=5)
+        self._pubsub.close()
+
+
+feed_hub = FeedHub(settings.REPORT_FEED_BUFFER_SIZE, settings.REPORT_FEED_MAX_SUBSCRIBERS)
+_broker = None
+_broker_lock = threading.Lock()
+_event_ids = itertools.count(1)
+
+
+def get_feed_hub() -> FeedHub:
+    """Return this process's feed hub"""
+    return feed_hub
+
+
+def get_broker():
+    """Return the configured broker, created on first use"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if settings.REPORT_FEED_BROKER == "redis":
+                _broker = RedisBroker(feed_hub, settings.REPORT_FEED_REDIS_URL, settings.REPORT_FEED_CHANNEL)
+            else:
+                _broker = LocalBroker(feed_hub)
+        return _broker
+
+
+def close_broker() -> None:
+    """Stop the broker's background listener (on shutdown)"""
+    global _broker
+    with _broker_lock:
+        if _broker is not None:
+            _broker.close()
+            _broker = None
+
+
+def publish_report_event(event_type: str, report: Dict[str, Any]) -> None:
+    """
+    Publish a report.created / report.deleted event
+
+    Args:
+        event_type: REPORT_CREATED or REPORT_DELETED
+        report: JSON-compatible report fields (id, content, agent_id, terrorist_id, created_at)
+    """
+    _publish(event_type, report)
+
+
+def publish_watchlist_match(watchlist_id: int, matched_keywords: List[str], report: Dict[str, Any]) -> None:
+    """
+    Publish a watchlist.match event to the watchlist's subscribers
+
+    Args:
+        watchlist_id: ID of the watchlist the report matched
+        matched_keywords: Watchlist keywords found in the report ([] for a terrorist match)
+        report: JSON-compatible report fields
+    """
+    _publish(WATCHLIST_MATCH, report, watchlist_id=watchlist_id, matched_keywords=matched_keywords)
+
+
+def _publish(event_type: str, report: Dict[str, Any], **extra) -> None:
+    event = {
+        "id": next(_event_ids),
+        "type": event_type,
+        "at": datetime.now(timezone.utc).isoformat(),
+        "report": report,
+        **extra,
+    }
+    if settings.REPORT_FEED_ENABLED:
+        get_broker().publish(event)
+    else:
+        # No feed: in-process listeners still need this worker's events
+        feed_hub.notify_listeners(event)
+
+
+def report_feed_stats() -> Dict[str, Any]:
+    """Subscriber and delivery counters for the report feed"""
+    return {
+        "enabled": settings.REPORT_FEED_ENABLED,
+        "broker": settings.REPORT_FEED_BROKER,
+        **feed_hub.stats(),
+    }
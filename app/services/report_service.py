@@ -1,16 +1,39 @@
 """
 Report Service - Business Logic Layer for Report Operations
 """
+from datetime import datetime, timezone
 from typing import Optional, List, Tuple
+from config import settings
 from app.models import Report, Terrorist
-from app.dal import report_dal
-from app.services import agent_service, terrorist_service
+from app.dal import report_dal, archive_dal
+from app.dal.sql_dal import StreamingQuery
+from app.services import (
+    agent_service,
+    terrorist_service,
+    watchlist_service,
+    scoring_service,
+    dedup_service,
+    entity_link_service,
+    rescan_service,
+    facet_service,
+)
+from app.services.response_cache_service import bump_data_version
+from app.services.singleflight_service import coalesce
+from app.services.group_commit_service import get_report_writer
+from app.services.report_feed_service import REPORT_CREATED, REPORT_DELETED, publish_report_event
+from app.responses import report_serializer
 
 
 def create_report(content: str, agent_id: int, terrorist_id: int) -> Report:
     """
     Create a new intelligence report
     
+    With REPORT_GROUP_COMMIT_ENABLED, concurrent creates are inserted and
+    committed together by the group-commit writer. The new report is
+    checked for near-duplicates of earlier reports (see dedup_service),
+    matched against all watchlists, linked to the terrorists its content
+    names and added to its terrorist's danger score.
+    
     Args:
         content: Content of the report
         agent_id: ID of the agent creating the report
@@ -21,6 +44,7 @@ def create_report(content: str, agent_id: int, terrorist_id: int) -> Report:
         
     Raises:
         ValueError: If agent_id or terrorist_id is invalid
+        DuplicateReportError: If REPORT_DEDUP_MODE=reject and a near-duplicate exists
     """
     # Validate agent exists
     agent = agent_service.get_agent_by_id(agent_id)
@@ -32,20 +56,57 @@ def create_report(content: str, agent_id: int, terrorist_id: int) -> Report:
     if not terrorist:
         raise ValueError(f"Terrorist with ID {terrorist_id} not found")
     
-    return report_dal.create_report(content, agent_id, terrorist_id)
+    dedup_check = dedup_service.check_report(content, terrorist_id)
+    
+    if settings.REPORT_GROUP_COMMIT_ENABLED:
+        # Committed together with other concurrent creates
+        report = get_report_writer().submit((content, agent_id, terrorist_id))
+    else:
+        report = report_dal.create_report(content, agent_id, terrorist_id)
+    try:
+        dedup_service.record_report(report, dedup_check)
+    except Exception as e:
+        print(f"⚠️ Near-duplicate clustering failed for report {report.id}: {e}")
+    try:
+        watchlist_service.match_reports([report])
+    except Exception as e:
+        # The report is committed; a matching failure must not turn into a failed (retried) create
+        print(f"⚠️ Watchlist matching failed for report {report.id}: {e}")
+    try:
+        entity_link_service.on_report_created(report)
+    except Exception as e:
+        print(f"⚠️ Entity linking failed for report {report.id}: {e}")
+    try:
+        scoring_service.on_reports_created([report])
+    except Exception as e:
+        # Same here; `python manage.py recompute-scores` repairs a missed update
+        print(f"⚠️ Danger score update failed for report {report.id}: {e}")
+    try:
+        facet_service.on_reports_created([report])
+    except Exception as e:
+        # `python manage.py rebuild-facets` repairs a missed update
+        print(f"⚠️ Facet rollup update failed for report {report.id}: {e}")
+    # After every derived write, so nothing cached under the new version misses this report
+    bump_data_version()
+    publish_report_event(REPORT_CREATED, report_serializer.to_python([report])[0])
+    return report
 
 
-def get_report_by_id(report_id: int) -> Optional[Report]:
+def get_report_by_id(report_id: int, include_archive: bool = False) -> Optional[Report]:
     """
     Get report by ID
     
     Args:
         report_id: ID of the report
+        include_archive: Also look in the report archive
         
     Returns:
-        Report object if found, None otherwise
+        Report (or ReportArchive) object if found, None otherwise
     """
-    return report_dal.get_report_by_id(report_id)
+    report = report_dal.get_report_by_id(report_id)
+    if report is None and include_archive:
+        report = archive_dal.get_archived_report_by_id(report_id)
+    return report
 
 
 def get_all_reports() -> List[Report]:
@@ -88,53 +149,115 @@ def get_reports_by_terrorist(
     return list(report_dal.get_reports_by_terrorist(terrorist_id, limit))
 
 
-def search_reports_by_content(keyword: str) -> List[Report]:
+def search_reports_by_content(keyword: str, include_archive: bool = False) -> List[Report]:
     """
     Search reports by keyword in content
     
     Args:
         keyword: Keyword to search for
+        include_archive: Also search archived reports
         
     Returns:
         List of matching reports
     """
-    return list(report_dal.search_reports_by_content(keyword))
+    reports = list(report_dal.search_reports_by_content(keyword))
+    if include_archive:
+        reports += archive_dal.search_archived_reports_by_content(keyword)
+    return reports
 
 
-def search_reports_by_text(keyword: str) -> List[Report]:
+def search_reports_by_text(keyword: str, include_archive: bool = False) -> List[Report]:
     """
     Search reports by keyword in content (alias for search_reports_by_content)
     
+    Concurrent identical searches share one query.
+    
     Args:
         keyword: Keyword to search for
+        include_archive: Also search archived reports
         
     Returns:
         List of matching reports
     """
-    return search_reports_by_content(keyword)
+    return list(coalesce(
+        "search_text",
+        lambda: search_reports_by_content(keyword, include_archive),
+        keyword,
+        include_archive,
+    ))
 
 
-def search_reports_by_terrorist(terrorist_id: int) -> dict:
+def search_reports_by_terrorist(terrorist_id: int, include_archive: bool = False) -> dict:
     """
     Search reports by terrorist ID, returning count and first 5 reports
     
+    The count always includes archived reports.
+    
     Args:
         terrorist_id: ID of the terrorist
+        include_archive: Fill up the first 5 with archived reports if needed
         
     Returns:
         Dict with total_count and reports list
     """
     total_count = count_reports_by_terrorist(terrorist_id)
     reports = get_reports_by_terrorist(terrorist_id, limit=5)
+    if include_archive and len(reports) < 5:
+        reports += archive_dal.get_archived_reports_by_terrorist(terrorist_id, limit=5 - len(reports))
     return {
         "total_count": total_count,
         "reports": reports
     }
 
 
+def open_report_export(
+    agent_id: Optional[int] = None,
+    terrorist_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    keyword: Optional[str] = None,
+    dangerous_only: bool = False,
+    include_names: bool = False,
+) -> StreamingQuery:
+    """
+    Start a filtered export of reports, read through a server-side cursor
+    
+    Args:
+        agent_id: Only reports written by this agent
+        terrorist_id: Only reports about this terrorist
+        created_from: Only reports created at or after this time (naive = UTC)
+        created_to: Only reports created before this time (naive = UTC)
+        keyword: Only reports whose content contains this keyword
+        dangerous_only: Only reports containing weapon keywords
+        include_names: Add terrorist_name and agent_name columns
+        
+    Returns:
+        Open StreamingQuery ordered by report ID (caller must close it)
+        
+    Raises:
+        ValueError: If the time range is empty
+    """
+    if created_from is not None and created_from.tzinfo is None:
+        created_from = created_from.replace(tzinfo=timezone.utc)
+    if created_to is not None and created_to.tzinfo is None:
+        created_to = created_to.replace(tzinfo=timezone.utc)
+    if created_from and created_to and created_from >= created_to:
+        raise ValueError("created_from must be earlier than created_to")
+    return report_dal.open_report_export(
+        statement_timeout_ms=settings.REPORT_EXPORT_STATEMENT_TIMEOUT_MS or None,
+        agent_id=agent_id,
+        terrorist_id=terrorist_id,
+        created_from=created_from,
+        created_to=created_to,
+        keyword=keyword,
+        dangerous_only=dangerous_only,
+        include_names=include_names,
+    )
+
+
 def delete_report(report_id: int, agent_id: Optional[int] = None) -> bool:
     """
-    Delete a report
+    Delete a report (archived reports included)
     
     Args:
         report_id: ID of the report to delete
@@ -146,18 +269,49 @@ def delete_report(report_id: int, agent_id: Optional[int] = None) -> bool:
     Raises:
         PermissionError: If agent_id is provided and doesn't match report's author
     """
+    report = None
+    if (
+        agent_id is not None
+        or settings.REPORT_FEED_ENABLED
+        or settings.DANGER_SCORE_ENABLED
+        or settings.REPORT_FACETS_ENABLED
+    ):
+        report = get_report_by_id(report_id, include_archive=True)
+    
     # Check authorization if agent_id is provided
     if agent_id is not None:
-        report = get_report_by_id(report_id)
         if report and report.agent_id != agent_id:
             raise PermissionError("You can only delete your own reports")
     
-    return report_dal.delete_report(report_id)
+    deleted = report_dal.delete_report(report_id) or archive_dal.delete_archived_report(report_id)
+    if deleted:
+        try:
+            dedup_service.on_report_deleted(report_id)
+        except Exception as e:
+            print(f"⚠️ Near-duplicate cluster update failed for deleted report {report_id}: {e}")
+        try:
+            entity_link_service.on_report_deleted(report_id)
+        except Exception as e:
+            print(f"⚠️ Entity link update failed for deleted report {report_id}: {e}")
+        if report is not None:
+            try:
+                scoring_service.on_report_deleted(report)
+            except Exception as e:
+                print(f"⚠️ Danger score update failed for deleted report {report_id}: {e}")
+            try:
+                facet_service.on_report_deleted(report)
+            except Exception as e:
+                print(f"⚠️ Facet rollup update failed for deleted report {report_id}: {e}")
+        # After every derived write, so nothing cached under the new version still has this report
+        bump_data_version()
+        if report is not None:
+            publish_report_event(REPORT_DELETED, report_serializer.to_python([report])[0])
+    return deleted
 
 
 def count_reports_by_terrorist(terrorist_id: int) -> int:
     """
-    Count reports for a specific terrorist
+    Count reports for a specific terrorist (archived reports included)
     
     Args:
         terrorist_id: ID of the terrorist
@@ -168,24 +322,45 @@ def count_reports_by_terrorist(terrorist_id: int) -> int:
     return report_dal.count_reports_by_terrorist(terrorist_id)
 
 
-def get_dangerous_terrorists(min_reports: int = 5) -> List[Tuple[Terrorist, int]]:
+def get_dangerous_terrorists(min_reports: int = 5, count_clusters: bool = False) -> List[Tuple[Terrorist, int]]:
     """
     Get terrorists with more than min_reports reports
     
+    Concurrent identical calls share one query.
+    
     Args:
         min_reports: Minimum number of reports to be considered dangerous
+        count_clusters: Count near-duplicate clusters instead of raw reports
         
     Returns:
         List of tuples (Terrorist, report_count)
     """
-    return list(report_dal.get_dangerous_terrorists(min_reports))
+    return list(coalesce(
+        "dangerous",
+        lambda: list(report_dal.get_dangerous_terrorists(min_reports, count_clusters)),
+        min_reports,
+        count_clusters,
+    ))
 
 
-def get_super_dangerous_terrorists() -> List[Tuple[Terrorist, int]]:
+def get_super_dangerous_terrorists(count_clusters: bool = False) -> List[Tuple[Terrorist, int]]:
     """
     Get super dangerous terrorists (>10 reports with weapon keywords)
     
+    Concurrent calls share one computation. Once every report is classified
+    under the current keyword rules (see rescan_service), the keyword check
+    is answered from report_classification in the same query.
+    
+    Args:
+        count_clusters: Count near-duplicate clusters instead of raw reports
+    
     Returns:
         List of tuples (Terrorist, report_count)
     """
-    return report_dal.get_super_dangerous_terrorists()
+    use_classification = rescan_service.classification_is_current()
+    return list(coalesce(
+        "super_dangerous",
+        lambda: report_dal.get_super_dangerous_terrorists(count_clusters, use_classification),
+        count_clusters,
+        use_classification,
+    ))
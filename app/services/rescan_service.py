@@ -0,0 +1,151 @@
+"""
+Rescan Service - Re-classify every stored report after the keyword rules change
+
+Reports are classified (weapon keywords found, dangerous or not) into
+`report_classification` when they are created. When DANGEROUS_KEYWORDS
+changes, so does DANGEROUS_RULES_VERSION, and every stored report - live
+and archived - has to be classified again:
+
+    python manage.py rescan-reports [--workers N] [--chunk-size N] [--restart]
+
+The main process streams reports in ID order (server-side cursor) and hands
+chunks to a ProcessPoolExecutor, so matching uses every core instead of
+one. Results are written back in order, one batched delete+insert per
+chunk, in the same transaction as the checkpoint in `rescan_checkpoint`:
+an interrupted rescan resumes after the last written chunk. At most two
+chunks per worker are in flight, which bounds memory.
+
+Until the rescan for the current rules completes, /reports/super-dangerous
+keeps checking report content itself; afterwards it answers from the
+classifications in a single query.
+"""
+import collections
+import json
+import os
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from app.models import Report, ReportArchive
+from app.dal import export_dal, rescan_dal
+from app.dal.report_dal import DANGEROUS_RULES_VERSION, dangerous_keywords_in
+from app.services.response_cache_service import bump_data_version_offline
+
+
+def _classify_chunk(rows: List[Tuple[int, int, str]], rules_version: str) -> List[Dict[str, Any]]:
+    """Classify (id, terrorist_id, content) rows; runs in a worker process"""
+    if rules_version != DANGEROUS_RULES_VERSION:
+        # A worker started from different code would silently write other results
+        raise RuntimeError(f"Worker rules version {DANGEROUS_RULES_VERSION} != {rules_version}")
+    classified_at = datetime.now(timezone.utc)
+    classified = []
+    for report_id, terrorist_id, content in rows:
+        matched = dangerous_keywords_in(content)
+        classified.append({
+            "report_id": report_id,
+            "terrorist_id": terrorist_id,
+            "dangerous": bool(matched),
+            "matched_keywords": json.dumps(matched, ensure_ascii=False),
+            "rules_version": rules_version,
+            "classified_at": classified_at,
+        })
+    return classified
+
+
+def classification_is_current() -> bool:
+    """Whether every stored report is classified under the current keyword rules"""
+    checkpoint = rescan_dal.get_rescan_checkpoint(DANGEROUS_RULES_VERSION)
+    return checkpoint is not None and checkpoint.completed_at is not None
+
+
+def rescan_reports(
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    restart: bool = False,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Classify every stored report under the current keyword rules
+
+    Args:
+        workers: Worker processes (default RESCAN_WORKERS, 0 = one per CPU core)
+        chunk_size: Reports per chunk / write transaction (default RESCAN_CHUNK_SIZE)
+        restart: Start over instead of resuming from the checkpoint
+        progress: Called with a progress dict every RESCAN_PROGRESS_SECONDS
+
+    Returns:
+        Summary: rules version, reports classified by this run, dangerous
+        ones, duration, throughput, and whether it resumed or was already done
+    """
+    workers = workers or settings.RESCAN_WORKERS or os.cpu_count() or 1
+    chunk_size = chunk_size or settings.RESCAN_CHUNK_SIZE
+    checkpoint = rescan_dal.get_rescan_checkpoint(DANGEROUS_RULES_VERSION)
+    if checkpoint is not None and checkpoint.completed_at is not None and not restart:
+        return {
+            "rules_version": DANGEROUS_RULES_VERSION,
+            "already_complete": True,
+            "scanned": 0,
+            "dangerous": 0,
+            "workers": 0,
+            "duration_seconds": 0.0,
+            "reports_per_second": 0.0,
+        }
+    resumed = checkpoint is not None and not restart
+    if not resumed:
+        checkpoint = rescan_dal.start_rescan_checkpoint(DANGEROUS_RULES_VERSION)
+
+    started = time.perf_counter()
+    last_progress = started
+    totals = {"scanned": 0, "dangerous": 0}
+
+    def write(through_field: str, rows: List[Tuple[int, int, str]], classified: List[Dict[str, Any]]) -> None:
+        nonlocal last_progress
+        rescan_dal.write_classifications(DANGEROUS_RULES_VERSION, classified, through_field, rows[-1][0])
+        totals["scanned"] += len(classified)
+        totals["dangerous"] += sum(1 for row in classified if row["dangerous"])
+        now = time.perf_counter()
+        if progress is not None and now - last_progress >= settings.RESCAN_PROGRESS_SECONDS:
+            last_progress = now
+            progress({
+                "table": through_field,
+                "through_id": rows[-1][0],
+                "scanned": totals["scanned"],
+                "reports_per_second": round(totals["scanned"] / (now - started), 1),
+            })
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for model, through_field in ((Report, "report_through_id"), (ReportArchive, "archive_through_id")):
+            stream = export_dal.open_table_stream(
+                model, ["id", "terrorist_id", "content"], getattr(checkpoint, through_field)
+            )
+            pending: collections.deque = collections.deque()
+            try:
+                for batch in stream.iter_batches(chunk_size):
+                    rows = [tuple(row) for row in batch]
+                    pending.append((rows, pool.submit(_classify_chunk, rows, DANGEROUS_RULES_VERSION)))
+                    # Write in ID order so the checkpoint only ever moves past finished chunks
+                    while len(pending) >= 2 * workers:
+                        rows, future = pending.popleft()
+                        write(through_field, rows, future.result())
+                while pending:
+                    rows, future = pending.popleft()
+                    write(through_field, rows, future.result())
+            finally:
+                stream.close()
+
+    rescan_dal.complete_rescan(DANGEROUS_RULES_VERSION)
+    # Responses cached during the rescan were computed from the old keyword rules
+    bump_data_version_offline()
+    duration = time.perf_counter() - started
+    return {
+        "rules_version": DANGEROUS_RULES_VERSION,
+        "already_complete": False,
+        "resumed": resumed,
+        "scanned": totals["scanned"],
+        "dangerous": totals["dangerous"],
+        "workers": workers,
+        "duration_seconds": round(duration, 3),
+        "reports_per_second": round(totals["scanned"] / duration, 1) if duration else 0.0,
+    }
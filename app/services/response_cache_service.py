@@ -0,0 +1,166 @@
+"""
+Response Cache Service - Data-versioned cache for serialized analytics responses
+
+Every write that changes report data bumps a global data version. Cached
+responses are keyed by (endpoint, params, version), so a bump makes all older
+entries unreachable without explicit invalidation; they age out of the LRU.
+
+The version is shared by every worker. With the Redis entity cache it is a
+Redis counter. Otherwise it is made of two random tokens in the
+`data_version` table: each bump writes a new server token, and workers poll
+the table every DATA_VERSION_POLL_SECONDS, so a write on one worker reaches
+the others within that time (and equal versions always mean equal data).
+
+Offline commands (manage.py archive-reports, restore, rescan-reports, ...)
+run in another process and write the other, offline token. Servers that
+see it change also clear their entity cache.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import settings
+from app.services.cache_service import LRUTTLCache, get_entity_cache, make_redis_client
+from app.dal import data_version_dal
+from app.responses import dumps
+
+DATA_VERSION_KEY = "intel:data_version"
+
+
+class DataVersion:
+    """Data version shared by all workers (a Redis counter, or tokens in the data_version table)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        if settings.ENTITY_CACHE_ENABLED and settings.ENTITY_CACHE_BACKEND == "redis":
+            self._client = make_redis_client(settings.ENTITY_CACHE_REDIS_URL)
+        self._tokens: Optional[Dict[int, str]] = None
+        self._checked_at: Optional[float] = None
+
+    def _poll(self, force: bool = False) -> None:
+        """Pick up data changes made by other workers and manage.py commands"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._checked_at is not None and now - self._checked_at < settings.DATA_VERSION_POLL_SECONDS:
+                return
+            self._checked_at = now
+        try:
+            tokens = data_version_dal.get_data_version_tokens()
+        except Exception as e:
+            print(f"⚠️ Checking for data changes failed: {e}")
+            return
+        with self._lock:
+            offline = data_version_dal.OFFLINE_CHANGE
+            offline_changed = self._tokens is not None and tokens.get(offline) != self._tokens.get(offline)
+            self._tokens = tokens
+        if offline_changed:
+            get_entity_cache().clear()
+            if self._client is not None:
+                self._client.incr(DATA_VERSION_KEY)
+
+    def current(self) -> str:
+        self._poll()
+        if self._client is not None:
+            return str(int(self._client.get(DATA_VERSION_KEY) or 0))
+        with self._lock:
+            tokens = self._tokens or {}
+        return f"{tokens.get(data_version_dal.OFFLINE_CHANGE, '')}.{tokens.get(data_version_dal.ONLINE_CHANGE, '')}"
+
+    def bump(self) -> str:
+        if self._client is not None:
+            return str(int(self._client.incr(DATA_VERSION_KEY)))
+        if self._tokens is None:
+            # Know the offline token first, or the next poll would mistake it for a change
+            self._poll(force=True)
+        try:
+            token = data_version_dal.change_data_version_token(data_version_dal.ONLINE_CHANGE)
+        except Exception as e:
+            # The write itself is committed; at least this worker stops serving old responses
+            print(f"⚠️ Recording the data change failed: {e}")
+            token = uuid.uuid4().hex
+        with self._lock:
+            self._tokens = {**(self._tokens or {}), data_version_dal.ONLINE_CHANGE: token}
+        return self.current()
+
+
+data_version = DataVersion()
+response_cache = LRUTTLCache(
+    settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS
+)
+
+
+def get_data_version() -> str:
+    """Return the current global data version"""
+    return data_version.current()
+
+
+def bump_data_version() -> str:
+    """Mark report data as changed; returns the new version"""
+    return data_version.bump()
+
+
+def bump_data_version_offline() -> str:
+    """Mark report data as changed from a manage.py command (reaches running servers too)"""
+    data_version_dal.change_data_version_token()
+    return data_version.bump()
+
+
+def make_cache_key(endpoint: str, params: Dict[str, Any], version: str) -> str:
+    """Build the cache key for an endpoint call at a data version"""
+    encoded_params = json.dumps(params, sort_keys=True, default=str)
+    return f"{endpoint}?{encoded_params}@{version}"
+
+
+def make_etag(cache_key: str) -> str:
+    """Derive a strong ETag from a cache key"""
+    return '"' + hashlib.sha1(cache_key.encode("utf-8")).hexdigest() + '"'
+
+
+def serialize_json(payload: Any) -> bytes:
+    """Serialize a JSON-compatible payload (orjson when available)"""
+    return dumps(payload)
+
+
+def get_or_compute(
+    endpoint: str,
+    params: Dict[str, Any],
+    compute: Callable[[], Any],
+    encode: Callable[[Any], bytes] = serialize_json,
+) -> Tuple[str, bytes]:
+    """
+    Return (etag, serialized body) for an endpoint call, computing it on a miss
+    
+    `encode` turns the computed payload into the body bytes; callers using a
+    non-JSON encoding must include it in `params` so bodies don't collide.
+
+    The version is read before computing, so a write racing with the
+    computation can only ever be cached under the older version.
+    """
+    cache_key = make_cache_key(endpoint, params, get_data_version())
+    etag = make_etag(cache_key)
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return etag, encode(compute())
+
+    body = response_cache.get(cache_key)
+    if body is None:
+        body = encode(compute())
+        response_cache.set(cache_key, body)
+    return etag, body
+
+
+def current_etag(endpoint: str, params: Dict[str, Any]) -> str:
+    """ETag the endpoint would return right now (no report queries)"""
+    return make_etag(make_cache_key(endpoint, params, get_data_version()))
+
+
+def response_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the response cache plus the current data version"""
+    return {
+        "enabled": settings.RESPONSE_CACHE_ENABLED,
+        "data_version": get_data_version(),
+        **response_cache.stats(),
+    }
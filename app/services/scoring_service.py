@@ -0,0 +1,263 @@
+"""
+Scoring Service - Time-decayed danger score per terrorist (GET /reports/ranked)
+
+A report's weight is DANGER_SCORE_REPORT_WEIGHT plus the weight of every
+keyword in DANGER_SCORE_KEYWORD_WEIGHTS its content contains, and it decays
+exponentially with age (half-life DANGER_SCORE_HALF_LIFE_DAYS):
+
+    score = sum(weight * 2^(-age / half_life)) * (1 + DANGER_SCORE_AGENT_WEIGHT * ln(distinct agents))
+
+Decay is applied to every report of every terrorist at the same rate, so it
+never changes the order. Each `terrorist_score` row therefore stores its sum
+decayed to a fixed epoch instead of to "now": a new report just adds its own
+term, nothing has to be re-aged over time, and rank_value is an indexed
+column the top-N is read from. The score at any moment is
+rank_value * 2^(-(now - epoch) / half_life).
+
+Scores are updated as reports are created and deleted, and recomputed from
+all reports (vectorized with NumPy when installed) when the weights or
+half-life change - checked at startup, or run with
+`python manage.py recompute-scores`.
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from config import settings
+from app.keyword_automaton import KeywordAutomaton, normalize_term
+from app.models import Report, ReportArchive, Terrorist
+from app.dal import export_dal, scoring_dal
+from app.services.response_cache_service import bump_data_version_offline
+
+# Re-base the epoch before decay factors get extreme (2^100 is still a safe float)
+MAX_EPOCH_AGE_HALF_LIVES = 100
+
+
+def _decay_rate() -> float:
+    """Decay constant per second: ln 2 / half-life"""
+    return math.log(2) / (settings.DANGER_SCORE_HALF_LIFE_DAYS * 86400)
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _keyword_weights() -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for keyword, weight in settings.DANGER_SCORE_KEYWORD_WEIGHTS.items():
+        term = normalize_term(keyword)
+        if term:
+            # Spellings that normalize alike count once, with the highest weight
+            weights[term] = max(weight, weights.get(term, weight))
+    return weights
+
+
+def weights_fingerprint() -> str:
+    """Hash of everything scores depend on; a change means they must be recomputed"""
+    config = {
+        "half_life_days": settings.DANGER_SCORE_HALF_LIFE_DAYS,
+        "report_weight": settings.DANGER_SCORE_REPORT_WEIGHT,
+        "keyword_weights": _keyword_weights(),
+        "agent_weight": settings.DANGER_SCORE_AGENT_WEIGHT,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+_automaton: Optional[Tuple[str, KeywordAutomaton, Dict[str, float]]] = None
+_automaton_lock = threading.Lock()
+
+
+def _get_automaton() -> Tuple[KeywordAutomaton, Dict[str, float]]:
+    """Keyword matcher for the configured weights, rebuilt if they changed"""
+    global _automaton
+    fingerprint = weights_fingerprint()
+    with _automaton_lock:
+        if _automaton is None or _automaton[0] != fingerprint:
+            weights = _keyword_weights()
+            _automaton = (fingerprint, KeywordAutomaton(weights), weights)
+        return _automaton[1], _automaton[2]
+
+
+def report_weight(content: str) -> float:
+    """Undecayed weight of a report: base weight plus each distinct keyword's weight"""
+    automaton, weights = _get_automaton()
+    return settings.DANGER_SCORE_REPORT_WEIGHT + sum(weights[term] for term in automaton.find_terms(content or ""))
+
+
+def contribution(epoch: datetime, created_at: datetime, weight: float) -> float:
+    """A report's weight decayed to the scoring epoch"""
+    return weight * math.exp(_decay_rate() * (_utc(created_at) - _utc(epoch)).total_seconds())
+
+
+def rank_value(weighted_mass: float, distinct_agents: int) -> float:
+    """Epoch-relative score: decayed mass times the distinct-agents factor"""
+    if distinct_agents <= 0:
+        return 0.0
+    return weighted_mass * (1 + settings.DANGER_SCORE_AGENT_WEIGHT * math.log(distinct_agents))
+
+
+def _apply(reports: List[Any], sign: int) -> None:
+    deltas = [
+        (report.terrorist_id, report.agent_id, report.created_at, report_weight(report.content), sign)
+        for report in reports
+    ]
+    if deltas and not scoring_dal.apply_score_deltas(deltas, contribution, rank_value):
+        # First report ever scored: build the scores (and state) from scratch
+        recompute_scores()
+
+
+def on_reports_created(reports: List[Report]) -> None:
+    """Add newly created reports to their terrorists' scores"""
+    if settings.DANGER_SCORE_ENABLED:
+        _apply(reports, 1)
+
+
+def on_report_deleted(report: Any) -> None:
+    """Take a deleted (live or archived) report off its terrorist's score"""
+    if settings.DANGER_SCORE_ENABLED:
+        _apply([report], -1)
+
+
+def _accumulate(
+    rows: List[tuple],
+    epoch: datetime,
+    mass: Dict[int, float],
+    report_counts: Dict[int, int],
+    pair_counts: Dict[Tuple[int, int], int],
+) -> None:
+    """Add one batch of (terrorist_id, agent_id, created_at, content) rows to the totals"""
+    rate = _decay_rate()
+    terrorist_ids = [row[0] for row in rows]
+    agent_ids = [row[1] for row in rows]
+    ages = [(_utc(row[2]) - epoch).total_seconds() for row in rows]
+    weights = [report_weight(row[3]) for row in rows]
+
+    if np is not None:
+        terrorists = np.asarray(terrorist_ids, dtype=np.int64)
+        decayed = np.asarray(weights) * np.exp(rate * np.asarray(ages))
+        keys, inverse = np.unique(terrorists, return_inverse=True)
+        sums = np.bincount(inverse, weights=decayed)
+        counts = np.bincount(inverse)
+        for terrorist_id, total, count in zip(keys.tolist(), sums.tolist(), counts.tolist()):
+            mass[terrorist_id] = mass.get(terrorist_id, 0.0) + total
+            report_counts[terrorist_id] = report_counts.get(terrorist_id, 0) + count
+        pairs, pair_totals = np.unique(
+            np.column_stack((terrorists, np.asarray(agent_ids, dtype=np.int64))), axis=0, return_counts=True
+        )
+        for (terrorist_id, agent_id), count in zip(pairs.tolist(), pair_totals.tolist()):
+            pair_counts[(terrorist_id, agent_id)] = pair_counts.get((terrorist_id, agent_id), 0) + count
+        return
+
+    for terrorist_id, agent_id, age, weight in zip(terrorist_ids, agent_ids, ages, weights):
+        mass[terrorist_id] = mass.get(terrorist_id, 0.0) + weight * math.exp(rate * age)
+        report_counts[terrorist_id] = report_counts.get(terrorist_id, 0) + 1
+        pair_counts[(terrorist_id, agent_id)] = pair_counts.get((terrorist_id, agent_id), 0) + 1
+
+
+def recompute_scores() -> Dict[str, Any]:
+    """
+    Rebuild every terrorist's score from all reports (archived included)
+
+    The epoch is reset to now. Reports created or deleted while the
+    recompute runs may be off until the next one, so run it when ingest is
+    quiet (it runs at startup when the weights changed).
+
+    Returns:
+        Summary: reports scanned, terrorists scored, duration, vectorized or not
+    """
+    started = time.perf_counter()
+    epoch = datetime.now(timezone.utc)
+    mass: Dict[int, float] = {}
+    report_counts: Dict[int, int] = {}
+    pair_counts: Dict[Tuple[int, int], int] = {}
+    scanned = 0
+    for model in (Report, ReportArchive):
+        stream = export_dal.open_table_stream(model, ["terrorist_id", "agent_id", "created_at", "content"])
+        try:
+            for rows in stream.iter_batches(settings.DANGER_SCORE_RECOMPUTE_BATCH_SIZE):
+                _accumulate(list(rows), epoch, mass, report_counts, pair_counts)
+                scanned += len(rows)
+        finally:
+            stream.close()
+
+    distinct_agents: Dict[int, int] = {}
+    for terrorist_id, _ in pair_counts:
+        distinct_agents[terrorist_id] = distinct_agents.get(terrorist_id, 0) + 1
+    scores = [
+        {
+            "terrorist_id": terrorist_id,
+            "weighted_mass": total,
+            "report_count": report_counts[terrorist_id],
+            "distinct_agents": distinct_agents[terrorist_id],
+            "rank_value": rank_value(total, distinct_agents[terrorist_id]),
+        }
+        for terrorist_id, total in mass.items()
+    ]
+    agent_counts = [
+        {"terrorist_id": terrorist_id, "agent_id": agent_id, "report_count": count}
+        for (terrorist_id, agent_id), count in pair_counts.items()
+    ]
+    scoring_dal.replace_scores(scores, agent_counts, epoch, weights_fingerprint())
+    # Also run by manage.py recompute-scores: let running servers drop cached rankings
+    bump_data_version_offline()
+    return {
+        "reports": scanned,
+        "terrorists": len(scores),
+        "vectorized": np is not None,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def ensure_scores() -> None:
+    """Recompute scores at startup if missing, computed with other weights, on a too-old epoch, or stored as FLOAT"""
+    if not settings.DANGER_SCORE_ENABLED:
+        return
+    widened = scoring_dal.widen_score_columns()
+    state = scoring_dal.get_scoring_state()
+    max_epoch_age = timedelta(days=settings.DANGER_SCORE_HALF_LIFE_DAYS * MAX_EPOCH_AGE_HALF_LIVES)
+    if (
+        not widened
+        and state is not None
+        and state.weights_fingerprint == weights_fingerprint()
+        and datetime.now(timezone.utc) - _utc(state.epoch) < max_epoch_age
+    ):
+        return
+    summary = recompute_scores()
+    print(
+        f"✓ Danger scores recomputed from {summary['reports']} reports "
+        f"in {summary['duration_seconds']:.2f}s"
+    )
+
+
+def get_ranked_terrorists(limit: int = 10) -> List[Tuple[Terrorist, float, int, int]]:
+    """
+    Get the terrorists with the highest current danger score
+
+    Args:
+        limit: Maximum terrorists to return
+
+    Returns:
+        List of (Terrorist, score now, report count, distinct reporting agents), highest score first
+
+    Raises:
+        RuntimeError: If danger scoring is disabled
+    """
+    if not settings.DANGER_SCORE_ENABLED:
+        raise RuntimeError("Danger scoring is disabled (DANGER_SCORE_ENABLED=false)")
+    state = scoring_dal.get_scoring_state()
+    if state is None:
+        return []
+    decay = math.exp(-_decay_rate() * (datetime.now(timezone.utc) - _utc(state.epoch)).total_seconds())
+    return [
+        (terrorist, score.rank_value * decay, score.report_count, score.distinct_agents)
+        for score, terrorist in scoring_dal.get_top_scores(limit)
+    ]
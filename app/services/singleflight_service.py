@@ -0,0 +1,97 @@
+"""
+Single-Flight Service - Coalesce concurrent identical calls into one computation
+
+Concurrent callers asking for the same key while a computation is in flight
+wait for it and share its result (or exception) instead of running their own.
+Callers block, so call it from sync handlers (run in the threadpool).
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.services.response_cache_service import get_data_version
+
+
+class _Call:
+    """One in-flight computation and everyone waiting on it"""
+
+    def __init__(self):
+        self.finished = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def complete(self, result: Any = None, error: Optional[BaseException] = None) -> None:
+        self.result = result
+        self.error = error
+        self.finished.set()
+
+    def value(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Registry of in-flight calls keyed by a hashable key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def _join(self, key: Hashable) -> Tuple[_Call, bool]:
+        """Return (call, is_leader) for a key"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self.executions += 1
+            return call, True
+
+    def _finish(self, key: Hashable, call: _Call, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        call.complete(result, error)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all concurrent callers with the same key (blocking)"""
+        call, is_leader = self._join(key)
+        if is_leader:
+            try:
+                result = fn()
+            except BaseException as e:
+                self._finish(key, call, error=e)
+                raise
+            self._finish(key, call, result=result)
+            return result
+        call.finished.wait()
+        return call.value()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executions": self.executions,
+                "shared": self.shared,
+            }
+
+
+singleflight = SingleFlight()
+
+
+def versioned_key(name: str, *args: Hashable) -> Tuple:
+    """Key that includes the data version, so calls never span a data change"""
+    return (name, args, get_data_version())
+
+
+def coalesce(name: str, fn: Callable[[], Any], *args: Hashable) -> Any:
+    """Coalesce concurrent identical calls of fn (identified by name and args)"""
+    return singleflight.do(versioned_key(name, *args), fn)
+
+
+def singleflight_stats() -> Dict[str, Any]:
+    """Counters for executed vs. shared (coalesced) calls"""
+    return singleflight.stats()
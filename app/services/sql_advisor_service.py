@@ -0,0 +1,338 @@
+"""
+SQL Advisor Service - EXPLAIN capture, plan analysis, index suggestions and slow-query history
+
+Plans are inspected for full table scans, filesorts and temporary tables on the
+application tables (report, terrorist, agent). For scanned tables, columns used
+in WHERE / JOIN / ORDER BY / GROUP BY are combined into a suggested composite
+index (equality columns first, then ranges, then sort columns), skipping any
+that an existing index already covers.
+"""
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlmodel import SQLModel
+
+from config import settings
+from app.dal import sql_dal
+
+WATCHED_TABLES = ("report", "terrorist", "agent")
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+`?(\w+)`?(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|INNER|LEFT|RIGHT|GROUP|ORDER|LIMIT|USING)\b)(\w+))?",
+    re.IGNORECASE,
+)
+_PREDICATE = re.compile(
+    r"(?:`?(\w+)`?\.)?`?(\w+)`?\s*(=|<=|>=|<>|!=|<|>|\bIN\b|\bBETWEEN\b|\bLIKE\b)\s*(\S+)?",
+    re.IGNORECASE,
+)
+_CLAUSE = r"\b{}\s+BY\s+(.+?)(?:\bLIMIT\b|\bHAVING\b|\bORDER\b|\bGROUP\b|$)"
+_SQL_KEYWORDS = {"and", "or", "not", "on", "where", "select", "from", "join", "by", "as"}
+
+
+def normalize_sql(query: str) -> str:
+    """Normalize a statement for grouping: literals become ?, whitespace is collapsed"""
+    normalized = _STRING_LITERAL.sub("?", query.strip().rstrip(";"))
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def is_select_statement(query: str) -> bool:
+    """True for statements that only read (SELECT / WITH ... SELECT)"""
+    first_word = query.lstrip(" (\n\t").split(None, 1)[0].upper() if query.strip() else ""
+    return first_word in ("SELECT", "WITH")
+
+
+# ---------------------------------------------------------------------------
+# Plan analysis
+# ---------------------------------------------------------------------------
+
+def _walk_mysql_plan(node: Any, findings: List[Dict[str, str]]) -> None:
+    if isinstance(node, dict):
+        if node.get("using_filesort"):
+            findings.append({"table": node.get("table", {}).get("table_name", "?"), "issue": "filesort"})
+        if node.get("using_temporary_table"):
+            findings.append({"table": node.get("table", {}).get("table_name", "?"), "issue": "temporary_table"})
+        table = node.get("table")
+        if isinstance(table, dict) and table.get("access_type") == "ALL":
+            findings.append({
+                "table": table.get("table_name", "?"),
+                "issue": "full_scan",
+                "detail": f"rows examined ~{table.get('rows_examined_per_scan', '?')}",
+            })
+        for value in node.values():
+            _walk_mysql_plan(value, findings)
+    elif isinstance(node, list):
+        for item in node:
+            _walk_mysql_plan(item, findings)
+
+
+def _walk_postgres_plan(node: Any, findings: List[Dict[str, str]]) -> None:
+    if isinstance(node, dict):
+        node_type = node.get("Node Type")
+        if node_type == "Seq Scan":
+            findings.append({"table": node.get("Relation Name", "?"), "issue": "full_scan"})
+        elif node_type in ("Sort", "Incremental Sort"):
+            findings.append({"table": "?", "issue": "filesort", "detail": ", ".join(node.get("Sort Key", []))})
+        for value in node.values():
+            _walk_postgres_plan(value, findings)
+    elif isinstance(node, list):
+        for item in node:
+            _walk_postgres_plan(item, findings)
+
+
+def _analyze_sqlite_plan(plan: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    findings = []
+    for row in plan:
+        detail = str(row.get("detail", ""))
+        words = detail.split()
+        if len(words) >= 2 and words[0] == "SCAN" and "USING COVERING INDEX" not in detail:
+            findings.append({"table": words[1], "issue": "full_scan", "detail": detail})
+        elif "TEMP B-TREE FOR ORDER BY" in detail:
+            findings.append({"table": "?", "issue": "filesort", "detail": detail})
+        elif "TEMP B-TREE" in detail:
+            findings.append({"table": "?", "issue": "temporary_table", "detail": detail})
+    return findings
+
+
+def analyze_plan(dialect_name: str, plan: Any, query: str = "") -> List[Dict[str, str]]:
+    """Extract full scans, filesorts and temporary tables from a plan"""
+    findings: List[Dict[str, str]] = []
+    if dialect_name == "mysql":
+        _walk_mysql_plan(plan, findings)
+    elif dialect_name == "postgresql":
+        _walk_postgres_plan(plan, findings)
+    elif dialect_name == "sqlite":
+        findings = _analyze_sqlite_plan(plan)
+    # Plans may name tables by their alias in the query
+    aliases = _table_aliases(query)
+    for finding in findings:
+        finding["table"] = aliases.get(finding["table"].lower(), finding["table"])
+        finding["watched"] = finding["table"] in WATCHED_TABLES
+    return findings
+
+
+# ---------------------------------------------------------------------------
+# Index suggestions
+# ---------------------------------------------------------------------------
+
+def _table_aliases(query: str) -> Dict[str, str]:
+    """Map alias (and table name itself) -> table name"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(query):
+        aliases[table.lower()] = table.lower()
+        if alias:
+            aliases[alias.lower()] = table.lower()
+    return aliases
+
+
+def _column_table(qualifier: str, column: str, aliases: Dict[str, str], columns_by_table: Dict[str, set]) -> Optional[str]:
+    if qualifier:
+        return aliases.get(qualifier.lower())
+    owners = [table for table in set(aliases.values()) if column in columns_by_table.get(table, set())]
+    return owners[0] if len(owners) == 1 else None
+
+
+def _clause_columns(query: str, keyword: str) -> List[Tuple[str, str]]:
+    match = re.search(_CLAUSE.format(keyword), query, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return []
+    columns = []
+    for part in match.group(1).split(","):
+        tokens = part.strip().split()
+        if not tokens:
+            continue
+        reference = tokens[0].strip("`")
+        qualifier, _, column = reference.rpartition(".")
+        columns.append((qualifier, column))
+    return columns
+
+
+def suggest_indexes(query: str, findings: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Suggest composite indexes for watched tables the plan scans or sorts"""
+    columns_by_table = {
+        name: {column.name for column in table.columns}
+        for name, table in SQLModel.metadata.tables.items()
+    }
+    aliases = _table_aliases(query)
+    flagged = {finding["table"] for finding in findings if finding["issue"] == "full_scan"}
+    if any(finding["issue"] == "filesort" for finding in findings):
+        flagged |= set(aliases.values())
+    flagged &= set(WATCHED_TABLES)
+
+    equality: Dict[str, List[str]] = {}
+    ranges: Dict[str, List[str]] = {}
+    sorts: Dict[str, List[str]] = {}
+    notes = []
+
+    for qualifier, column, operator, operand in _PREDICATE.findall(query):
+        column = column.lower()
+        if column in _SQL_KEYWORDS:
+            continue
+        table = _column_table(qualifier, column, aliases, columns_by_table)
+        if table not in flagged or column not in columns_by_table.get(table, set()):
+            continue
+        operator = operator.upper()
+        if operator == "LIKE" and operand.startswith("'%"):
+            notes.append(f"{table}.{column} LIKE with a leading wildcard cannot use a B-tree index")
+            continue
+        target = equality if operator in ("=", "IN") else ranges
+        if column not in target.setdefault(table, []):
+            target[table].append(column)
+
+    for keyword in ("GROUP", "ORDER"):
+        for qualifier, column in _clause_columns(query, keyword):
+            column = column.lower()
+            table = _column_table(qualifier, column, aliases, columns_by_table)
+            if table in flagged and column in columns_by_table.get(table, set()):
+                if column not in sorts.setdefault(table, []):
+                    sorts[table].append(column)
+
+    suggestions = []
+    for table in sorted(flagged):
+        columns = []
+        for column in equality.get(table, []) + ranges.get(table, []) + sorts.get(table, []):
+            if column not in columns:
+                columns.append(column)
+        if not columns:
+            continue
+        existing = sql_dal.get_index_columns(table)
+        if any(index[:len(columns)] == columns for index in existing):
+            continue
+        suggestions.append({
+            "table": table,
+            "columns": columns,
+            "statement": f"CREATE INDEX ix_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)})",
+        })
+    for note in notes:
+        suggestions.append({"note": note})
+    return suggestions
+
+
+def explain(query: str) -> Dict[str, Any]:
+    """
+    EXPLAIN a query, flag expensive plan steps and suggest indexes
+
+    Raises:
+        ValueError: If the statement is not a SELECT
+    """
+    if not is_select_statement(query):
+        raise ValueError("Only SELECT statements can be explained")
+    dialect_name, plan = sql_dal.explain_query(query)
+    findings = analyze_plan(dialect_name, plan, query)
+    return {
+        "dialect": dialect_name,
+        "plan": plan,
+        "findings": findings,
+        "suggested_indexes": suggest_indexes(query, findings),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Slow-query history
+# ---------------------------------------------------------------------------
+
+class SlowQueryLog:
+    """Bounded per-statement-shape history of admin SQL slower than a threshold"""
+
+    def __init__(self, threshold_ms: float, max_entries: int):
+        self.threshold_ms = threshold_ms
+        self.max_entries = max_entries
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, query: str, elapsed_ms: float) -> None:
+        if elapsed_ms < self.threshold_ms:
+            return
+        key = normalize_sql(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    # Drop the shape with the least total time
+                    cheapest = min(self._entries, key=lambda k: self._entries[k]["total_ms"])
+                    del self._entries[cheapest]
+                entry = self._entries[key] = {
+                    "normalized": key,
+                    "example": query,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "last_seen": 0.0,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["last_seen"] = time.time()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+        return sorted(entries, key=lambda entry: entry["total_ms"], reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.SQL_SLOW_QUERY_MS, settings.SQL_SLOW_QUERY_HISTORY_SIZE)
+
+
+def record_query_time(query: str, elapsed_ms: float) -> None:
+    """Record an admin SQL execution time (kept only if slower than the threshold)"""
+    slow_query_log.record(query, elapsed_ms)
+
+
+def get_slow_queries() -> List[Dict[str, Any]]:
+    """Slow statement shapes ordered by total time spent"""
+    return slow_query_log.entries()
+
+
+def analyze_slow_queries() -> Dict[str, Any]:
+    """
+    EXPLAIN every SELECT in the slow-query history and aggregate the results
+
+    Findings are aggregated per (table, issue) and suggestions per statement,
+    each weighted by the total time the affected statements took.
+    """
+    issues: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    suggestions: Dict[str, Dict[str, Any]] = {}
+    plans = []
+    for entry in get_slow_queries():
+        if not is_select_statement(entry["example"]):
+            continue
+        try:
+            result = explain(entry["example"])
+        except Exception as e:
+            plans.append({"normalized": entry["normalized"], "error": str(e)})
+            continue
+        plans.append({
+            "normalized": entry["normalized"],
+            "total_ms": entry["total_ms"],
+            "findings": result["findings"],
+            "suggested_indexes": result["suggested_indexes"],
+        })
+        for finding in result["findings"]:
+            aggregate = issues.setdefault((finding["table"], finding["issue"]), {
+                "table": finding["table"], "issue": finding["issue"], "queries": 0, "total_ms": 0.0,
+            })
+            aggregate["queries"] += 1
+            aggregate["total_ms"] += entry["total_ms"]
+        for suggestion in result["suggested_indexes"]:
+            if "statement" not in suggestion:
+                continue
+            aggregate = suggestions.setdefault(suggestion["statement"], {**suggestion, "queries": 0, "total_ms": 0.0})
+            aggregate["queries"] += 1
+            aggregate["total_ms"] += entry["total_ms"]
+
+    return {
+        "issues": sorted(issues.values(), key=lambda item: item["total_ms"], reverse=True),
+        "suggested_indexes": sorted(suggestions.values(), key=lambda item: item["total_ms"], reverse=True),
+        "plans": plans,
+    }
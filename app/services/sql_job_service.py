@@ -0,0 +1,278 @@
+"""
+SQL Job Service - Long-running admin SQL executed on a bounded background executor
+
+A submitted query runs in a worker thread with a server-side cursor and its
+rows are spooled as NDJSON to a local file, so the HTTP request returns
+immediately with a job id. Clients poll the job status and page through the
+spooled results. Finished jobs (and their spool files) expire after a TTL.
+
+Cancelling a running job interrupts its statement on the database (KILL
+QUERY on MySQL, pg_cancel_backend on PostgreSQL, interrupt() on SQLite), so
+a long query stops right away instead of at the next fetched batch.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from app.dal import sql_dal
+from app.responses import dumps
+from app.services.sql_advisor_service import record_query_time
+
+# Byte offset of every INDEX_EVERY-th row is kept, so paging seeks instead of scanning
+INDEX_EVERY = 1000
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was cancelled"""
+
+
+class SQLJob:
+    """State of one submitted query"""
+
+    def __init__(self, query: str, max_rows: int, spool_dir: str):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.max_rows = max_rows
+        self.spool_path = os.path.join(spool_dir, f"{self.id}.ndjson")
+        self.status = JOB_QUEUED
+        self.columns: List[str] = []
+        self.row_count = 0
+        # Rows fully flushed to the spool file (safe to read while running)
+        self.readable_rows = 0
+        self.truncated = False
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.finished_monotonic: Optional[float] = None
+        self.row_offsets: List[int] = [0]
+        self.cancel_requested = threading.Event()
+        self.future: Optional[Future] = None
+        # sql_dal handle of the running statement; cleared (under the lock)
+        # before its connection goes back to the pool, so a late cancel
+        # can't interrupt another request's statement
+        self.backend: Any = None
+        self.backend_lock = threading.Lock()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "query": self.query,
+            "columns": self.columns,
+            "row_count": self.row_count,
+            "truncated": self.truncated,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class SQLJobManager:
+    """Bounded executor plus the registry of jobs it ran"""
+
+    def __init__(self, max_workers: int, max_jobs: int, spool_dir: str, ttl_seconds: float):
+        self.max_jobs = max_jobs
+        self.spool_dir = spool_dir
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sql-job")
+        self._jobs: Dict[str, SQLJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, query: str, max_rows: Optional[int] = None) -> SQLJob:
+        """
+        Queue a query for background execution
+
+        Raises:
+            RuntimeError: If too many jobs are already queued or running
+        """
+        self.cleanup_expired()
+        os.makedirs(self.spool_dir, exist_ok=True)
+        max_rows = min(max_rows or settings.SQL_STREAM_MAX_ROWS, settings.SQL_STREAM_MAX_ROWS)
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if job.status not in FINISHED_STATES)
+            if active >= self.max_jobs:
+                raise RuntimeError(f"Too many active SQL jobs ({active}), try again later")
+            job = SQLJob(query, max_rows, self.spool_dir)
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[SQLJob]:
+        self.cleanup_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[SQLJob]:
+        self.cleanup_expired()
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[SQLJob]:
+        """Cancel a queued or running job; returns None if it doesn't exist"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            # Never started
+            self._finish(job, JOB_CANCELLED)
+            return job
+        self._interrupt(job)
+        return job
+
+    @staticmethod
+    def _interrupt(job: SQLJob) -> None:
+        with job.backend_lock:
+            if job.backend is None:
+                return
+            try:
+                sql_dal.cancel_running_query(job.backend)
+            except Exception as e:
+                # The job still stops at its next fetched batch
+                print(f"⚠️ Interrupting SQL job {job.id} failed: {e}")
+
+    def read_results(self, job: SQLJob, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Read a page of spooled rows (available while running, too)"""
+        readable_rows = job.readable_rows
+        if offset >= readable_rows or not os.path.exists(job.spool_path):
+            return []
+        index = min(offset // INDEX_EVERY, len(job.row_offsets) - 1)
+        skip = offset - index * INDEX_EVERY
+        end = min(offset + limit, readable_rows)
+        rows = []
+        with open(job.spool_path, "r", encoding="utf-8") as spool:
+            spool.seek(job.row_offsets[index])
+            for _ in range(skip):
+                spool.readline()
+            for _ in range(end - offset):
+                line = spool.readline()
+                if not line:
+                    break
+                rows.append(json.loads(line))
+        return rows
+
+    def cleanup_expired(self) -> int:
+        """Drop finished jobs older than the TTL and delete their spool files"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                job for job in self._jobs.values()
+                if job.finished_monotonic is not None and now - job.finished_monotonic > self.ttl_seconds
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            self._remove_spool(job)
+        return len(expired)
+
+    def shutdown(self) -> None:
+        """Cancel everything and stop the executor (application shutdown)"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel_requested.set()
+            self._interrupt(job)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for job in jobs:
+            self._remove_spool(job)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            return {"jobs": len(self._jobs), "by_status": by_status}
+
+    def _run(self, job: SQLJob) -> None:
+        if job.cancel_requested.is_set():
+            self._finish(job, JOB_CANCELLED)
+            return
+        job.status = JOB_RUNNING
+        job.started_at = datetime.now(timezone.utc)
+        stream = None
+        try:
+            stream = sql_dal.open_streaming_query(
+                job.query, settings.SQL_JOB_STATEMENT_TIMEOUT_MS, on_started=lambda handle: self._started(job, handle)
+            )
+            job.columns = stream.columns
+            with open(job.spool_path, "w", encoding="utf-8") as spool:
+                for rows in stream.iter_batches(settings.SQL_STREAM_BATCH_SIZE):
+                    if job.cancel_requested.is_set():
+                        raise JobCancelled()
+                    for row in rows:
+                        if job.row_count >= job.max_rows:
+                            job.truncated = True
+                            break
+                        spool.write(dumps(dict(zip(job.columns, row))).decode("utf-8"))
+                        spool.write("\n")
+                        job.row_count += 1
+                        if job.row_count % INDEX_EVERY == 0:
+                            spool.flush()
+                            job.row_offsets.append(spool.tell())
+                    spool.flush()
+                    job.readable_rows = job.row_count
+                    if job.truncated:
+                        break
+            self._finish(job, JOB_SUCCEEDED)
+            record_query_time(job.query, 1000 * (job.finished_at - job.started_at).total_seconds())
+        except JobCancelled:
+            self._finish(job, JOB_CANCELLED)
+        except Exception as e:
+            if job.cancel_requested.is_set():
+                # The interrupted statement surfaces as a driver error
+                self._finish(job, JOB_CANCELLED)
+            else:
+                job.error = str(e)
+                self._finish(job, JOB_FAILED)
+        finally:
+            if stream is not None:
+                stream.close()
+
+    def _started(self, job: SQLJob, handle: Any) -> None:
+        with job.backend_lock:
+            job.backend = handle
+        if handle is not None and job.cancel_requested.is_set():
+            # Cancelled between the worker starting and the statement being sent
+            raise JobCancelled()
+
+    def _finish(self, job: SQLJob, status: str) -> None:
+        job.status = status
+        job.finished_at = datetime.now(timezone.utc)
+        job.finished_monotonic = time.monotonic()
+        if status == JOB_CANCELLED:
+            self._remove_spool(job)
+
+    @staticmethod
+    def _remove_spool(job: SQLJob) -> None:
+        try:
+            os.remove(job.spool_path)
+        except FileNotFoundError:
+            pass
+
+
+job_manager = SQLJobManager(
+    max_workers=settings.SQL_JOB_WORKERS,
+    max_jobs=settings.SQL_JOB_MAX_ACTIVE,
+    spool_dir=settings.SQL_JOB_SPOOL_DIR,
+    ttl_seconds=settings.SQL_JOB_TTL_SECONDS,
+)
+
+
+def get_job_manager() -> SQLJobManager:
+    """Return the process-wide SQL job manager"""
+    return job_manager
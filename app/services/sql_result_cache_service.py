@@ -0,0 +1,77 @@
+"""
+SQL Result Cache Service - Cache results of repeated read-only admin SQL
+
+Only plain, deterministic SELECTs are cached. Keys are the normalized statement
+shape plus its literal values plus the global data version, so any write
+through the services (or through /sql/execute itself) makes older entries
+unreachable. Entries are serialized JSON bodies in a byte-bounded LRU.
+"""
+import re
+from typing import Any, Callable, Dict, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from config import settings
+from app.services.cache_service import ByteSizeLRUCache
+from app.services.response_cache_service import get_data_version, serialize_json
+from app.services.sql_advisor_service import is_select_statement, normalize_sql
+
+CACHE_HIT = "HIT"
+CACHE_MISS = "MISS"
+CACHE_BYPASS = "BYPASS"
+
+_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\b\d+(?:\.\d+)?\b")
+# Statements whose results depend on more than the table data, or that lock/write
+_UNCACHEABLE = re.compile(
+    r"\b(NOW|CURDATE|CURTIME|SYSDATE|CURRENT_DATE|CURRENT_TIME|CURRENT_TIMESTAMP|UTC_TIMESTAMP|"
+    r"RAND|RANDOM|UUID|LAST_INSERT_ID|CONNECTION_ID|SLEEP|BENCHMARK|USER|DATABASE)\b|"
+    r"\bFOR\s+UPDATE\b|\bFOR\s+SHARE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|\bINTO\b",
+    re.IGNORECASE,
+)
+
+sql_result_cache = ByteSizeLRUCache(
+    max_bytes=settings.SQL_RESULT_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.SQL_RESULT_CACHE_MAX_ENTRY_BYTES,
+    ttl_seconds=settings.SQL_RESULT_CACHE_TTL_SECONDS,
+)
+
+
+def is_cacheable(query: str) -> bool:
+    """True for a single read-only, deterministic SELECT"""
+    if not settings.SQL_RESULT_CACHE_ENABLED or not is_select_statement(query):
+        return False
+    without_literals = _LITERAL.sub("?", query).strip().rstrip(";")
+    if ";" in without_literals:
+        return False
+    return not _UNCACHEABLE.search(without_literals)
+
+
+def make_cache_key(query: str) -> str:
+    """Normalized shape + literal values + data version"""
+    literals = _LITERAL.findall(query.strip().rstrip(";"))
+    return f"{normalize_sql(query)}|{literals!r}@{get_data_version()}"
+
+
+def get_or_execute(
+    query: str,
+    execute: Callable[[], Dict[str, Any]],
+    bypass: bool = False,
+) -> Tuple[str, bytes]:
+    """
+    Return (cache status, serialized body) for a cacheable query
+
+    With bypass=True (Cache-Control: no-cache) the query always runs, and
+    the fresh result replaces the cached one.
+    """
+    cache_key = make_cache_key(query)
+    if not bypass:
+        body = sql_result_cache.get(cache_key)
+        if body is not None:
+            return CACHE_HIT, body
+    body = serialize_json(jsonable_encoder(execute()))
+    sql_result_cache.set(cache_key, body)
+    return (CACHE_BYPASS if bypass else CACHE_MISS), body
+
+
+def sql_result_cache_stats() -> Dict[str, Any]:
+    return {"enabled": settings.SQL_RESULT_CACHE_ENABLED, **sql_result_cache.stats()}
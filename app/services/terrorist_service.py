@@ -1,9 +1,19 @@
 """
 Terrorist Service - Business Logic Layer for Terrorist Operations
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterable
 from app.models import Terrorist
 from app.dal import terrorist_dal
+from app.services.cache_service import get_entity_cache
+from app.services.response_cache_service import bump_data_version
+from app.services.entity_link_service import mark_names_stale
+
+
+def _cache_terrorist(terrorist: Terrorist) -> None:
+    """Write a terrorist through to the entity cache (by ID and by name)"""
+    cache = get_entity_cache()
+    cache.set(f"terrorist:{terrorist.id}", terrorist)
+    cache.set_value(f"terrorist:name:{terrorist.name_key}", terrorist.id)
 
 
 def create_terrorist(
@@ -21,13 +31,20 @@ def create_terrorist(
         
     Returns:
         Created Terrorist object
+        
+    Raises:
+        ValueError: If a terrorist with the same (normalized) name already exists
     """
-    return terrorist_dal.create_terrorist(name, affiliation, location)
+    terrorist = terrorist_dal.create_terrorist(name, affiliation, location)
+    _cache_terrorist(terrorist)
+    bump_data_version()
+    mark_names_stale()
+    return terrorist
 
 
 def get_terrorist_by_id(terrorist_id: int) -> Optional[Terrorist]:
     """
-    Get terrorist by ID
+    Get terrorist by ID (served from the entity cache when possible)
     
     Args:
         terrorist_id: ID of the terrorist
@@ -35,20 +52,35 @@ def get_terrorist_by_id(terrorist_id: int) -> Optional[Terrorist]:
     Returns:
         Terrorist object if found, None otherwise
     """
-    return terrorist_dal.get_terrorist_by_id(terrorist_id)
+    return get_entity_cache().get_or_load(
+        Terrorist,
+        f"terrorist:{terrorist_id}",
+        lambda: terrorist_dal.get_terrorist_by_id(terrorist_id),
+    )
 
 
 def get_terrorist_by_name(name: str) -> Optional[Terrorist]:
     """
-    Get terrorist by exact name
+    Get terrorist by name (case and whitespace insensitive)
     
     Args:
-        name: Exact name of the terrorist
+        name: Name of the terrorist
         
     Returns:
         Terrorist object if found, None otherwise
     """
-    return terrorist_dal.get_terrorist_by_name(name)
+    cached_id = get_entity_cache().get_value(
+        f"terrorist:name:{terrorist_dal.normalize_terrorist_name(name)}"
+    )
+    if cached_id is not None:
+        terrorist = get_terrorist_by_id(cached_id)
+        if terrorist:
+            return terrorist
+    
+    terrorist = terrorist_dal.get_terrorist_by_name(name)
+    if terrorist:
+        _cache_terrorist(terrorist)
+    return terrorist
 
 
 def search_terrorists_by_name(name: str) -> List[Terrorist]:
@@ -74,6 +106,24 @@ def get_all_terrorists() -> List[Terrorist]:
     return terrorist_dal.get_all_terrorists()
 
 
+def backfill_name_keys() -> None:
+    """
+    Give terrorists created before name_key existed their normalized key
+    
+    Without it, name lookups and get-or-create would miss them and insert
+    duplicates. Runs at startup: adds the column to a database created
+    before it, then fills it; a no-op once every row has a key.
+    """
+    if terrorist_dal.ensure_name_key_column():
+        print("✓ Added terrorist.name_key column and unique index")
+    summary = terrorist_dal.backfill_name_keys()
+    if summary["filled"]:
+        print(
+            f"✓ Backfilled name_key for {summary['filled']} terrorist(s); "
+            f"{summary['skipped']} legacy duplicate name(s) left without one"
+        )
+
+
 def get_or_create_terrorist(
     name: str, 
     affiliation: Optional[str] = None, 
@@ -84,13 +134,60 @@ def get_or_create_terrorist(
     
     Args:
         name: Name of the terrorist
-        affiliation: Organization affiliation
-        location: Area of activity
+        affiliation: Organization affiliation (used only when creating)
+        location: Area of activity (used only when creating)
         
     Returns:
         Terrorist object (existing or newly created)
     """
-    terrorist = get_terrorist_by_name(name)
-    if not terrorist:
-        terrorist = create_terrorist(name, affiliation, location)
-    return terrorist
+    terrorist_id = get_or_create_terrorist_id(name, affiliation, location)
+    return get_terrorist_by_id(terrorist_id)
+
+
+def get_or_create_terrorist_id(
+    name: str, 
+    affiliation: Optional[str] = None, 
+    location: Optional[str] = None
+) -> int:
+    """
+    Resolve a terrorist name to its ID, creating the record if needed
+    
+    Uses a single atomic upsert, so concurrent calls never create duplicates.
+    Names already resolved are answered from the entity cache.
+    
+    Args:
+        name: Name of the terrorist
+        affiliation: Organization affiliation (used only when creating)
+        location: Area of activity (used only when creating)
+        
+    Returns:
+        ID of the existing or newly created terrorist
+    """
+    cache = get_entity_cache()
+    name_key = f"terrorist:name:{terrorist_dal.normalize_terrorist_name(name)}"
+    terrorist_id = cache.get_value(name_key)
+    if terrorist_id is None:
+        terrorist_id = terrorist_dal.upsert_terrorist(name, affiliation, location)
+        cache.set_value(name_key, terrorist_id)
+        bump_data_version()
+        mark_names_stale()
+    return terrorist_id
+
+
+def get_or_create_terrorists(names: Iterable[str]) -> Dict[str, int]:
+    """
+    Resolve many terrorist names to IDs at once, creating missing records
+    
+    Args:
+        names: Terrorist names (duplicates and name variants are allowed)
+        
+    Returns:
+        Dict mapping each given name to its terrorist ID
+    """
+    cache = get_entity_cache()
+    ids_by_name = terrorist_dal.upsert_terrorists(names)
+    bump_data_version()
+    mark_names_stale()
+    for name, terrorist_id in ids_by_name.items():
+        cache.set_value(f"terrorist:name:{terrorist_dal.normalize_terrorist_name(name)}", terrorist_id)
+    return ids_by_name
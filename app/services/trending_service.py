@@ -0,0 +1,243 @@
+"""
+Trending Service - Terrorists with the most new reports in a sliding window
+
+For each window (1h, 24h, 7d) a ring buffer of time buckets holds
+per-terrorist report counts; a window's ranking is the sum of its live
+buckets, so old activity drops out as buckets expire and nothing scans the
+reports table per request.
+
+Each bucket is a Space-Saving summary with at most TRENDING_COUNTERS_PER_BUCKET
+counters: memory stays bounded however many terrorists there are, every
+terrorist with more than 1/capacity of a bucket's reports is guaranteed to
+be tracked, and each count comes with an upper bound of its overestimate
+(0 while a bucket tracks fewer terrorists than its capacity).
+
+Counts are fed from report.created / report.deleted feed events, which
+every worker receives (with REPORT_FEED_BROKER=redis), and rebuilt from the
+reports table at startup.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from app.dal import report_dal
+from app.models import Terrorist
+from app.services import terrorist_service
+from app.services.report_feed_service import REPORT_CREATED, REPORT_DELETED, get_feed_hub
+
+# Window name -> (bucket width in seconds, number of buckets)
+TRENDING_WINDOWS: Dict[str, Tuple[int, int]] = {
+    "1h": (60, 60),
+    "24h": (15 * 60, 96),
+    "7d": (60 * 60, 168),
+}
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter summary: at most `capacity` (count, overestimate) counters"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counters: Dict[int, List[int]] = {}
+
+    def add(self, key: int) -> None:
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += 1
+        elif len(self.counters) < self.capacity:
+            self.counters[key] = [1, 0]
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as possible overestimate
+            victim = min(self.counters, key=lambda k: self.counters[k][0])
+            floor = self.counters.pop(victim)[0]
+            self.counters[key] = [floor + 1, floor]
+
+    def remove(self, key: int) -> None:
+        counter = self.counters.get(key)
+        if counter is not None and counter[0] > 0:
+            counter[0] -= 1
+            counter[1] = min(counter[1], counter[0])
+
+    def floor(self) -> int:
+        """Upper bound of the count of any key not currently tracked"""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(counter[0] for counter in self.counters.values())
+
+
+class SlidingWindowTopK:
+    """Ring buffer of per-bucket Space-Saving summaries covering one window"""
+
+    def __init__(self, bucket_seconds: int, buckets: int, capacity: int):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.capacity = capacity
+        self._slots: List[Optional[Tuple[int, SpaceSaving]]] = [None] * buckets
+        self._lock = threading.Lock()
+
+    def _summary(self, timestamp: float, create: bool) -> Optional[SpaceSaving]:
+        bucket = int(timestamp // self.bucket_seconds)
+        current = int(time.time() // self.bucket_seconds)
+        if bucket <= current - self.buckets:
+            return None  # already outside the window
+        bucket = min(bucket, current)
+        slot = self._slots[bucket % self.buckets]
+        if slot is None or slot[0] != bucket:
+            if not create or (slot is not None and slot[0] > bucket):
+                return None
+            slot = (bucket, SpaceSaving(self.capacity))
+            self._slots[bucket % self.buckets] = slot
+        return slot[1]
+
+    def add(self, key: int, timestamp: float) -> None:
+        with self._lock:
+            summary = self._summary(timestamp, create=True)
+            if summary is not None:
+                summary.add(key)
+
+    def remove(self, key: int, timestamp: float) -> None:
+        with self._lock:
+            summary = self._summary(timestamp, create=False)
+            if summary is not None:
+                summary.remove(key)
+
+    def top(self, limit: int) -> List[Tuple[int, int, int]]:
+        """(key, estimated count, max overestimate) of the top keys, highest first"""
+        oldest_live = int(time.time() // self.bucket_seconds) - self.buckets
+        counts: Dict[int, int] = {}
+        errors: Dict[int, int] = {}
+        floors_where_tracked: Dict[int, int] = {}
+        total_floor = 0
+        with self._lock:
+            for slot in self._slots:
+                if slot is None or slot[0] <= oldest_live:
+                    continue
+                summary = slot[1]
+                floor = summary.floor()
+                total_floor += floor
+                for key, (count, error) in summary.counters.items():
+                    counts[key] = counts.get(key, 0) + count
+                    errors[key] = errors.get(key, 0) + error
+                    floors_where_tracked[key] = floors_where_tracked.get(key, 0) + floor
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        # A key may also have been evicted from (or never entered) other full buckets
+        return [
+            (key, count, errors[key] + total_floor - floors_where_tracked[key])
+            for key, count in ranked
+            if count > 0
+        ]
+
+    def tracked_keys(self) -> int:
+        with self._lock:
+            return sum(len(slot[1].counters) for slot in self._slots if slot is not None)
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class TrendingTracker:
+    """Sliding-window top-k of report counts per terrorist, for every window"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.windows = {
+            name: SlidingWindowTopK(bucket_seconds, buckets, capacity)
+            for name, (bucket_seconds, buckets) in TRENDING_WINDOWS.items()
+        }
+        # Reports up to this ID were loaded by rebuild(); feed events for them are ignored
+        self.rebuilt_through_id = 0
+
+    def record(self, terrorist_id: int, created_at: Any) -> None:
+        timestamp = _timestamp(created_at)
+        for window in self.windows.values():
+            window.add(terrorist_id, timestamp)
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """Feed hub listener"""
+        report = event["report"]
+        if event["type"] == REPORT_CREATED:
+            if report["id"] > self.rebuilt_through_id:
+                self.record(report["terrorist_id"], report["created_at"])
+        elif event["type"] == REPORT_DELETED:
+            timestamp = _timestamp(report["created_at"])
+            for window in self.windows.values():
+                window.remove(report["terrorist_id"], timestamp)
+
+    def rebuild(self) -> int:
+        """Reload the windows from the reports table; returns the reports loaded"""
+        self.windows = {
+            name: SlidingWindowTopK(bucket_seconds, buckets, self.capacity)
+            for name, (bucket_seconds, buckets) in TRENDING_WINDOWS.items()
+        }
+        # Fix the cut-off first: newer reports arrive as feed events meanwhile
+        self.rebuilt_through_id = report_dal.get_max_report_id()
+        longest = max(bucket_seconds * buckets for bucket_seconds, buckets in TRENDING_WINDOWS.values())
+        since = datetime.now(timezone.utc) - timedelta(seconds=longest)
+        loaded = 0
+        stream = report_dal.open_recent_reports_stream(since, self.rebuilt_through_id)
+        try:
+            for rows in stream.iter_batches(settings.TRENDING_REBUILD_BATCH_SIZE):
+                for _, terrorist_id, created_at in rows:
+                    self.record(terrorist_id, created_at)
+                loaded += len(rows)
+        finally:
+            stream.close()
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rebuilt_through_id": self.rebuilt_through_id,
+            "tracked_counters": {name: window.tracked_keys() for name, window in self.windows.items()},
+        }
+
+
+trending_tracker = TrendingTracker(settings.TRENDING_COUNTERS_PER_BUCKET)
+
+
+def start_trending() -> None:
+    """Subscribe the tracker to report events and load recent reports (at startup)"""
+    if not settings.TRENDING_ENABLED:
+        return
+    get_feed_hub().add_listener(trending_tracker.on_event)
+    started = time.perf_counter()
+    loaded = trending_tracker.rebuild()
+    print(f"✓ Trending windows rebuilt from {loaded} recent reports in {time.perf_counter() - started:.2f}s")
+
+
+def get_trending_terrorists(window: str = "24h", limit: int = 10) -> List[Tuple[Terrorist, int, int]]:
+    """
+    Get the terrorists with the most new reports in a sliding window
+
+    Args:
+        window: One of TRENDING_WINDOWS ("1h", "24h", "7d")
+        limit: Maximum terrorists to return
+
+    Returns:
+        List of (Terrorist, estimated report count, max overestimate), highest count first
+
+    Raises:
+        ValueError: If the window is unknown
+        RuntimeError: If trending is disabled
+    """
+    if window not in TRENDING_WINDOWS:
+        raise ValueError(f"Unknown window '{window}' (expected one of {', '.join(TRENDING_WINDOWS)})")
+    if not settings.TRENDING_ENABLED:
+        raise RuntimeError("Trending is disabled (TRENDING_ENABLED=false)")
+    results = []
+    for terrorist_id, count, error in trending_tracker.windows[window].top(limit):
+        terrorist = terrorist_service.get_terrorist_by_id(terrorist_id)
+        if terrorist:
+            results.append((terrorist, count, error))
+    return results
+
+
+def trending_stats() -> Dict[str, Any]:
+    """Counter occupancy of the trending windows"""
+    return {"enabled": settings.TRENDING_ENABLED, **trending_tracker.stats()}
@@ -0,0 +1,264 @@
+"""
+Watchlist Service - Standing queries evaluated when reports are ingested
+
+A watchlist holds keywords and/or terrorist IDs; a new report matches it
+if its content contains any of the keywords or it is about any of the
+terrorists. Instead of analysts polling /reports/search/text for every
+query, each new report is checked against all watchlists in one pass:
+every keyword of every watchlist is compiled into a single Aho-Corasick
+automaton, so matching costs O(report length) whatever the number of
+watchlists.
+
+Matches are recorded in `watchlist_match` and pushed as watchlist.match
+events on the report feed (/feed/reports/sse?watchlist_id=...).
+
+The compiled matcher is rebuilt right away when this process changes a
+watchlist, and at most WATCHLIST_REFRESH_SECONDS after another worker does.
+"""
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import settings
+from app.keyword_automaton import KeywordAutomaton, normalize_term
+from app.models import Report, Watchlist, WatchlistMatch
+from app.dal import watchlist_dal
+from app.services import agent_service, terrorist_service
+from app.services.report_feed_service import publish_watchlist_match
+from app.services.response_cache_service import bump_data_version
+from app.responses import report_serializer
+
+
+class WatchlistMatcher:
+    """All watchlists compiled for one-pass matching"""
+
+    def __init__(self, watchlists: Iterable[Watchlist]):
+        self.by_keyword: Dict[str, List[int]] = {}
+        self.by_terrorist: Dict[int, List[int]] = {}
+        for watchlist in watchlists:
+            for keyword in {normalize_term(keyword) for keyword in json.loads(watchlist.keywords)}:
+                self.by_keyword.setdefault(keyword, []).append(watchlist.id)
+            for terrorist_id in json.loads(watchlist.terrorist_ids):
+                self.by_terrorist.setdefault(terrorist_id, []).append(watchlist.id)
+        self.automaton = KeywordAutomaton(self.by_keyword)
+        self.built_at = time.monotonic()
+
+    def match(self, content: str, terrorist_id: int) -> Dict[int, List[str]]:
+        """Watchlist ID -> keywords found, for every watchlist the report matches"""
+        matches: Dict[int, List[str]] = {
+            watchlist_id: [] for watchlist_id in self.by_terrorist.get(terrorist_id, [])
+        }
+        for keyword in sorted(self.automaton.find_terms(content)):
+            for watchlist_id in self.by_keyword[keyword]:
+                matches.setdefault(watchlist_id, []).append(keyword)
+        return matches
+
+
+_matcher: Optional[WatchlistMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher() -> WatchlistMatcher:
+    """Return the compiled matcher, rebuilding it when invalidated or stale"""
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None or time.monotonic() - _matcher.built_at > settings.WATCHLIST_REFRESH_SECONDS:
+            _matcher = WatchlistMatcher(watchlist_dal.get_all_watchlists())
+        return _matcher
+
+
+def invalidate_matcher() -> None:
+    """Force a rebuild on the next match (after a watchlist changed)"""
+    global _matcher
+    with _matcher_lock:
+        _matcher = None
+
+
+def watchlist_to_dict(watchlist: Watchlist) -> Dict[str, Any]:
+    """Watchlist with its JSON columns decoded"""
+    return {
+        "id": watchlist.id,
+        "name": watchlist.name,
+        "agent_id": watchlist.agent_id,
+        "keywords": json.loads(watchlist.keywords),
+        "terrorist_ids": json.loads(watchlist.terrorist_ids),
+        "created_at": watchlist.created_at,
+    }
+
+
+def match_to_dict(match: WatchlistMatch) -> Dict[str, Any]:
+    """Watchlist match with its JSON column decoded"""
+    return {
+        "id": match.id,
+        "watchlist_id": match.watchlist_id,
+        "report_id": match.report_id,
+        "matched_keywords": json.loads(match.matched_keywords),
+        "created_at": match.created_at,
+    }
+
+
+def create_watchlist(
+    name: str,
+    agent_id: int,
+    keywords: Optional[List[str]] = None,
+    terrorist_ids: Optional[List[int]] = None,
+) -> Watchlist:
+    """
+    Register a standing query
+
+    Args:
+        name: Display name of the watchlist
+        agent_id: ID of the agent who owns it
+        keywords: Words to look for in new reports (case-insensitive)
+        terrorist_ids: Terrorists whose new reports should match
+
+    Returns:
+        Created Watchlist object
+
+    Raises:
+        ValueError: If the agent or a terrorist doesn't exist, or no
+            (or too many) keywords and terrorists are given
+    """
+    if not agent_service.get_agent_by_id(agent_id):
+        raise ValueError(f"Agent with ID {agent_id} not found")
+
+    # One spelling per normalized keyword (matching is case-insensitive anyway)
+    keywords_by_term: Dict[str, str] = {}
+    for keyword in keywords or []:
+        if normalize_term(keyword):
+            keywords_by_term.setdefault(normalize_term(keyword), " ".join(keyword.split()))
+    keywords = sorted(keywords_by_term.values())
+    terrorist_ids = sorted(set(terrorist_ids or []))
+    if not keywords and not terrorist_ids:
+        raise ValueError("A watchlist needs at least one keyword or terrorist")
+    if len(keywords) + len(terrorist_ids) > settings.WATCHLIST_MAX_TERMS:
+        raise ValueError(f"A watchlist may have at most {settings.WATCHLIST_MAX_TERMS} keywords and terrorists")
+    for terrorist_id in terrorist_ids:
+        if not terrorist_service.get_terrorist_by_id(terrorist_id):
+            raise ValueError(f"Terrorist with ID {terrorist_id} not found")
+
+    watchlist = watchlist_dal.create_watchlist(name, agent_id, keywords, terrorist_ids)
+    invalidate_matcher()
+    bump_data_version()
+    return watchlist
+
+
+def get_watchlist_by_id(watchlist_id: int) -> Optional[Watchlist]:
+    """
+    Get watchlist by ID
+
+    Args:
+        watchlist_id: ID of the watchlist
+
+    Returns:
+        Watchlist object if found, None otherwise
+    """
+    return watchlist_dal.get_watchlist_by_id(watchlist_id)
+
+
+def get_all_watchlists(agent_id: Optional[int] = None) -> List[Watchlist]:
+    """
+    Get all watchlists
+
+    Args:
+        agent_id: Optional - only this agent's watchlists
+
+    Returns:
+        List of Watchlist objects
+    """
+    return watchlist_dal.get_all_watchlists(agent_id)
+
+
+def delete_watchlist(watchlist_id: int, agent_id: Optional[int] = None) -> bool:
+    """
+    Delete a watchlist and its recorded matches
+
+    Args:
+        watchlist_id: ID of the watchlist to delete
+        agent_id: Optional - ID of the agent requesting deletion (for authorization)
+
+    Returns:
+        True if deleted successfully, False otherwise
+
+    Raises:
+        PermissionError: If agent_id is provided and doesn't own the watchlist
+    """
+    if agent_id is not None:
+        watchlist = watchlist_dal.get_watchlist_by_id(watchlist_id)
+        if watchlist and watchlist.agent_id != agent_id:
+            raise PermissionError("You can only delete your own watchlists")
+
+    deleted = watchlist_dal.delete_watchlist(watchlist_id)
+    if deleted:
+        invalidate_matcher()
+        bump_data_version()
+    return deleted
+
+
+def get_watchlist_matches(watchlist_id: int, after: int = 0, limit: int = 100) -> List[WatchlistMatch]:
+    """
+    Get the reports a watchlist matched, oldest first
+
+    Args:
+        watchlist_id: ID of the watchlist
+        after: Only matches with a higher match ID (for paging / polling)
+        limit: Maximum matches to return
+
+    Returns:
+        List of WatchlistMatch objects
+
+    Raises:
+        ValueError: If the watchlist doesn't exist
+    """
+    if not watchlist_dal.get_watchlist_by_id(watchlist_id):
+        raise ValueError(f"Watchlist with ID {watchlist_id} not found")
+    return watchlist_dal.get_watchlist_matches(watchlist_id, after, limit)
+
+
+def match_reports(reports: List[Report]) -> List[Dict[str, Any]]:
+    """
+    Match newly ingested reports against every watchlist
+
+    Matches are recorded in one transaction and published as
+    watchlist.match feed events.
+
+    Args:
+        reports: Reports just created
+
+    Returns:
+        The recorded matches (watchlist_id, report_id, matched_keywords)
+    """
+    if not settings.WATCHLIST_ENABLED or not reports:
+        return []
+    matcher = get_matcher()
+    if not matcher.by_keyword and not matcher.by_terrorist:
+        return []
+
+    matches: List[Dict[str, Any]] = []
+    matched_reports: Dict[int, Report] = {}
+    for report in reports:
+        for watchlist_id, keywords in matcher.match(report.content, report.terrorist_id).items():
+            matches.append({"watchlist_id": watchlist_id, "report_id": report.id, "matched_keywords": keywords})
+            matched_reports[report.id] = report
+    if not matches:
+        return []
+
+    try:
+        watchlist_dal.create_watchlist_matches(matches)
+    except Exception:
+        # A watchlist deleted by another worker since the last rebuild; retry with a fresh matcher
+        invalidate_matcher()
+        live_ids = {watchlist.id for watchlist in watchlist_dal.get_all_watchlists()}
+        matches = [match for match in matches if match["watchlist_id"] in live_ids]
+        if not matches:
+            return []
+        watchlist_dal.create_watchlist_matches(matches)
+
+    report_dicts = {
+        report_id: report_serializer.to_python([report])[0]
+        for report_id, report in matched_reports.items()
+    }
+    for match in matches:
+        publish_watchlist_match(match["watchlist_id"], match["matched_keywords"], report_dicts[match["report_id"]])
+    return matches
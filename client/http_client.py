@@ -4,8 +4,20 @@ HTTP Client Utilities for Terminal Client
 This module provides functions to make HTTP requests to the API server.
 It handles request formatting, error handling, and response parsing.
 """
+import json
 import httpx
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # optional dependency
+    pyarrow = None
 
 
 # API Configuration
@@ -13,14 +25,48 @@ API_BASE_URL = "http://localhost:8000"
 API_V1_PREFIX = "/api/v1"
 API_TIMEOUT = 30.0  # seconds
 
+# Accept headers for list endpoints ("json", "msgpack" or "arrow").
+# Compressed bodies (gzip, and br / zstd when brotli / zstandard are
+# installed) are decoded by httpx transparently.
+RESPONSE_FORMAT_ACCEPT = {
+    "json": "application/json",
+    "msgpack": "application/msgpack, application/json;q=0.5",
+    "arrow": "application/vnd.apache.arrow.stream, application/json;q=0.5",
+}
+
 
 class APIClient:
     """HTTP client for making requests to the Intelligence API"""
     
-    def __init__(self, base_url: str = API_BASE_URL, api_prefix: str = API_V1_PREFIX):
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        api_prefix: str = API_V1_PREFIX,
+        response_format: str = "json"
+    ):
+        if response_format not in RESPONSE_FORMAT_ACCEPT:
+            raise ValueError(f"Unsupported response format: {response_format}")
+        if response_format == "msgpack" and msgpack is None:
+            raise ValueError("response_format='msgpack' requires the msgpack package")
+        if response_format == "arrow" and pyarrow is None:
+            raise ValueError("response_format='arrow' requires the pyarrow package")
         self.base_url = base_url
         self.api_prefix = api_prefix
         self.timeout = API_TIMEOUT
+        self.response_format = response_format
+    
+    def _list_headers(self) -> Dict[str, str]:
+        """Accept header for list endpoints in the configured response format"""
+        return {"Accept": RESPONSE_FORMAT_ACCEPT[self.response_format]}
+    
+    def _decode_body(self, response: httpx.Response) -> Any:
+        """Decode a JSON, MessagePack or Arrow IPC body by its Content-Type"""
+        content_type = response.headers.get("content-type", "")
+        if content_type.startswith(("application/msgpack", "application/x-msgpack")):
+            return msgpack.unpackb(response.content, raw=False)
+        if content_type.startswith("application/vnd.apache.arrow.stream"):
+            return pyarrow.ipc.open_stream(response.content).read_all().to_pylist()
+        return response.json()
     
     def _handle_response(self, response: httpx.Response) -> Dict[Any, Any]:
         """
@@ -37,7 +83,7 @@ class APIClient:
         """
         try:
             response.raise_for_status()
-            return response.json()
+            return self._decode_body(response)
         except httpx.HTTPStatusError as e:
             # Extract error detail from response if available
             try:
@@ -123,6 +169,28 @@ class APIClient:
         except httpx.ConnectError:
             raise Exception("Cannot connect to server. Is the server running?")
     
+    def get_terrorist_network(self, terrorist_id: int, depth: int = 1, min_reports: int = 1) -> Dict[Any, Any]:
+        """
+        Get the co-occurrence network around a terrorist
+        
+        Args:
+            terrorist_id: ID of the terrorist at the center
+            depth: Maximum hops from that terrorist
+            min_reports: Only links seen in at least this many reports
+            
+        Returns:
+            Nodes (terrorists with their hop distance) and edges with report counts
+        """
+        url = f"{self.base_url}{self.api_prefix}/terrorists/{terrorist_id}/network"
+        params = {"depth": depth, "min_reports": min_reports}
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url, params=params)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
     def create_report(
         self, 
         content: str, 
@@ -177,69 +245,320 @@ class APIClient:
         except httpx.ConnectError:
             raise Exception("Cannot connect to server. Is the server running?")
     
-    def search_reports_by_text(self, keyword: str) -> list:
+    def search_reports_by_text(self, keyword: str, include_archive: bool = False) -> list:
         """
         Search reports by keyword
         
         Args:
             keyword: Keyword to search for
+            include_archive: Also search archived reports
             
         Returns:
             List of matching reports
         """
         url = f"{self.base_url}{self.api_prefix}/reports/search/text"
-        params = {"keyword": keyword}
+        params = {"keyword": keyword, "include_archive": include_archive}
         
         try:
             with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(url, params=params)
+                response = client.get(url, params=params, headers=self._list_headers())
                 return self._handle_response(response)
         except httpx.ConnectError:
             raise Exception("Cannot connect to server. Is the server running?")
     
-    def search_reports_by_terrorist(self, terrorist_id: int) -> Dict[Any, Any]:
+    def search_reports_by_terrorist(self, terrorist_id: int, include_archive: bool = False) -> Dict[Any, Any]:
         """
         Search reports by terrorist ID
         
         Args:
             terrorist_id: ID of terrorist
+            include_archive: Include archived reports in the list
             
         Returns:
             Dictionary with total count and first 5 reports
         """
         url = f"{self.base_url}{self.api_prefix}/reports/search/terrorist/{terrorist_id}"
+        params = {"include_archive": include_archive}
         
         try:
             with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(url)
+                response = client.get(url, params=params)
                 return self._handle_response(response)
         except httpx.ConnectError:
             raise Exception("Cannot connect to server. Is the server running?")
     
-    def get_dangerous_terrorists(self) -> list:
+    def export_reports(
+        self,
+        output_format: str = "ndjson",
+        agent_id: Optional[int] = None,
+        terrorist_id: Optional[int] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+        keyword: Optional[str] = None,
+        dangerous_only: bool = False,
+        include_names: bool = False
+    ) -> Iterator[str]:
+        """
+        Stream a filtered export of reports
+        
+        Args:
+            output_format: "ndjson" or "csv"
+            agent_id: Only reports written by this agent
+            terrorist_id: Only reports about this terrorist
+            created_from: ISO timestamp, only reports created at or after it
+            created_to: ISO timestamp, only reports created before it
+            keyword: Only reports containing this keyword
+            dangerous_only: Only reports containing weapon keywords
+            include_names: Add terrorist and agent names
+            
+        Returns:
+            Iterator over export lines (NDJSON objects or CSV rows)
+        """
+        url = f"{self.base_url}{self.api_prefix}/reports/export"
+        params = {
+            "format": output_format,
+            "agent_id": agent_id,
+            "terrorist_id": terrorist_id,
+            "created_from": created_from,
+            "created_to": created_to,
+            "keyword": keyword,
+            "dangerous_only": dangerous_only,
+            "include_names": include_names,
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+        
+        try:
+            # No read timeout: rows keep arriving for as long as the export streams
+            with httpx.Client(timeout=httpx.Timeout(self.timeout, read=None)) as client:
+                with client.stream("GET", url, params=params) as response:
+                    if response.is_error:
+                        response.read()
+                        self._handle_response(response)
+                    for line in response.iter_lines():
+                        if line:
+                            yield line
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def stream_report_feed(
+        self,
+        terrorist_id: Optional[int] = None,
+        agent_id: Optional[int] = None,
+        keyword: Optional[str] = None,
+        watchlist_id: Optional[int] = None
+    ) -> Iterator[Dict[Any, Any]]:
+        """
+        Follow the live report feed (Server-Sent Events)
+        
+        Args:
+            terrorist_id: Only reports about this terrorist
+            agent_id: Only reports written by this agent
+            keyword: Only reports containing this keyword
+            watchlist_id: Follow this watchlist's match notifications instead
+            
+        Returns:
+            Iterator over feed events ({"id", "type", "at", "report"});
+            ends when the server drops this subscriber
+        """
+        url = f"{self.base_url}{self.api_prefix}/feed/reports/sse"
+        params = {
+            "terrorist_id": terrorist_id,
+            "agent_id": agent_id,
+            "keyword": keyword,
+            "watchlist_id": watchlist_id,
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+        
+        try:
+            with httpx.Client(timeout=httpx.Timeout(self.timeout, read=None)) as client:
+                with client.stream("GET", url, params=params) as response:
+                    if response.is_error:
+                        response.read()
+                        self._handle_response(response)
+                    event_type = None
+                    for line in response.iter_lines():
+                        if line.startswith("event:"):
+                            event_type = line[len("event:"):].strip()
+                        elif line.startswith("data:") and event_type != "dropped":
+                            yield json.loads(line[len("data:"):].strip())
+                        elif not line:
+                            if event_type == "dropped":
+                                return
+                            event_type = None
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def create_watchlist(
+        self,
+        name: str,
+        agent_id: int,
+        keywords: Optional[list] = None,
+        terrorist_ids: Optional[list] = None
+    ) -> Dict[Any, Any]:
+        """
+        Register a standing query matched against every new report
+        
+        Args:
+            name: Display name of the watchlist
+            agent_id: ID of the agent who owns it
+            keywords: Words to look for in new reports
+            terrorist_ids: Terrorists whose new reports should match
+            
+        Returns:
+            Created watchlist data
+        """
+        url = f"{self.base_url}{self.api_prefix}/watchlists/"
+        data = {
+            "name": name,
+            "agent_id": agent_id,
+            "keywords": keywords or [],
+            "terrorist_ids": terrorist_ids or [],
+        }
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.post(url, json=data)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def get_watchlists(self, agent_id: Optional[int] = None) -> list:
+        """
+        Get all watchlists
+        
+        Args:
+            agent_id: Optional - only this agent's watchlists
+            
+        Returns:
+            List of watchlists
+        """
+        url = f"{self.base_url}{self.api_prefix}/watchlists/"
+        params = {"agent_id": agent_id} if agent_id is not None else {}
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url, params=params)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def get_watchlist_matches(self, watchlist_id: int, after: int = 0, limit: int = 100) -> list:
+        """
+        Get the reports a watchlist matched
+        
+        Args:
+            watchlist_id: ID of the watchlist
+            after: Only matches with a higher match ID
+            limit: Maximum matches to return
+            
+        Returns:
+            List of matches (report_id, matched_keywords)
+        """
+        url = f"{self.base_url}{self.api_prefix}/watchlists/{watchlist_id}/matches"
+        params = {"after": after, "limit": limit}
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url, params=params)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def delete_watchlist(self, watchlist_id: int, agent_id: Optional[int] = None) -> Dict[Any, Any]:
+        """
+        Delete a watchlist
+        
+        Args:
+            watchlist_id: ID of the watchlist to delete
+            agent_id: Optional - ID of the agent requesting deletion
+            
+        Returns:
+            Success message
+        """
+        url = f"{self.base_url}{self.api_prefix}/watchlists/{watchlist_id}"
+        params = {"agent_id": agent_id} if agent_id is not None else {}
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.delete(url, params=params)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def get_changes(self, after: int = 0, limit: Optional[int] = None) -> Dict[Any, Any]:
+        """
+        Get created/deleted agents, terrorists and reports after a cursor
+        
+        Args:
+            after: Last seq already applied (0 = from the beginning)
+            limit: Maximum records to return
+            
+        Returns:
+            Page of changes with next_after and has_more
+        """
+        url = f"{self.base_url}{self.api_prefix}/changes"
+        params = {"after": after}
+        if limit is not None:
+            params["limit"] = limit
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url, params=params)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def get_dangerous_terrorists(self, count_clusters: bool = False) -> list:
         """
         Get dangerous terrorists (>5 reports)
         
+        Args:
+            count_clusters: Count near-duplicate clusters instead of raw reports
+            
         Returns:
             List of dangerous terrorists with report counts
         """
         url = f"{self.base_url}{self.api_prefix}/reports/dangerous"
+        params = {"count_clusters": count_clusters}
         
         try:
             with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(url)
+                response = client.get(url, params=params, headers=self._list_headers())
                 return self._handle_response(response)
         except httpx.ConnectError:
             raise Exception("Cannot connect to server. Is the server running?")
     
-    def get_super_dangerous_terrorists(self) -> list:
+    def get_super_dangerous_terrorists(self, count_clusters: bool = False) -> list:
         """
         Get super dangerous terrorists (>10 reports with weapon keywords)
         
+        Args:
+            count_clusters: Count near-duplicate clusters instead of raw reports
+            
         Returns:
             List of super dangerous terrorists with report counts
         """
         url = f"{self.base_url}{self.api_prefix}/reports/super-dangerous"
+        params = {"count_clusters": count_clusters}
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url, params=params, headers=self._list_headers())
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def get_report_cluster(self, report_id: int) -> Dict[Any, Any]:
+        """
+        Get the near-duplicate cluster a report belongs to
+        
+        Args:
+            report_id: ID of the report
+            
+        Returns:
+            Cluster ID and the reports linked to it
+        """
+        url = f"{self.base_url}{self.api_prefix}/reports/{report_id}/cluster"
         
         try:
             with httpx.Client(timeout=self.timeout) as client:
@@ -248,18 +567,149 @@ class APIClient:
         except httpx.ConnectError:
             raise Exception("Cannot connect to server. Is the server running?")
     
-    def execute_sql(self, query: str) -> Dict[Any, Any]:
+    def get_trending_terrorists(self, window: str = "24h", limit: int = 10) -> list:
+        """
+        Get the terrorists with the most new reports in a sliding window
+        
+        Args:
+            window: "1h", "24h" or "7d"
+            limit: Maximum terrorists to return
+            
+        Returns:
+            List of trending terrorists with report counts
+        """
+        url = f"{self.base_url}{self.api_prefix}/reports/trending"
+        params = {"window": window, "limit": limit}
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url, params=params)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def get_ranked_terrorists(self, limit: int = 10) -> list:
+        """
+        Get the terrorists with the highest time-decayed danger score
+        
+        Args:
+            limit: Maximum terrorists to return
+            
+        Returns:
+            List of ranked terrorists with scores
+        """
+        url = f"{self.base_url}{self.api_prefix}/reports/ranked"
+        params = {"limit": limit}
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url, params=params)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def get_facets(
+        self,
+        granularity: str = "day",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        affiliation: Optional[str] = None,
+        location: Optional[str] = None,
+    ) -> Dict[Any, Any]:
+        """
+        Get report and terrorist counts by affiliation, location and time bucket
+        
+        Args:
+            granularity: "day", "week" or "month"
+            start: Optional first date (YYYY-MM-DD)
+            end: Optional last date (YYYY-MM-DD)
+            affiliation: Optional affiliation filter
+            location: Optional location filter
+            
+        Returns:
+            Totals, affiliation and location facets, and time buckets
+        """
+        url = f"{self.base_url}{self.api_prefix}/analytics/facets"
+        params = {"granularity": granularity}
+        for name, value in (("start", start), ("end", end), ("affiliation", affiliation), ("location", location)):
+            if value is not None:
+                params[name] = value
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url, params=params)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def execute_sql(self, query: str, use_cache: bool = True) -> Dict[Any, Any]:
         """
         Execute raw SQL query
         
         Args:
             query: SQL query to execute
+            use_cache: Set False to bypass the server's result cache
             
         Returns:
             Query results
         """
         url = f"{self.base_url}{self.api_prefix}/sql/execute"
         data = {"query": query}
+        headers = {} if use_cache else {"Cache-Control": "no-cache"}
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.post(url, json=data, headers=headers)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def execute_sql_stream(
+        self, 
+        query: str, 
+        output_format: str = "ndjson", 
+        max_rows: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Execute a raw SELECT and stream the result lines
+        
+        Args:
+            query: SQL query to execute
+            output_format: "ndjson" or "csv"
+            max_rows: Optional row cap
+            
+        Returns:
+            Iterator over result lines (NDJSON objects or CSV rows)
+        """
+        url = f"{self.base_url}{self.api_prefix}/sql/execute/stream"
+        data = {"query": query, "format": output_format, "max_rows": max_rows}
+        
+        try:
+            # No read timeout: rows keep arriving for as long as the query streams
+            with httpx.Client(timeout=httpx.Timeout(self.timeout, read=None)) as client:
+                with client.stream("POST", url, json=data) as response:
+                    if response.is_error:
+                        response.read()
+                        self._handle_response(response)
+                    for line in response.iter_lines():
+                        if line:
+                            yield line
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def submit_sql_job(self, query: str, max_rows: Optional[int] = None) -> Dict[Any, Any]:
+        """
+        Submit a long-running SQL query as a background job
+        
+        Args:
+            query: SQL query to execute
+            max_rows: Optional row cap
+            
+        Returns:
+            Job status (including job_id)
+        """
+        url = f"{self.base_url}{self.api_prefix}/sql/jobs"
+        data = {"query": query, "max_rows": max_rows}
         
         try:
             with httpx.Client(timeout=self.timeout) as client:
@@ -267,3 +717,63 @@ class APIClient:
                 return self._handle_response(response)
         except httpx.ConnectError:
             raise Exception("Cannot connect to server. Is the server running?")
+    
+    def get_sql_job(self, job_id: str) -> Dict[Any, Any]:
+        """
+        Get the status of a background SQL job
+        
+        Args:
+            job_id: ID of the job
+            
+        Returns:
+            Job status
+        """
+        url = f"{self.base_url}{self.api_prefix}/sql/jobs/{job_id}"
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def get_sql_job_results(self, job_id: str, offset: int = 0, limit: int = 100) -> Dict[Any, Any]:
+        """
+        Get a page of a background SQL job's results
+        
+        Args:
+            job_id: ID of the job
+            offset: Index of the first row
+            limit: Maximum rows to return
+            
+        Returns:
+            Page of results with total row count
+        """
+        url = f"{self.base_url}{self.api_prefix}/sql/jobs/{job_id}/results"
+        params = {"offset": offset, "limit": limit}
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.get(url, params=params)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
+    
+    def cancel_sql_job(self, job_id: str) -> Dict[Any, Any]:
+        """
+        Cancel a background SQL job
+        
+        Args:
+            job_id: ID of the job
+            
+        Returns:
+            Job status
+        """
+        url = f"{self.base_url}{self.api_prefix}/sql/jobs/{job_id}"
+        
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                response = client.delete(url)
+                return self._handle_response(response)
+        except httpx.ConnectError:
+            raise Exception("Cannot connect to server. Is the server running?")
@@ -1,6 +1,7 @@
 """
 Core configuration module
 """
+from typing import Dict
 from pydantic_settings import BaseSettings
 
 
@@ -37,6 +38,165 @@ class Settings(BaseSettings):
     # CORS Settings
     CORS_ORIGINS: list = ["*"]
     
+    # Response Serialization Settings
+    # Build response schemas from DB rows without re-validating them
+    FAST_RESPONSES_SKIP_VALIDATION: bool = True
+    
+    # Response Compression Settings (zstd / br / gzip, negotiated via Accept-Encoding)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller complete bodies are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    
+    # Entity Cache Settings (agents/terrorists lookups)
+    ENTITY_CACHE_ENABLED: bool = True
+    ENTITY_CACHE_BACKEND: str = "memory"  # "memory" or "redis"
+    ENTITY_CACHE_REDIS_URL: str = "redis://localhost:6379/0"  # "fakeredis://" for local testing
+    ENTITY_CACHE_MAX_SIZE: int = 10000
+    ENTITY_CACHE_TTL_SECONDS: float = 300.0
+    
+    # Response Cache Settings (analytics endpoints, keyed by data version)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    RESPONSE_CACHE_TTL_SECONDS: float = 3600.0
+    # How often servers check for data changed by manage.py commands
+    DATA_VERSION_POLL_SECONDS: float = 2.0
+    
+    # Admission Control Settings (concurrency / queue depth per route class)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_INGEST_CONCURRENCY: int = 32
+    ADMISSION_INGEST_QUEUE: int = 256
+    ADMISSION_LOOKUP_CONCURRENCY: int = 16
+    ADMISSION_LOOKUP_QUEUE: int = 128
+    ADMISSION_ANALYTICS_CONCURRENCY: int = 4
+    ADMISSION_ANALYTICS_QUEUE: int = 16
+    ADMISSION_ADMIN_SQL_CONCURRENCY: int = 2
+    ADMISSION_ADMIN_SQL_QUEUE: int = 4
+    ADMISSION_FEED_CONCURRENCY: int = 1000  # long-lived SSE connections
+    ADMISSION_FEED_QUEUE: int = 0
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+    
+    # Admin SQL Streaming Settings
+    SQL_STREAM_MAX_ROWS: int = 1_000_000
+    SQL_STREAM_MAX_BYTES: int = 256 * 1024 * 1024
+    SQL_STREAM_BATCH_SIZE: int = 1000
+    SQL_STATEMENT_TIMEOUT_MS: int = 60_000
+    SQL_SLOW_QUERY_MS: float = 1000.0
+    SQL_SLOW_QUERY_HISTORY_SIZE: int = 200
+    
+    # Admin SQL Result Cache Settings (read-only statements only)
+    SQL_RESULT_CACHE_ENABLED: bool = True
+    SQL_RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SQL_RESULT_CACHE_MAX_ENTRY_BYTES: int = 4 * 1024 * 1024
+    SQL_RESULT_CACHE_TTL_SECONDS: float = 600.0
+    
+    # Report Group Commit Settings (opt-in batching of concurrent POST /reports/)
+    REPORT_GROUP_COMMIT_ENABLED: bool = False
+    REPORT_GROUP_COMMIT_MAX_ROWS: int = 100
+    REPORT_GROUP_COMMIT_MAX_WAIT_MS: float = 5.0
+    
+    # Report Feed Settings (SSE / WebSocket push of report changes)
+    REPORT_FEED_ENABLED: bool = True
+    REPORT_FEED_BROKER: str = "local"  # "local" (single process) or "redis" (cross-worker)
+    REPORT_FEED_REDIS_URL: str = "redis://localhost:6379/0"  # "fakeredis://" for local testing
+    REPORT_FEED_CHANNEL: str = "intel:report_feed"
+    REPORT_FEED_BUFFER_SIZE: int = 256  # events a subscriber may fall behind before it's dropped
+    REPORT_FEED_MAX_SUBSCRIBERS: int = 1000
+    REPORT_FEED_HEARTBEAT_SECONDS: float = 15.0
+    
+    # Trending Settings (GET /reports/trending sliding windows)
+    TRENDING_ENABLED: bool = True
+    TRENDING_COUNTERS_PER_BUCKET: int = 500  # Space-Saving capacity: bounds memory per time bucket
+    TRENDING_REBUILD_BATCH_SIZE: int = 5000
+    
+    # Danger Score Settings (GET /reports/ranked; changing weights triggers a recompute at startup)
+    DANGER_SCORE_ENABLED: bool = True
+    DANGER_SCORE_HALF_LIFE_DAYS: float = 30.0  # a report counts half as much after this long
+    DANGER_SCORE_REPORT_WEIGHT: float = 1.0  # base weight of every report
+    DANGER_SCORE_KEYWORD_WEIGHTS: Dict[str, float] = {
+        "פיגוע": 3.0,
+        "סכין": 2.0,
+        "רובה": 2.5,
+        "אקדח": 2.5,
+        "פצצה": 3.0,
+    }  # added to a report's weight for each distinct keyword it contains
+    DANGER_SCORE_AGENT_WEIGHT: float = 0.5  # score multiplier per ln(distinct reporting agents)
+    DANGER_SCORE_RECOMPUTE_BATCH_SIZE: int = 10000
+    
+    # Report Dedup Settings (MinHash/LSH near-duplicate detection at ingest)
+    REPORT_DEDUP_MODE: str = "link"  # "off", "link" (cluster duplicates) or "reject" (409)
+    REPORT_DEDUP_THRESHOLD: float = 0.8  # estimated Jaccard similarity of character shingles
+    # Changing these makes stored signatures incomparable with new ones
+    REPORT_DEDUP_NUM_PERM: int = 64  # signature length (4 bytes each)
+    REPORT_DEDUP_BANDS: int = 16  # LSH bands; NUM_PERM must be a multiple
+    REPORT_DEDUP_SHINGLE_SIZE: int = 5  # characters
+    REPORT_DEDUP_MAX_CANDIDATES: int = 50  # signatures compared per new report
+    
+    # Entity Linking Settings (terrorists named in report content, GET /terrorists/{id}/network)
+    ENTITY_LINK_ENABLED: bool = True
+    ENTITY_LINK_REFRESH_SECONDS: float = 5.0  # picks up terrorists created by other workers
+    ENTITY_LINK_SETTLE_SECONDS: float = 60.0  # how long a terrorist insert may take to commit
+    ENTITY_LINK_MIN_NAME_LENGTH: int = 3  # shorter names match too much to be useful
+    ENTITY_LINK_MAX_MENTIONS: int = 20  # per report
+    ENTITY_LINK_DELTA_NAMES: int = 1000  # new names kept in the small automaton before a full rebuild
+    ENTITY_LINK_MAX_DEPTH: int = 3
+    ENTITY_LINK_MAX_NODES: int = 500
+    ENTITY_LINK_BATCH_SIZE: int = 1000  # reports per transaction in manage.py link-mentions
+    
+    # Watchlist Settings (standing queries matched at ingest)
+    WATCHLIST_ENABLED: bool = True
+    WATCHLIST_REFRESH_SECONDS: float = 5.0  # picks up other workers' watchlist changes
+    WATCHLIST_MAX_TERMS: int = 100  # keywords + terrorists per watchlist
+    
+    # Change Log Settings (GET /changes incremental sync)
+    CHANGE_LOG_RETENTION_DAYS: float = 7.0  # purged by: python manage.py purge-changes
+    CHANGE_LOG_PURGE_BATCH_SIZE: int = 5000
+    CHANGE_LOG_MAX_PAGE_SIZE: int = 1000
+    CHANGE_LOG_GAP_TIMEOUT_SECONDS: float = 5.0  # how long a seq gap may wait for a late commit
+    
+    # Report Export Settings (GET /reports/export)
+    REPORT_EXPORT_BATCH_SIZE: int = 1000
+    REPORT_EXPORT_STATEMENT_TIMEOUT_MS: int = 0  # 0 = no timeout (nightly exports can be long)
+    
+    # Report Archive Settings (python manage.py archive-reports)
+    REPORT_ARCHIVE_AFTER_DAYS: float = 365.0
+    REPORT_ARCHIVE_BATCH_SIZE: int = 1000
+    
+    # Report Facet Settings (GET /analytics/facets rollups)
+    REPORT_FACETS_ENABLED: bool = True
+    REPORT_FACETS_MAX_VALUES: int = 100  # affiliations / locations returned per facet
+    REPORT_FACETS_MAX_BUCKETS: int = 366  # latest time buckets returned
+    REPORT_FACETS_REBUILD_BATCH_SIZE: int = 10000
+    
+    # Report Rescan Settings (python manage.py rescan-reports)
+    RESCAN_WORKERS: int = 0  # 0 = one worker process per CPU core
+    RESCAN_CHUNK_SIZE: int = 5000
+    RESCAN_PROGRESS_SECONDS: float = 5.0
+    
+    # Parquet Snapshot Export Settings (offline analytics)
+    PARQUET_EXPORT_DIR: str = "parquet_snapshots"
+    PARQUET_EXPORT_BATCH_SIZE: int = 10_000
+    PARQUET_EXPORT_COMPRESSION: str = "zstd"
+    PARQUET_EXPORT_SETTLE_SECONDS: float = 60.0  # newer rows may still belong to uncommitted transactions
+    
+    # Database Snapshot / Restore Settings (python manage.py snapshot|restore)
+    SNAPSHOT_DIR: str = "db_snapshots"
+    SNAPSHOT_CHUNK_ROWS: int = 100_000
+    SNAPSHOT_FETCH_SIZE: int = 5000
+    SNAPSHOT_COMPRESS_LEVEL: int = 6
+    SNAPSHOT_WORKERS: int = 4
+    SNAPSHOT_RESTORE_BATCH_ROWS: int = 1000
+    SNAPSHOT_USE_LOAD_DATA: bool = False  # MySQL LOAD DATA LOCAL INFILE (server needs local_infile=ON)
+    
+    # Background SQL Job Settings
+    SQL_JOB_WORKERS: int = 2
+    SQL_JOB_MAX_ACTIVE: int = 16
+    SQL_JOB_SPOOL_DIR: str = "sql_job_spool"
+    SQL_JOB_TTL_SECONDS: float = 3600.0
+    SQL_JOB_STATEMENT_TIMEOUT_MS: int = 30 * 60 * 1000
+    
     @property
     def DATABASE_URI(self) -> str:
         """Generate database connection URI"""
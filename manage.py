@@ -0,0 +1,228 @@
+"""
+Management Commands - Offline maintenance tasks run against the database
+
+Usage:
+    python manage.py export-parquet [--full] [--output DIR] [--batch-size N]
+    python manage.py snapshot [--output DIR] [--chunk-rows N] [--workers N]
+    python manage.py restore DIR [--replace] [--workers N]
+    python manage.py archive-reports [--older-than-days N] [--batch-size N]
+    python manage.py purge-changes [--retention-days N] [--batch-size N]
+    python manage.py recompute-scores
+    python manage.py link-mentions [--after-id N] [--batch-size N]
+    python manage.py rescan-reports [--workers N] [--chunk-size N] [--restart]
+    python manage.py rebuild-facets [--batch-size N]
+
+Architecture:
+Command line (this file) -> Services -> DAL -> Database
+"""
+import argparse
+import json
+import sys
+
+
+def export_parquet(args: argparse.Namespace) -> int:
+    """Write a (by default incremental) Parquet snapshot"""
+    from app.services import parquet_export_service
+
+    summary = parquet_export_service.export_parquet_snapshot(
+        incremental=not args.full,
+        output_dir=args.output,
+        batch_size=args.batch_size,
+    )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def snapshot(args: argparse.Namespace) -> int:
+    """Dump every table to a compressed snapshot directory"""
+    from app.services import db_snapshot_service
+
+    summary = db_snapshot_service.create_snapshot(
+        output_dir=args.output,
+        chunk_rows=args.chunk_rows,
+        workers=args.workers,
+    )
+    print(f"✓ Snapshot written to {summary['snapshot_dir']} in {summary['duration_seconds']}s")
+    for table in summary["tables"]:
+        print(f"  {table['name']}: {table['rows']} rows in {len(table['chunks'])} chunk(s)")
+    return 0
+
+
+def restore(args: argparse.Namespace) -> int:
+    """Load a snapshot directory into the configured database"""
+    from app.services import db_snapshot_service
+
+    summary = db_snapshot_service.restore_snapshot(
+        args.snapshot_dir,
+        replace=args.replace,
+        workers=args.workers,
+    )
+    print(f"✓ Restored {summary['snapshot_dir']} ({summary['method']}) in {summary['duration_seconds']}s")
+    for table_name, rows in summary["tables"].items():
+        print(f"  {table_name}: {rows} rows")
+    return 0
+
+
+def archive_reports(args: argparse.Namespace) -> int:
+    """Move old reports into the archive table"""
+    from app.services import archive_service
+
+    summary = archive_service.archive_old_reports(
+        older_than_days=args.older_than_days,
+        batch_size=args.batch_size,
+    )
+    print(
+        f"✓ Archived {summary['archived']} report(s) created before {summary['cutoff']} "
+        f"in {summary['batches']} batch(es), {summary['duration_seconds']}s"
+    )
+    return 0
+
+
+def purge_changes(args: argparse.Namespace) -> int:
+    """Delete change log records older than the retention period"""
+    from app.services import change_log_service
+
+    summary = change_log_service.purge_change_log(
+        retention_days=args.retention_days,
+        batch_size=args.batch_size,
+    )
+    print(
+        f"✓ Purged {summary['purged']} change record(s) created before {summary['cutoff']} "
+        f"in {summary['duration_seconds']}s"
+    )
+    return 0
+
+
+def recompute_scores(args: argparse.Namespace) -> int:
+    """Rebuild danger scores from all reports with the configured weights"""
+    from app.services import scoring_service
+
+    summary = scoring_service.recompute_scores()
+    engine = "NumPy" if summary["vectorized"] else "pure Python"
+    print(
+        f"✓ Scored {summary['terrorists']} terrorist(s) from {summary['reports']} report(s) "
+        f"in {summary['duration_seconds']}s ({engine})"
+    )
+    return 0
+
+
+def link_mentions(args: argparse.Namespace) -> int:
+    """Link existing reports to the terrorists their content names"""
+    from app.services import entity_link_service
+
+    summary = entity_link_service.link_existing_reports(
+        after_id=args.after_id,
+        batch_size=args.batch_size,
+    )
+    print(
+        f"✓ Linked {summary['reports']} report(s) through ID {summary['last_id']}: "
+        f"{summary['mentions']} mention(s) in {summary['duration_seconds']}s"
+    )
+    return 0
+
+
+def rescan_reports(args: argparse.Namespace) -> int:
+    """Re-classify every stored report under the current weapon keywords"""
+    from app.services import rescan_service
+
+    def report_progress(progress: dict) -> None:
+        print(
+            f"  {progress['scanned']} report(s), {progress['reports_per_second']}/s "
+            f"({progress['table']} {progress['through_id']})"
+        )
+
+    summary = rescan_service.rescan_reports(
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        restart=args.restart,
+        progress=report_progress,
+    )
+    if summary["already_complete"]:
+        print(f"✓ Reports already classified under rules {summary['rules_version']} (--restart to redo)")
+        return 0
+    print(
+        f"✓ {'Resumed and classified' if summary['resumed'] else 'Classified'} {summary['scanned']} report(s) "
+        f"under rules {summary['rules_version']}: {summary['dangerous']} dangerous, "
+        f"{summary['workers']} worker(s), {summary['reports_per_second']}/s in {summary['duration_seconds']}s"
+    )
+    return 0
+
+
+def rebuild_facets(args: argparse.Namespace) -> int:
+    """Rebuild the affiliation / location / time facet rollups from all reports"""
+    from app.services import facet_service
+
+    summary = facet_service.rebuild_facets(batch_size=args.batch_size)
+    print(
+        f"✓ Rebuilt facets from {summary['reports']} report(s): "
+        f"{summary['terrorist_buckets']} terrorist bucket(s) in {summary['duration_seconds']}s"
+    )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Intelligence Reporting System management commands")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    parquet_parser = subcommands.add_parser(
+        "export-parquet", help="Export agents, terrorists and reports to partitioned Parquet"
+    )
+    parquet_parser.add_argument("--full", action="store_true", help="Replace the dataset instead of appending new rows")
+    parquet_parser.add_argument("--output", default=None, help="Snapshot directory (default: PARQUET_EXPORT_DIR)")
+    parquet_parser.add_argument("--batch-size", type=int, default=None, help="Rows per fetch / row group")
+    parquet_parser.set_defaults(handler=export_parquet)
+
+    snapshot_parser = subcommands.add_parser("snapshot", help="Dump every table to compressed chunk files")
+    snapshot_parser.add_argument("--output", default=None, help="Snapshot directory (default: SNAPSHOT_DIR/<timestamp>)")
+    snapshot_parser.add_argument("--chunk-rows", type=int, default=None, help="Rows per chunk file")
+    snapshot_parser.add_argument("--workers", type=int, default=None, help="Tables dumped in parallel")
+    snapshot_parser.set_defaults(handler=snapshot)
+
+    restore_parser = subcommands.add_parser("restore", help="Load a snapshot into the database")
+    restore_parser.add_argument("snapshot_dir", help="Directory written by 'snapshot'")
+    restore_parser.add_argument("--replace", action="store_true", help="Drop and recreate all tables first")
+    restore_parser.add_argument("--workers", type=int, default=None, help="Chunks loaded in parallel")
+    restore_parser.set_defaults(handler=restore)
+
+    archive_parser = subcommands.add_parser("archive-reports", help="Move old reports into the archive table")
+    archive_parser.add_argument("--older-than-days", type=float, default=None, help="Age threshold (default: REPORT_ARCHIVE_AFTER_DAYS)")
+    archive_parser.add_argument("--batch-size", type=int, default=None, help="Reports moved per transaction")
+    archive_parser.set_defaults(handler=archive_reports)
+
+    purge_parser = subcommands.add_parser("purge-changes", help="Delete change log records past retention")
+    purge_parser.add_argument("--retention-days", type=float, default=None, help="Days kept (default: CHANGE_LOG_RETENTION_DAYS)")
+    purge_parser.add_argument("--batch-size", type=int, default=None, help="Records deleted per transaction")
+    purge_parser.set_defaults(handler=purge_changes)
+
+    scores_parser = subcommands.add_parser("recompute-scores", help="Rebuild danger scores (after changing weights)")
+    scores_parser.set_defaults(handler=recompute_scores)
+
+    mentions_parser = subcommands.add_parser("link-mentions", help="Find terrorists named in existing reports")
+    mentions_parser.add_argument("--after-id", type=int, default=0, help="Resume after this report ID")
+    mentions_parser.add_argument("--batch-size", type=int, default=None, help="Reports per transaction")
+    mentions_parser.set_defaults(handler=link_mentions)
+
+    rescan_parser = subcommands.add_parser("rescan-reports", help="Re-classify reports after the weapon keywords changed")
+    rescan_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: RESCAN_WORKERS, all cores)")
+    rescan_parser.add_argument("--chunk-size", type=int, default=None, help="Reports per chunk / transaction")
+    rescan_parser.add_argument("--restart", action="store_true", help="Start over instead of resuming")
+    rescan_parser.set_defaults(handler=rescan_reports)
+
+    facets_parser = subcommands.add_parser("rebuild-facets", help="Rebuild the /analytics/facets rollups")
+    facets_parser.add_argument("--batch-size", type=int, default=None, help="Reports fetched per round trip")
+    facets_parser.set_defaults(handler=rebuild_facets)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except Exception as e:
+        print(f"❌ {args.command} failed: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())